@@ -0,0 +1,299 @@
+import glob
+import os
+import shutil
+
+import numpy as np
+import pyarrow as pa
+from pyarrow import ipc
+
+from csv_reader import read_header
+
+# ==============================================================================
+# Penyimpanan sementara berformat Arrow IPC
+# ==============================================================================
+# Hasil konsolidasi disimpan sebagai folder `*.arrow` berisi file Arrow IPC.
+# Setiap file input menjadi satu part (atau beberapa segmen jika dtype-nya
+# berubah di tengah file), dan setiap chunk ditulis sebagai satu record batch.
+# Part cukup berisi kolom milik file input itu sendiri; saat dibaca, semua part
+# di-memory-map, kolom yang tidak ada diisi null, dan dtype-nya disatukan
+# menjadi satu skema. Jadi tidak ada lagi proses tulis-baca ulang teks CSV dan
+# dtype tetap terjaga dari tahap konsolidasi sampai tahap merge.
+
+ARROW_SUFFIX = '.arrow'
+
+# Part kosong berisi daftar kolom (bertipe null) agar urutan kolom tetap
+# diketahui walaupun semua file input kosong.
+_HEADER_PART = '_header.arrow'
+
+
+def is_arrow_path(path):
+    return str(path).endswith(ARROW_SUFFIX)
+
+
+def frame_to_table(df, schema=None):
+    """
+    Mengubah DataFrame menjadi tabel Arrow tanpa index dan metadata pandas.
+
+    Kolom object yang isinya campuran (mis. angka dan teks) diubah menjadi teks,
+    dan kolom category disimpan sebagai nilai aslinya (kamus kategori tiap chunk
+    bisa berbeda). Jika `schema` diberikan, tabel di-cast ke skema tersebut.
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df = df.copy()
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(None)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(field.type.value_type))
+    if schema is not None:
+        table = _conform(table, schema)
+    return table
+
+
+def create_dataset(path, columns):
+    """Membuat folder dataset Arrow baru (menimpa yang lama) dengan daftar kolom tertentu."""
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    schema = pa.schema([(col, pa.null()) for col in columns])
+    with ipc.new_file(os.path.join(path, _HEADER_PART), schema):
+        pass
+
+
+def write_frames(frames, path, part_prefix):
+    """
+    Menulis rangkaian DataFrame sebagai record batch ke part `part_prefix` di dataset `path`.
+
+    Jika dtype sebuah chunk berbeda dari chunk sebelumnya (mis. int menjadi float
+    karena ada nilai kosong), chunk itu ditulis ke segmen part berikutnya.
+
+    Returns:
+        int: Jumlah baris yang ditulis.
+    """
+    writer = None
+    schema = None
+    segment = 0
+    total_rows = 0
+    try:
+        for df in frames:
+            table = frame_to_table(df)
+            if writer is None or not table.schema.equals(schema):
+                if writer is not None:
+                    writer.close()
+                    segment += 1
+                schema = table.schema
+                writer = ipc.new_file(os.path.join(path, part_name(part_prefix, segment)), schema)
+            writer.write_table(table)
+            total_rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total_rows
+
+
+def part_name(part_prefix, segment=0):
+    """Nama file part: urutan nama file = urutan baris di dataset."""
+    return f"{part_prefix}-{segment:04d}{ARROW_SUFFIX}"
+
+
+def add_part(dataset_path, source_file, name):
+    """Memasukkan file part yang sudah ada ke dataset lewat hard link (atau salinan jika gagal)."""
+    target = os.path.join(dataset_path, name)
+    try:
+        os.link(source_file, target)
+    except OSError:
+        shutil.copyfile(source_file, target)
+
+
+def add_filtered_part(dataset_path, source_file, name, row_filter):
+    """
+    Seperti `add_part`, tetapi hanya baris yang lolos `row_filter` (lihat key_filter.KeyFilter) yang disalin.
+
+    Returns:
+        int: Jumlah baris yang dibuang.
+    """
+    reader = _open(source_file)
+    skipped = 0
+    with ipc.new_file(os.path.join(dataset_path, name), reader.schema) as writer:
+        for i in range(reader.num_record_batches):
+            table = pa.Table.from_batches([reader.get_batch(i)])
+            kept = row_filter.filter_table(table)
+            skipped += table.num_rows - kept.num_rows
+            writer.write_table(kept)
+    return skipped
+
+
+def write_table_file(df, path, chunk_rows=None):
+    """Menulis satu DataFrame ke satu file Arrow IPC."""
+    table = frame_to_table(df)
+    with ipc.new_file(path, table.schema) as writer:
+        writer.write_table(table, max_chunksize=chunk_rows)
+
+
+def list_parts(path):
+    """Daftar file Arrow sebuah dataset (atau file itu sendiri), part header lebih dulu."""
+    if not os.path.isdir(path):
+        return [path]
+    parts = sorted(glob.glob(os.path.join(path, f"*{ARROW_SUFFIX}")))
+    return sorted(parts, key=lambda p: os.path.basename(p) != _HEADER_PART)
+
+
+def dataset_size(path):
+    """Ukuran total file dataset di disk (byte)."""
+    return sum(os.path.getsize(p) for p in list_parts(path))
+
+
+def _open(part):
+    return ipc.open_file(pa.memory_map(part))
+
+
+def _unify_type(types):
+    """
+    Menyatukan tipe satu kolom dari beberapa part: bilangan bulat dengan lebar
+    berbeda menjadi yang terlebar, angka campuran menjadi float64, selain itu teks.
+    """
+    types = {t for t in types if not pa.types.is_null(t)}
+    if not types:
+        return pa.float64()
+    if len(types) == 1:
+        return types.pop()
+    if all(pa.types.is_signed_integer(t) for t in types):
+        return max(types, key=lambda t: t.bit_width)
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+        return pa.float64()
+    return pa.string()
+
+
+def unified_schema(path_or_parts):
+    """Membaca skema semua part (hanya footer file) dan menyatukannya menjadi satu skema."""
+    parts = list_parts(path_or_parts) if isinstance(path_or_parts, str) else path_or_parts
+    types = {}
+    for part in parts:
+        for field in _open(part).schema:
+            types.setdefault(field.name, []).append(field.type)
+    return pa.schema([(name, _unify_type(column_types)) for name, column_types in types.items()])
+
+
+def _conform(table, schema):
+    """Menyesuaikan tabel ke skema: kolom diurutkan, di-cast, dan yang tidak ada diisi null."""
+    columns = [table.column(field.name).cast(field.type) if field.name in table.column_names
+               else pa.nulls(table.num_rows, field.type) for field in schema]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def read_columns(path):
+    """Membaca daftar kolom dari dataset Arrow atau header file CSV tanpa memuat datanya."""
+    if is_arrow_path(path):
+        return unified_schema(path).names
+    return read_header(path)
+
+
+def iter_tables(path, chunk_rows=None, schema=None):
+    """
+    Membaca dataset per record batch (di-memory-map) sebagai tabel Arrow berskema seragam.
+
+    Jika `schema` hanya berisi sebagian kolom, hanya kolom itu yang dibaca.
+    """
+    parts = list_parts(path)
+    schema = schema or unified_schema(parts)
+    for part in parts:
+        reader = _open(part)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            step = chunk_rows or batch.num_rows or 1
+            for offset in range(0, batch.num_rows, step):
+                yield _conform(pa.Table.from_batches([batch.slice(offset, step)]), schema)
+
+
+def batch_offsets(path):
+    """
+    Indeks record batch sebuah dataset: (part, nomor batch, baris awal, jumlah baris),
+    sesuai urutan baris. Hanya metadata batch yang dibaca, bukan isi kolomnya.
+    """
+    offsets = []
+    start = 0
+    for part in list_parts(path):
+        reader = _open(part)
+        for i in range(reader.num_record_batches):
+            rows = reader.get_batch(i).num_rows
+            if rows:
+                offsets.append((part, i, start, rows))
+                start += rows
+    return offsets
+
+
+def read_rows(path, offset, limit, schema, offsets=None):
+    """
+    Membaca baris [offset, offset + limit) dataset sebagai tabel Arrow berskema `schema`.
+
+    Hanya batch yang beririsan dengan rentang baris yang dibuka, dan hanya kolom
+    di `schema` yang dibaca (kolom lain tidak pernah disentuh karena di-memory-map).
+    """
+    offsets = batch_offsets(path) if offsets is None else offsets
+    end = offset + limit
+    tables = []
+    for part, i, start, rows in offsets:
+        if start + rows <= offset or start >= end:
+            continue
+        batch = _open(part).get_batch(i)
+        begin = max(offset - start, 0)
+        tables.append(_conform(pa.Table.from_batches([batch.slice(begin, min(end - start, rows) - begin)]), schema))
+    return pa.concat_tables(tables) if tables else schema.empty_table()
+
+
+def null_columns(path, offsets=None):
+    """
+    Kolom yang berisi null di salah satu batch, atau tidak dimiliki sebagian part.
+
+    Cukup dari metadata batch (jumlah null), isi kolom tidak dibaca.
+    """
+    offsets = batch_offsets(path) if offsets is None else offsets
+    names = unified_schema(path).names
+    nulls = set()
+    for part, i, _, _ in offsets:
+        batch = _open(part).get_batch(i)
+        for name in names:
+            if name not in batch.schema.names or batch.column(name).null_count:
+                nulls.add(name)
+    return nulls
+
+
+def take_rows(path, rows, schema, offsets=None):
+    """
+    Membaca baris dengan nomor `rows` (array terurut naik) sebagai tabel Arrow berskema `schema`.
+
+    Hanya batch yang memuat baris tersebut yang dibuka, jadi membaca sedikit baris
+    dari dataset besar hanya menyentuh halaman file yang berisi baris itu.
+    """
+    offsets = batch_offsets(path) if offsets is None else offsets
+    rows = np.asarray(rows, dtype=np.int64)
+    if not len(rows):
+        return schema.empty_table()
+    starts = np.array([start for _, _, start, _ in offsets], dtype=np.int64)
+    batch_ids = np.searchsorted(starts, rows, side='right') - 1
+    bounds = np.flatnonzero(np.diff(batch_ids)) + 1
+    readers = {}
+    tables = []
+    for group in np.split(np.arange(len(rows)), bounds):
+        part, i, start, _ = offsets[batch_ids[group[0]]]
+        if part not in readers:
+            readers[part] = _open(part)
+        batch = readers[part].get_batch(i).take(pa.array(rows[group] - start))
+        tables.append(_conform(pa.Table.from_batches([batch]), schema))
+    return pa.concat_tables(tables)
+
+
+def iter_frames(path, chunk_rows=None, schema=None):
+    """Seperti `iter_tables`, tetapi menghasilkan DataFrame per chunk."""
+    for table in iter_tables(path, chunk_rows, schema):
+        yield table.to_pandas()
+
+
+def read_frame(path):
+    """Memuat seluruh dataset Arrow ke satu DataFrame."""
+    schema = unified_schema(path)
+    tables = list(iter_tables(path, schema=schema))
+    return pa.concat_tables(tables).to_pandas() if tables else schema.empty_table().to_pandas()
@@ -0,0 +1,299 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic_data import KEY_COLUMN, SCENARIOS, generate_dataset  # noqa: E402
+
+# ==============================================================================
+# Benchmark tahap konsolidasi, join, dan pemuatan laporan
+# ==============================================================================
+# Setiap tahap dijalankan di proses baru (spawn), sehingga memori puncak (peak
+# RSS) yang tercatat hanya milik tahap itu. Tahap saling bergantung lewat file
+# di folder kerja (mis. join memakai hasil konsolidasi), jadi urutannya tetap.
+# Hasil disimpan sebagai JSON di benchmarks/results/ agar bisa dibandingkan
+# antar commit.
+#
+# Contoh:
+#   python benchmarks/run_benchmarks.py --scenario small
+#   python benchmarks/run_benchmarks.py --scenario skewed --workers 4 --repeat 3
+
+MERGE_TYPE = 'inner'
+DEFAULT_OUTPUT_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+
+
+def _paths(workdir):
+    files = os.path.join(workdir, 'files')
+    return {
+        'source_a': os.path.join(files, 'inputs', 'source-a'),
+        'source_b': os.path.join(files, 'inputs', 'source-b'),
+        'temp_a': os.path.join(files, 'temp', 'consolidated_a.arrow'),
+        'temp_b': os.path.join(files, 'temp', 'consolidated_b.arrow'),
+        'cache': os.path.join(files, 'cache'),
+        'outputs': os.path.join(files, 'outputs'),
+    }
+
+
+# ------------------------------------------------------------------------------
+# Tahap-tahap benchmark (dijalankan di proses worker)
+# ------------------------------------------------------------------------------
+def _consolidate(workdir, options, clear_cache, read_options=None):
+    from consolidation import consolidate_sources
+    p = _paths(workdir)
+    if clear_cache:
+        shutil.rmtree(p['cache'], ignore_errors=True)
+    os.makedirs(os.path.dirname(p['temp_a']), exist_ok=True)
+    ok = consolidate_sources([(p['source_a'], p['temp_a']), (p['source_b'], p['temp_b'])],
+                             chunk_rows=options['chunk_rows'], workers=options['workers'],
+                             cache_dir=p['cache'], read_options=read_options, log=lambda msg: None)
+    return {'ok': all(ok)}
+
+
+def stage_consolidation(workdir, options):
+    """Konsolidasi kedua sumber dengan cache kosong (jalur main_merge.py)."""
+    return _consolidate(workdir, options, clear_cache=True)
+
+
+def stage_consolidation_pyarrow(workdir, options):
+    """Konsolidasi kedua sumber dengan cache kosong memakai mesin baca pyarrow.csv."""
+    from csv_reader import CsvReadOptions
+    return _consolidate(workdir, options, clear_cache=True, read_options=CsvReadOptions('pyarrow'))
+
+
+def stage_consolidation_cached(workdir, options):
+    """Konsolidasi ulang dengan cache yang sudah terisi (tidak ada file yang berubah)."""
+    return _consolidate(workdir, options, clear_cache=False)
+
+
+def stage_join_memory(workdir, options):
+    """Merge di memori (pd.merge) dari dataset Arrow hasil konsolidasi."""
+    import pandas as pd
+    from report_writer import write_report
+    from schema_inference import read_merge_input, save_merge_schema
+    p = _paths(workdir)
+    os.makedirs(p['outputs'], exist_ok=True)
+    output_file = os.path.join(p['outputs'], 'bench_join_memory.csv')
+    df = pd.merge(read_merge_input(p['temp_a'], KEY_COLUMN), read_merge_input(p['temp_b'], KEY_COLUMN),
+                  on=KEY_COLUMN, how=MERGE_TYPE)
+    write_report(df, output_file)
+    save_merge_schema(p['temp_a'], p['temp_b'], KEY_COLUMN, output_file)
+    return {'rows': len(df)}
+
+
+def stage_join_partitioned(workdir, options):
+    """Grace hash join di disk dari dataset Arrow hasil konsolidasi."""
+    from join_engine import partitioned_hash_join
+    from schema_inference import save_merge_schema
+    p = _paths(workdir)
+    os.makedirs(p['outputs'], exist_ok=True)
+    output_file = os.path.join(p['outputs'], 'bench_join_partitioned.csv')
+    rows = partitioned_hash_join(p['temp_a'], p['temp_b'], KEY_COLUMN, MERGE_TYPE, output_file,
+                                 partitions=options['partitions'], chunk_rows=options['chunk_rows'],
+                                 work_dir=os.path.join(workdir, 'files', 'temp', 'join'), log=lambda msg: None)
+    save_merge_schema(p['temp_a'], p['temp_b'], KEY_COLUMN, output_file)
+    return {'rows': rows}
+
+
+def _report_file(workdir):
+    return os.path.join(_paths(workdir)['outputs'], 'bench_join_memory.csv')
+
+
+def stage_report_load(workdir, options):
+    """Memuat seluruh laporan ke DataFrame (jalur ReportLoaderWorker desktop)."""
+    from schema_inference import read_report
+    return {'rows': len(read_report(_report_file(workdir)))}
+
+
+def stage_report_summary(workdir, options):
+    """Menyusun sidecar ringkasan laporan dengan membaca laporan per chunk."""
+    from report_summary import write_report_summary
+    return {'rows': write_report_summary(_report_file(workdir))['rows']}
+
+
+def stage_report_page(workdir, options):
+    """Membuka laporan secara lazy (jalur dashboard): satu halaman dan satu kolom."""
+    from report_access import ReportReader, report_dataset_path
+    shutil.rmtree(report_dataset_path(_report_file(workdir)), ignore_errors=True)
+    reader = ReportReader(_report_file(workdir))
+    reader.page(reader.num_rows // 2, 100)
+    reader.read_columns([KEY_COLUMN])
+    return {'rows': reader.num_rows}
+
+
+def stage_main_py(workdir, options):
+    """Konsolidasi satu folder lewat main.py (output CSV)."""
+    import main
+    p = _paths(workdir)
+    output_file = os.path.join(p['outputs'], 'bench_main_py.csv')
+    main.gabungkan_csv_hemat_memori(p['source_a'], output_file, options['chunk_rows'])
+    return {'ok': os.path.exists(output_file)}
+
+
+def stage_main_merge(workdir, options):
+    """Alur lengkap main_merge.main (konsolidasi tanpa cache + merge di memori)."""
+    import main_merge
+    os.chdir(workdir)
+    main_merge.main(KEY_COLUMN, chunk_rows=options['chunk_rows'], workers=options['workers'], use_cache=False)
+    return {}
+
+
+def stage_merge_worker(workdir, options):
+    """Alur lengkap MergeWorker.run dari aplikasi desktop (tanpa event loop Qt)."""
+    try:
+        from desktop import MergeWorker
+    except ImportError as e:
+        return {'skipped': f"PyQt6 tidak tersedia: {e}"}
+    p = _paths(workdir)
+    worker = MergeWorker(p['source_a'], p['source_b'], KEY_COLUMN, os.path.join(workdir, 'desktop'), MERGE_TYPE,
+                         workers=options['workers'], use_cache=False)
+    errors = []
+    worker.error.connect(errors.append)
+    worker.run()
+    return {'error': errors[0]} if errors else {}
+
+
+STAGES = {
+    'consolidation': stage_consolidation,
+    'consolidation_pyarrow': stage_consolidation_pyarrow,
+    'consolidation_cached': stage_consolidation_cached,
+    'join_memory': stage_join_memory,
+    'join_partitioned': stage_join_partitioned,
+    'report_load': stage_report_load,
+    'report_summary': stage_report_summary,
+    'report_page': stage_report_page,
+    'main_py': stage_main_py,
+    'main_merge': stage_main_merge,
+    'merge_worker': stage_merge_worker,
+}
+
+
+def _rss_mb(usage):
+    # ru_maxrss dalam KB di Linux, dalam byte di macOS
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def run_stage(name, workdir, options):
+    """Dijalankan di proses baru: mengukur satu tahap dan mengembalikan hasilnya."""
+    baseline_rss = _rss_mb(resource.getrusage(resource.RUSAGE_SELF))
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        info = STAGES[name](workdir, options)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return dict(info, **{
+        'stage': name,
+        'wall_s': round(wall, 4),
+        'cpu_s': round(cpu + children.ru_utime + children.ru_stime, 4),
+        'peak_rss_mb': round(_rss_mb(resource.getrusage(resource.RUSAGE_SELF)), 1),
+        'baseline_rss_mb': round(baseline_rss, 1),
+        'children_peak_rss_mb': round(_rss_mb(children), 1),
+    })
+
+
+# ------------------------------------------------------------------------------
+# Runner
+# ------------------------------------------------------------------------------
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(scenario_name, scenario, stages, workdir, options, repeat=1, seed=0, log=print):
+    """
+    Membuat data sintetis lalu menjalankan tahap-tahap benchmark sebanyak `repeat` kali.
+
+    Returns:
+        dict: Hasil benchmark (siap disimpan sebagai JSON).
+    """
+    log(f"Membuat data sintetis skenario '{scenario_name}' di '{workdir}'...")
+    data = generate_dataset(workdir, scenario, seed=seed)
+    log(f"  -> Source A: {data['rows_a']:,} baris, Source B: {data['rows_b']:,} baris")
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for run in range(repeat):
+        for name in stages:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_stage, name, workdir, options).result()
+            result['repeat'] = run
+            results.append(result)
+            log(f"  [{run + 1}/{repeat}] {name:<22} {result['wall_s']:>9.3f} s  "
+                f"peak {result['peak_rss_mb']:>8.1f} MB" + (f"  ({result['skipped']})" if 'skipped' in result else ''))
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'scenario': dict(scenario, name=scenario_name, seed=seed, rows_a=data['rows_a'], rows_b=data['rows_b']),
+        'options': options,
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark konsolidasi, join, dan pemuatan laporan.")
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='small',
+                        help="Skenario data sintetis. Default: 'small'")
+    parser.add_argument('--files', type=int, help="Jumlah file per sumber (menimpa skenario).")
+    parser.add_argument('--rows-per-file', type=int, help="Jumlah baris per file (menimpa skenario).")
+    parser.add_argument('--columns', type=int, help="Jumlah kolom data per sumber (menimpa skenario).")
+    parser.add_argument('--column-overlap', type=float,
+                        help="Porsi kolom yang dimiliki semua file, 0-1 (menimpa skenario).")
+    parser.add_argument('--key-cardinality', type=int, help="Jumlah nilai unik kunci merge (menimpa skenario).")
+    parser.add_argument('--key-skew', type=float, help="Eksponen Zipf kunci di Source B, 0 = seragam (menimpa skenario).")
+    parser.add_argument('--seed', type=int, default=0, help="Seed generator data. Default: 0")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES),
+                        help="Tahap yang dijalankan. Default: semua")
+    parser.add_argument('--repeat', type=int, default=1, help="Jumlah pengulangan setiap tahap. Default: 1")
+    parser.add_argument('-w', '--workers', type=int, default=1, help="Jumlah worker konsolidasi. Default: 1")
+    parser.add_argument('--chunk-rows', type=int, default=None, help="Jumlah baris per chunk.")
+    parser.add_argument('--partitions', type=int, default=None, help="Jumlah partisi join 'partitioned'.")
+    parser.add_argument('--workdir', default=None, help="Folder kerja data sintetis. Default: folder sementara")
+    parser.add_argument('--keep-data', action='store_true', help="Jangan hapus folder kerja setelah selesai.")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help="Folder file hasil JSON. Default: benchmarks/results/")
+    args = parser.parse_args()
+
+    scenario = dict(SCENARIOS[args.scenario])
+    for key in scenario:
+        if getattr(args, key) is not None:
+            scenario[key] = getattr(args, key)
+    options = {'workers': args.workers, 'chunk_rows': args.chunk_rows, 'partitions': args.partitions}
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix='csv-merger-bench-'))
+    try:
+        report = run_benchmarks(args.scenario, scenario, args.stages, workdir, options, args.repeat, args.seed)
+    finally:
+        if not args.keep_data:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    name = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{report['commit'] or 'nocommit'}_{args.scenario}.json"
+    output_file = os.path.join(args.output_dir, name)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nHasil benchmark disimpan di: '{output_file}'")
+
+
+if __name__ == "__main__":
+    main()
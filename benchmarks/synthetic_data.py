@@ -0,0 +1,94 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# Generator data CSV sintetis untuk benchmark
+# ==============================================================================
+# Data dibuat deterministik dari `seed`, jadi skenario yang sama selalu
+# menghasilkan file yang identik di setiap commit. Yang bisa diatur:
+# - jumlah file dan jumlah baris per file di setiap sumber
+# - jumlah kolom dan seberapa banyak kolom yang dimiliki semua file (overlap);
+#   sisanya hanya ada di sebagian file, kasus yang ditangani penggabungan skema
+# - jumlah nilai unik kunci merge dan kemiringan (skew) kunci duplikat di Source B
+
+SCENARIOS = {
+    'small': dict(files=4, rows_per_file=25_000, columns=12, column_overlap=0.5,
+                  key_cardinality=50_000, key_skew=0.0),
+    'medium': dict(files=8, rows_per_file=250_000, columns=20, column_overlap=0.5,
+                   key_cardinality=500_000, key_skew=0.0),
+    'wide': dict(files=16, rows_per_file=20_000, columns=80, column_overlap=0.1,
+                 key_cardinality=100_000, key_skew=0.0),
+    'skewed': dict(files=4, rows_per_file=100_000, columns=12, column_overlap=0.5,
+                   key_cardinality=100_000, key_skew=1.1),
+}
+
+KEY_COLUMN = 'id'
+
+_LABELS = np.array([f"label_{i:02d}" for i in range(20)])
+_START_DATE = np.datetime64('2024-01-01')
+
+
+def _column_values(rng, kind, rows):
+    if kind == 0:
+        return rng.integers(0, 10_000, rows)
+    if kind == 1:
+        return np.round(rng.normal(1_000, 250, rows), 2)
+    if kind == 2:
+        return rng.choice(_LABELS, rows)
+    return (_START_DATE + rng.integers(0, 365, rows)).astype(str)
+
+
+def _keys(rng, rows, key_cardinality, key_skew):
+    """Kunci merge: seragam jika skew = 0, selain itu mengikuti distribusi Zipf (kunci kecil paling sering)."""
+    if not key_skew:
+        return rng.integers(0, key_cardinality, rows)
+    weights = 1.0 / np.arange(1, key_cardinality + 1) ** key_skew
+    return rng.choice(key_cardinality, rows, p=weights / weights.sum())
+
+
+def generate_source(folder, side, files, rows_per_file, columns, column_overlap, key_cardinality, key_skew, seed):
+    """
+    Menulis `files` file CSV untuk satu sumber ke `folder`.
+
+    Returns:
+        int: Jumlah baris yang ditulis.
+    """
+    rng = np.random.default_rng(seed)
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+
+    names = [f"{side}_col{j:03d}" for j in range(columns)]
+    shared = max(1, round(columns * column_overlap))
+    for i in range(files):
+        # Kolom bersama ada di semua file; kolom lain masing-masing hanya ada di ~separuh file
+        optional = [name for name in names[shared:] if rng.random() < 0.5]
+        df = pd.DataFrame({KEY_COLUMN: _keys(rng, rows_per_file, key_cardinality, key_skew)})
+        df['status'] = rng.choice(_LABELS[:5], rows_per_file)
+        for name in names[:shared] + optional:
+            df[name] = _column_values(rng, names.index(name) % 4, rows_per_file)
+        df.to_csv(os.path.join(folder, f"{side}_{i:04d}.csv"), index=False)
+    return files * rows_per_file
+
+
+def generate_dataset(root, scenario, seed=0):
+    """
+    Membuat struktur `files/inputs/source-a` dan `source-b` di folder `root`,
+    sama seperti yang dipakai main_merge.py.
+
+    Kunci di Source A seragam; skew hanya diterapkan ke Source B agar jumlah
+    baris hasil join tetap wajar.
+
+    Returns:
+        dict: Path folder sumber dan jumlah baris yang dibuat.
+    """
+    inputs = os.path.join(root, 'files', 'inputs')
+    params = dict(scenario)
+    skew = params.pop('key_skew')
+    source_a = os.path.join(inputs, 'source-a')
+    source_b = os.path.join(inputs, 'source-b')
+    rows_a = generate_source(source_a, 'a', key_skew=0.0, seed=seed, **params)
+    rows_b = generate_source(source_b, 'b', key_skew=skew, seed=seed + 1, **params)
+    return {'source_a': source_a, 'source_b': source_b, 'rows_a': rows_a, 'rows_b': rows_b}
@@ -0,0 +1,159 @@
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# Cache LRU dengan batas memori dan TTL
+# ==============================================================================
+# Dashboard Streamlit melayani banyak sesi dalam satu proses server. Cache
+# bawaan Streamlit (st.cache_data) menyimpan setiap hasil selamanya, jadi semua
+# laporan yang pernah dibuka (beserta agregasinya) menumpuk di memori server.
+#
+# BoundedCache menyimpan nilai sampai total perkiraan ukurannya mencapai batas
+# byte; jika penuh, entri yang paling lama tidak dipakai dibuang lebih dulu
+# (LRU). Entri yang lebih tua dari TTL juga dibuang saat diakses atau saat cache
+# dibersihkan. Kunci entri laporan berisi path dan mtime laporannya, jadi entri
+# laporan yang sudah ditulis ulang tidak pernah terpakai lagi dan bisa dibuang
+# dengan `evict_where`.
+
+# Statistik cache: jumlah hit/miss, entri yang dibuang (karena penuh atau TTL),
+# nilai yang terlalu besar untuk disimpan, jumlah entri, dan pemakaian memori
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'evictions', 'expired', 'rejected', 'entries', 'bytes',
+                                       'max_bytes'])
+
+_Entry = namedtuple('_Entry', ['value', 'size', 'created'])
+
+
+def estimate_size(value):
+    """
+    Perkiraan memori (byte) yang dipakai sebuah nilai.
+
+    DataFrame/Series dihitung dengan memory_usage(deep=True), array NumPy dengan
+    nbytes, dict/list/tuple dijumlahkan per isi, objek lain dengan `nbytes` (jika
+    ada) atau sys.getsizeof.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return sys.getsizeof(value)
+
+
+class BoundedCache:
+    """
+    Cache LRU yang aman dipakai beberapa thread, dengan batas byte dan TTL.
+
+    Args:
+        max_bytes (int): Batas total perkiraan ukuran nilai yang disimpan.
+        ttl (float): Umur maksimal entri (detik); None = tanpa batas umur.
+        sizeof (callable): Fungsi perkiraan ukuran nilai (default `estimate_size`).
+    """
+
+    def __init__(self, max_bytes, ttl=None, sizeof=estimate_size):
+        self.max_bytes = int(max_bytes)
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._expired = self._rejected = 0
+
+    def _is_expired(self, entry, now):
+        return self.ttl is not None and now - entry.created > self.ttl
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get(self, key, default=None):
+        """Nilai untuk `key` (dan menandainya baru dipakai), atau `default` jika tidak ada/kedaluwarsa."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry, time.monotonic()):
+                self._remove(key)
+                self._expired += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def put(self, key, value, size=None):
+        """
+        Menyimpan nilai; entri yang paling lama tidak dipakai dibuang sampai muat.
+
+        Returns:
+            bool: False jika nilai lebih besar dari batas cache (tidak disimpan).
+        """
+        size = self.sizeof(value) if size is None else size
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                self._rejected += 1
+                return False
+            while self._entries and self._bytes + size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._evictions += 1
+            self._entries[key] = _Entry(value, size, time.monotonic())
+            self._bytes += size
+            return True
+
+    def get_or_compute(self, key, compute):
+        """
+        Nilai dari cache, atau hasil `compute()` yang lalu disimpan.
+
+        `compute` dijalankan di luar lock, jadi dua sesi yang meminta kunci yang
+        sama bersamaan bisa menghitungnya dua kali, tetapi tidak saling menunggu.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def evict_where(self, predicate):
+        """Membuang semua entri yang kuncinya memenuhi `predicate(key)`; mengembalikan jumlahnya."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def expire(self):
+        """Membuang semua entri yang sudah melewati TTL; mengembalikan jumlahnya."""
+        now = time.monotonic()
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if self._is_expired(entry, now)]
+            for key in keys:
+                self._remove(key)
+            self._expired += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Statistik cache saat ini (CacheStats)."""
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, self._expired, self._rejected,
+                              len(self._entries), self._bytes, self.max_bytes)
@@ -0,0 +1,200 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# ==============================================================================
+# Data grafik yang sudah diagregasi di sisi server
+# ==============================================================================
+# Grafik dashboard tidak pernah dikirimi nilai mentah sebuah kolom. Histogram,
+# total per kategori, dan sampel sebaran dihitung di sini dari dataset Arrow
+# laporan (lihat report_access.py), per record batch dengan kernel NumPy/Arrow,
+# sehingga memori yang dipakai hanya sebesar satu batch dan yang dikirim ke
+# browser hanya array hasil agregasi (puluhan sampai ribuan angka).
+#
+# `bin_edges` dan `bin_counts` juga dipakai oleh ringkasan laporan
+# (report_summary.py) dan histogram aplikasi desktop, jadi bin-nya sama di
+# semua tempat.
+
+DEFAULT_BINS = 20
+
+# Jumlah kategori terbanyak yang ditampilkan di bar chart; sisanya digabung
+TOP_CATEGORIES = 50
+OTHER_CATEGORY = '(lainnya)'
+
+# Jumlah titik maksimal sampel untuk grafik sebaran
+PREVIEW_POINTS = 5000
+
+CATEGORY_AGGREGATIONS = ('sum', 'mean', 'count')
+
+Histogram = namedtuple('Histogram', ['edges', 'counts'])
+
+
+def bin_edges(low, high, bins=DEFAULT_BINS):
+    """Batas `bins` bin selebar sama dari `low` sampai `high` (rentang kosong dilebarkan 0.5 ke kedua sisi)."""
+    low, high = float(low), float(high)
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+
+def bin_counts(values, edges):
+    """
+    Jumlah nilai per bin, seperti np.histogram(values, bins=edges).
+
+    Nilai kosong (NaN) dan nilai di luar rentang diabaikan; bin terakhir
+    menyertakan batas atasnya.
+    """
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    bins = len(edges) - 1
+    low, high = edges[0], edges[-1]
+    values = values[(values >= low) & (values <= high)]
+    # Bin selebar sama: nomor bin cukup dihitung dengan satu operasi vektor, tanpa pencarian biner
+    index = ((values - low) * (bins / (high - low))).astype(np.int64)
+    np.clip(index, 0, bins - 1, out=index)
+    # Koreksi pembulatan untuk nilai tepat di batas bin, seperti np.histogram
+    index[values < edges[index]] -= 1
+    index[(values >= edges[index + 1]) & (index != bins - 1)] += 1
+    return np.bincount(index, minlength=bins)
+
+
+def series_histogram(series, bins=DEFAULT_BINS):
+    """Histogram satu kolom angka yang sudah ada di memori (mis. laporan di aplikasi desktop); None jika kosong."""
+    values = pd.to_numeric(series, errors='coerce').dropna().to_numpy(dtype='float64')
+    if not len(values):
+        return None
+    edges = bin_edges(values.min(), values.max(), bins)
+    return Histogram(edges, bin_counts(values, edges))
+
+
+def _numeric(column):
+    """Kolom Arrow -> array float64 NumPy tanpa nilai kosong."""
+    column = pc.drop_null(column)
+    if pa.types.is_boolean(column.type):
+        column = column.cast(pa.int8())
+    return column.to_numpy(zero_copy_only=False).astype('float64', copy=False)
+
+
+def _value_range(reader, column):
+    low = high = None
+    for table in reader.tables([column]):
+        result = pc.min_max(table.column(column))
+        if result['min'].is_valid:
+            low = result['min'].as_py() if low is None else min(low, result['min'].as_py())
+            high = result['max'].as_py() if high is None else max(high, result['max'].as_py())
+    return low, high
+
+
+def column_histogram(reader, column, bins=DEFAULT_BINS, value_range=None):
+    """
+    Histogram satu kolom angka sebuah laporan, dihitung per record batch.
+
+    Args:
+        reader (ReportReader): Pembaca laporan.
+        column (str): Kolom angka.
+        bins (int): Jumlah bin.
+        value_range (tuple): (min, max) kolom jika sudah diketahui (mis. dari
+            ringkasan laporan); jika kosong, dihitung dengan satu kali baca tambahan.
+
+    Returns:
+        Histogram: Batas bin dan jumlah nilai per bin, atau None jika kolom kosong.
+    """
+    low, high = value_range if value_range else _value_range(reader, column)
+    if low is None or high is None:
+        return None
+    edges = bin_edges(low, high, bins)
+    counts = np.zeros(bins, dtype=np.int64)
+    for table in reader.tables([column]):
+        counts += bin_counts(_numeric(table.column(column)), edges)
+    return Histogram(edges, counts)
+
+
+def _category_keys(column):
+    # Kategori (dictionary) dan nilai lain dikelompokkan sebagai teks, seperti label di grafik
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    return column if pa.types.is_string(column.type) else pc.cast(column, pa.string())
+
+
+def category_totals(reader, category_col, value_col, aggregation='sum', top=TOP_CATEGORIES):
+    """
+    Agregasi kolom angka per kategori, dihitung per record batch dengan group_by Arrow.
+
+    Args:
+        reader (ReportReader): Pembaca laporan.
+        category_col (str): Kolom kategori (sumbu X).
+        value_col (str): Kolom angka (sumbu Y).
+        aggregation (str): 'sum', 'mean', atau 'count' (jumlah nilai yang tidak kosong).
+        top (int): Jumlah kategori dengan nilai terbesar yang ditampilkan; sisanya
+            digabung menjadi satu kategori OTHER_CATEGORY. None = semua kategori.
+
+    Returns:
+        pd.DataFrame: Kolom `category_col` dan `value_col`, diurutkan dari nilai terbesar.
+    """
+    partials = []
+    for table in reader.tables([category_col, value_col]):
+        keys = _category_keys(table.column(category_col))
+        values = table.column(value_col)
+        if pa.types.is_boolean(values.type):
+            values = values.cast(pa.int8())
+        batch = pa.table({'key': keys, 'value': values}).filter(pc.is_valid(keys))
+        partials.append(batch.group_by('key').aggregate([('value', 'sum'), ('value', 'count')]))
+    if not partials:
+        return pd.DataFrame({category_col: [], value_col: []})
+
+    # Hasil per batch digabung lagi: total dan jumlah nilai dijumlahkan per kategori
+    grouped = pa.concat_tables(partials).group_by('key').aggregate([('value_sum', 'sum'), ('value_count', 'sum')])
+    totals = pd.DataFrame({'key': grouped.column('key').to_pandas(),
+                           'total': grouped.column('value_sum_sum').to_pandas().fillna(0),
+                           'count': grouped.column('value_count_sum').to_pandas()})
+    totals['value'] = _aggregate(totals, aggregation)
+    totals = totals.sort_values('value', ascending=False, kind='stable')
+    if top and len(totals) > top:
+        rest = totals.iloc[top - 1:]
+        other = pd.DataFrame({'key': [OTHER_CATEGORY], 'total': [rest['total'].sum()], 'count': [rest['count'].sum()]})
+        other['value'] = _aggregate(other, aggregation)
+        totals = pd.concat([totals.iloc[:top - 1], other], ignore_index=True)
+    return pd.DataFrame({category_col: totals['key'].to_numpy(), value_col: totals['value'].to_numpy()})
+
+
+def _aggregate(totals, aggregation):
+    if aggregation == 'count':
+        return totals['count']
+    if aggregation == 'mean':
+        return totals['total'] / totals['count'].where(totals['count'] > 0)
+    return totals['total']
+
+
+def preview_rows(reader, columns, max_points=PREVIEW_POINTS):
+    """
+    Sampel baris berjarak sama di seluruh laporan (untuk grafik sebaran).
+
+    Hanya kolom `columns` dari baris yang terpilih yang dibaca; laporan yang
+    lebih kecil dari `max_points` dikembalikan utuh.
+
+    Returns:
+        pd.DataFrame: Paling banyak `max_points` baris, index = nomor baris di laporan.
+    """
+    step = max(1, -(-reader.num_rows // max_points))
+    frames = []
+    for part_start, table in _tables_with_offsets(reader, columns):
+        # Baris ke-k*step pertama yang jatuh di tabel ini
+        first = -part_start % step
+        positions = np.arange(first, table.num_rows, step)
+        if len(positions):
+            df = reader.to_frame(table.take(pa.array(positions)))
+            df.index = part_start + positions
+            frames.append(df)
+    if not frames:
+        return reader.page(0, 0, columns)
+    return pd.concat(frames)
+
+
+def _tables_with_offsets(reader, columns):
+    start = 0
+    for table in reader.tables(columns):
+        yield start, table
+        start += table.num_rows
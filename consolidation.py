@@ -0,0 +1,592 @@
+import glob
+import os
+import re
+import shutil
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from arrow_store import ARROW_SUFFIX, create_dataset, is_arrow_path, write_frames
+from csv_reader import read_header
+from input_sources import input_size, list_input_files, open_input
+from manifest import SourceCache, source_cache_dir
+from merge_keys import KEY_HASH_VERSION
+from metrics import RunMetrics, add_time, measure, timed
+from pushdown import RowPredicate, chain_filters
+from schema_inference import infer_schema, read_csv_chunks, read_csv_kwargs, save_schema, widen_schema
+
+# ==============================================================================
+# Konsolidasi CSV secara streaming (per potongan baris)
+# ==============================================================================
+# Setiap file input dibaca per potongan (chunk) berisi sejumlah baris tetap,
+# di-reindex ke daftar kolom gabungan, lalu langsung ditambahkan ke file output.
+# Dengan begitu pemakaian memori puncak hanya bergantung pada ukuran chunk,
+# bukan pada ukuran file input terbesar.
+#
+# Sebelum itu, dtype setiap kolom ditentukan sekali dari sampel semua file
+# (lihat schema_inference.py) dan dipakai untuk setiap chunk, sehingga dtype
+# tidak ditebak ulang per file/chunk. Peta dtype disimpan di samping output.
+#
+# Output berakhiran `.arrow` ditulis sebagai dataset Arrow IPC (lihat
+# arrow_store.py), selain itu sebagai file CSV. Untuk output Arrow, hasil
+# parsing per file bisa di-cache (lihat manifest.py) sehingga run berikutnya
+# hanya mem-parsing file yang baru atau berubah.
+#
+# Dengan --columns / --where (lihat pushdown.py), hanya kolom yang dibutuhkan
+# yang di-parsing dan baris yang tidak lolos filter dibuang per chunk, sebelum
+# ditulis ke output. Kolom kunci merge gabungan/ternormalisasi (lihat
+# merge_keys.py) dinormalisasi per chunk sebelum filter itu.
+#
+# Setiap tahap (scan header, inferensi skema, parsing per file, penyambungan)
+# diukur dan dicatat ke RunMetrics (lihat metrics.py). Parsing per file diukur
+# di proses yang mengerjakannya, termasuk worker process pool.
+
+# Jumlah baris per chunk jika tidak ada pengaturan --chunk-rows / --max-memory
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Faktor pengali memori per chunk: chunk hasil parsing, salinan hasil reindex,
+# dan buffer teks CSV saat ditulis hidup bersamaan di memori.
+_CHUNK_MEMORY_FACTOR = 3
+
+# Rencana konsolidasi untuk satu folder sumber
+_SourcePlan = namedtuple('_SourcePlan', ['input_path', 'output_file', 'files', 'columns', 'schema', 'chunk_rows',
+                                         'cache', 'row_filter', 'read_options', 'projected', 'predicate', 'key'])
+
+_MEMORY_UNITS = {
+    '': 1,
+    'B': 1,
+    'K': 1024, 'KB': 1024,
+    'M': 1024 ** 2, 'MB': 1024 ** 2,
+    'G': 1024 ** 3, 'GB': 1024 ** 3,
+}
+
+
+def parse_memory_size(value):
+    """
+    Mengubah batas memori seperti '512MB', '2G' atau 1048576 menjadi jumlah byte.
+
+    Args:
+        value (str | int): Ukuran memori, angka (byte) atau angka dengan satuan.
+
+    Returns:
+        int: Ukuran dalam byte.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r'\s*([\d.]+)\s*([A-Za-z]*)\s*', str(value))
+    unit = match.group(2).upper() if match else None
+    if not match or unit not in _MEMORY_UNITS:
+        raise ValueError(f"Format batas memori tidak dikenali: '{value}' (contoh: 512MB, 2G)")
+    return int(float(match.group(1)) * _MEMORY_UNITS[unit])
+
+
+def list_csv_files(input_path, recursive=False, log=print):
+    """
+    Mendapatkan daftar file CSV di dalam folder, diurutkan berdasarkan path.
+
+    File `.csv.gz`, `.csv.zst`, dan CSV di dalam arsip `.zip` ikut didaftar
+    (lihat input_sources.py); dengan `recursive`, subfolder juga dicari.
+    """
+    return list_input_files(input_path, recursive, log)
+
+
+def collect_columns(files, log=print):
+    """
+    Mengumpulkan semua header unik dari daftar file CSV.
+
+    Returns:
+        list: Daftar kolom gabungan yang sudah diurutkan.
+    """
+    all_columns = set()
+    for f in files:
+        try:
+            all_columns.update(read_header(f))
+        except Exception as e:
+            log(f"❌ Gagal membaca header dari {os.path.basename(f)}: {e}")
+    return sorted(all_columns)
+
+
+def estimate_chunk_rows(files, columns, max_memory, sample_rows=1000, schema=None):
+    """
+    Menghitung jumlah baris per chunk agar satu chunk muat dalam batas memori.
+
+    Ukuran per baris diperkirakan dari sampel baris pertama file input
+    (dibaca dengan peta dtype `schema`) setelah di-reindex ke kolom gabungan.
+    """
+    budget = parse_memory_size(max_memory)
+    bytes_per_row = 0
+    for f in files:
+        try:
+            header = read_header(f)
+            with open_input(f, readahead=False) as source:
+                sample = pd.read_csv(source, nrows=sample_rows, **read_csv_kwargs(schema, header))
+            sample = sample.reindex(columns=columns)
+        except Exception:
+            continue
+        if len(sample):
+            bytes_per_row = max(bytes_per_row, sample.memory_usage(index=False, deep=True).sum() / len(sample))
+            break
+    if not bytes_per_row:
+        # Tanpa sampel, asumsikan 64 byte per sel
+        bytes_per_row = 64 * max(len(columns), 1)
+    return max(1, int(budget // (bytes_per_row * _CHUNK_MEMORY_FACTOR)))
+
+
+def resolve_chunk_rows(files, columns, chunk_rows=None, max_memory=None, schema=None):
+    """
+    Menentukan ukuran chunk dari pengaturan --chunk-rows dan/atau --max-memory.
+
+    Jika keduanya diisi, dipakai nilai yang paling kecil.
+    """
+    candidates = []
+    if chunk_rows:
+        candidates.append(int(chunk_rows))
+    if max_memory:
+        candidates.append(estimate_chunk_rows(files, columns, max_memory, schema=schema))
+    return min(candidates) if candidates else DEFAULT_CHUNK_ROWS
+
+
+def write_header(columns, output_file):
+    """Membuat file output baru yang hanya berisi baris header."""
+    pd.DataFrame(columns=columns).to_csv(output_file, index=False, encoding='utf-8')
+
+
+def _with_schema_fallback(write, schema, undo):
+    """
+    Menjalankan `write(schema)`; jika gagal karena data tidak cocok dengan peta
+    dtype (mis. ada teks di kolom angka di luar sampel), hasil tulis dibatalkan
+    dengan `undo()` lalu diulang dengan peta dtype yang lebih longgar, dan
+    terakhir tanpa peta dtype sama sekali.
+
+    Jika percobaan terakhir (atau kesalahan lain) tetap gagal, hasil tulis juga
+    dibatalkan sebelum exception dilempar ulang, sehingga file yang gagal tidak
+    meninggalkan baris setengah jadi di output.
+    """
+    attempts = [schema]
+    if schema:
+        attempts += [widen_schema(schema), None]
+    for i, attempt in enumerate(attempts):
+        try:
+            return write(attempt)
+        except Exception as e:
+            undo()
+            if i == len(attempts) - 1 or not isinstance(e, (ValueError, TypeError, OverflowError)):
+                raise
+
+
+def _read_chunks(file_path, dtypes, chunk_rows, row_filter, timings, read_options=None, columns=None):
+    """
+    Chunk hasil parsing satu file; jika ada `row_filter`, baris yang tidak lolos langsung dibuang.
+
+    Dengan `columns`, hanya kolom itu (ditambah kolom yang dibutuhkan filter)
+    yang di-parsing; kolom tambahan untuk filter dibuang setelah filter diterapkan.
+    """
+    read_columns = columns
+    if columns is not None and row_filter is not None:
+        read_columns = list(dict.fromkeys(list(columns) + row_filter.columns))
+    chunks = read_csv_chunks(file_path, dtypes, chunk_rows, read_options, read_columns)
+    for chunk in timed(chunks, timings, 'parse_s'):
+        if row_filter is not None:
+            with add_time(timings, 'filter_s'):
+                kept = row_filter.filter_frame(chunk)
+            if timings is not None:
+                timings['rows_skipped'] = timings.get('rows_skipped', 0) + len(chunk) - len(kept)
+            chunk = kept
+        if read_columns is not columns:
+            chunk = chunk[[col for col in chunk.columns if col in columns]]
+        yield chunk
+
+
+def append_file_in_chunks(file_path, columns, output_file, chunk_rows, schema=None, timings=None, row_filter=None,
+                          read_options=None, project=False):
+    """
+    Membaca satu file CSV per chunk, me-reindex setiap chunk ke kolom gabungan,
+    lalu menambahkannya ke file output.
+
+    Args:
+        timings (dict): Jika diisi, lama parsing, filter, reindex, dan penulisan
+            (detik) ditambahkan ke kunci 'parse_s', 'filter_s', 'reindex_s', dan
+            'write_s'; jumlah baris yang dibuang filter ke 'rows_skipped'.
+        row_filter: Filter baris, mis. KeyFilter semi-join atau RowPredicate --where
+            (opsional, lihat key_filter.py dan pushdown.py).
+        read_options (CsvReadOptions): Mesin baca CSV (opsional, lihat csv_reader.py).
+        project (bool): Hanya kolom `columns` yang di-parsing (--columns).
+
+    Returns:
+        int: Jumlah baris yang ditambahkan.
+    """
+    start_size = os.path.getsize(output_file)
+
+    def write(dtypes):
+        total_rows = 0
+        for chunk in _read_chunks(file_path, dtypes, chunk_rows, row_filter, timings, read_options,
+                                  columns if project else None):
+            with add_time(timings, 'reindex_s'):
+                chunk = chunk.reindex(columns=columns)
+            with add_time(timings, 'write_s'):
+                chunk.to_csv(output_file, mode='a', header=False, index=False, encoding='utf-8')
+            total_rows += len(chunk)
+        return total_rows
+
+    return _with_schema_fallback(write, schema, lambda: os.truncate(output_file, start_size))
+
+
+def _dataset_parts(dataset_path, part_prefix):
+    return glob.glob(os.path.join(dataset_path, f"{part_prefix}-*{ARROW_SUFFIX}"))
+
+
+def append_file_to_dataset(file_path, dataset_path, part_prefix, chunk_rows, schema=None, timings=None,
+                           row_filter=None, read_options=None, columns=None):
+    """
+    Membaca satu file CSV per chunk dan menulis setiap chunk sebagai record batch
+    ke part `part_prefix` di folder dataset Arrow. Kolom yang tidak dimiliki file
+    ini diisi null saat dataset dibaca, jadi chunk tidak perlu di-reindex.
+
+    Args:
+        timings (dict): Jika diisi, lama parsing, filter, dan penulisan (detik)
+            ditambahkan ke kunci 'parse_s', 'filter_s', dan 'write_s'; jumlah
+            baris yang dibuang filter ke 'rows_skipped'.
+        row_filter: Filter baris, mis. KeyFilter semi-join atau RowPredicate --where
+            (opsional, lihat key_filter.py dan pushdown.py).
+        read_options (CsvReadOptions): Mesin baca CSV (opsional, lihat csv_reader.py).
+        columns (list): Jika diisi, hanya kolom ini yang di-parsing (--columns).
+
+    Returns:
+        int: Jumlah baris yang ditambahkan.
+    """
+    def undo():
+        for part in _dataset_parts(dataset_path, part_prefix):
+            os.remove(part)
+
+    def write(dtypes):
+        before = sum((timings or {}).get(key, 0.0) for key in ('parse_s', 'filter_s'))
+        with add_time(timings, 'write_s'):
+            rows = write_frames(_read_chunks(file_path, dtypes, chunk_rows, row_filter, timings, read_options, columns),
+                                dataset_path, part_prefix)
+        if timings is not None:
+            # Parsing dan filter terjadi di dalam write_frames; sisakan hanya waktu penulisan
+            timings['write_s'] -= sum(timings.get(key, 0.0) for key in ('parse_s', 'filter_s')) - before
+        return rows
+
+    return _with_schema_fallback(write, schema, undo)
+
+
+def resolve_workers(workers):
+    """Mengubah nilai --workers menjadi jumlah proses; 0 atau None berarti semua core CPU."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def _prepare_source(input_path, output_file, chunk_rows, max_memory, workers, cache_dir, row_filter, read_options,
+                    recursive, columns, where, files, key, metrics, log):
+    """Memeriksa folder sumber dan menyiapkan daftar file, kolom gabungan, peta dtype, serta ukuran chunk."""
+    if not os.path.isdir(input_path):
+        log(f"⚠️  Folder input '{input_path}' tidak ditemukan.")
+        return None
+
+    all_files = list(files) if files is not None else list_csv_files(input_path, recursive, log)
+    if not all_files:
+        log(f"⚠️  Tidak ada file CSV di '{input_path}'.")
+        return None
+
+    predicate = RowPredicate(where) if where else None
+    if key is not None and key.plain:
+        # Kunci satu kolom tanpa normalisasi tidak mengubah data
+        key = None
+    # Kolom yang perlu di-parsing: kolom --columns ditambah kolom yang dipakai filter --where dan kolom kunci
+    read_columns = None
+    if columns:
+        extra = (predicate.columns if predicate else []) + (key.columns if key else [])
+        read_columns = list(dict.fromkeys(list(columns) + extra))
+
+    cache = None
+    if cache_dir and is_arrow_path(output_file) and files is None:
+        # Header file yang tidak berubah diambil dari manifest, tidak dibaca ulang.
+        # Scan header dan sampel dtype file baru terjadi di dalam SourceCache.
+        # Part di cache hanya berisi kolom dan baris yang lolos --columns / --where
+        # (dengan kunci yang sudah dinormalisasi), jadi cache dibangun ulang jika
+        # pengaturan itu berubah.
+        settings = {name: value for name, value in (('columns', columns), ('where', where),
+                                                     ('key', key.text if key else None),
+                                                     ('key_hash', KEY_HASH_VERSION if key and key.hashed else None))
+                    if value}
+        with metrics.stage('header_scan', source=input_path, files=len(all_files)):
+            cache = SourceCache(source_cache_dir(cache_dir, input_path), all_files, settings, read_columns, log)
+        final_columns = cache.columns
+        schema = cache.dtypes
+        log(f"ℹ️  Cache '{input_path}': {len(all_files) - len(cache.pending)} file tidak berubah, "
+            f"{len(cache.pending)} file baru/berubah.")
+        if cache.schema_changed:
+            log(f"ℹ️  Skema kolom gabungan diperbarui: {len(final_columns)} kolom.")
+    else:
+        with metrics.stage('header_scan', source=input_path, files=len(all_files)):
+            final_columns = collect_columns(all_files, log=log)
+        with metrics.stage('schema_inference', source=input_path, files=len(all_files)):
+            schema = infer_schema(all_files, columns=read_columns, log=log)
+
+    if predicate and not set(predicate.columns) <= set(final_columns):
+        missing = ', '.join(col for col in predicate.columns if col not in final_columns)
+        log(f"⚠️  Kolom filter --where ({missing}) tidak ada di '{input_path}'; filter baris tidak dipakai "
+            f"untuk sumber ini.")
+        predicate = None
+    if columns:
+        final_columns = [col for col in final_columns if col in columns]
+        log(f"ℹ️  '{input_path}': {len(final_columns)} kolom dipilih dengan --columns.")
+    if key:
+        missing = [col for col in key.columns if col not in final_columns]
+        if missing:
+            log(f"⚠️  Kolom kunci {', '.join(missing)} tidak ada di '{input_path}'; nilainya dianggap kosong.")
+        final_columns = key.output_columns(final_columns)
+
+    if max_memory:
+        # Setiap proses worker memegang satu chunk, jadi batas memori dibagi rata
+        max_memory = max(1, parse_memory_size(max_memory) // workers)
+    with metrics.stage('chunk_sizing', source=input_path):
+        rows_per_chunk = resolve_chunk_rows(all_files, final_columns, chunk_rows, max_memory, schema)
+    return _SourcePlan(input_path, output_file, all_files, final_columns, schema, rows_per_chunk, cache, row_filter,
+                       read_options, bool(columns), predicate, key)
+
+
+def _parse_tasks(plan):
+    """Daftar (file input, folder tujuan part, prefix part) untuk file yang perlu di-parsing ke Arrow."""
+    if plan.cache:
+        return [(f, plan.cache.dir, plan.cache.part_prefix(f)) for f in plan.cache.pending]
+    return [(f, plan.output_file, f"{i:06d}") for i, f in enumerate(plan.files)]
+
+
+def _parse_filter(plan):
+    """
+    Filter yang dipakai saat parsing: normalisasi kunci merge (tidak membuang
+    baris), filter --where, dan filter semi-join. Part di cache tidak difilter
+    semi-join agar tetap bisa dipakai ulang; untuk sumber dengan cache, filter
+    semi-join diterapkan saat part dimasukkan ke dataset (lihat SourceCache.link_into).
+    """
+    return chain_filters(plan.key, plan.predicate, None if plan.cache else plan.row_filter)
+
+
+def _output_schema(plan):
+    """Peta dtype hasil konsolidasi (dtype kolom kunci setelah normalisasi, lihat merge_keys.py)."""
+    return plan.key.output_dtypes(plan.schema) if plan.key else plan.schema
+
+
+def _parse_columns(plan):
+    """Kolom yang di-parsing dari setiap file (None = semua kolom)."""
+    return plan.columns if plan.projected else None
+
+
+def _parse_to_csv(file_path, columns, output_file, chunk_rows, schema, row_filter=None, read_options=None,
+                  project=False):
+    """Menambahkan satu file ke output CSV sambil mengukurnya; mengembalikan record metrik."""
+    with measure('parse_file', file=os.path.basename(file_path), bytes_read=input_size(file_path)) as record:
+        start_size = os.path.getsize(output_file)
+        timings = {}
+        record['rows'] = append_file_in_chunks(file_path, columns, output_file, chunk_rows, schema, timings,
+                                               row_filter, read_options, project)
+        record.update(timings)
+        record['bytes_written'] = os.path.getsize(output_file) - start_size
+    return record
+
+
+def _parse_to_dataset(file_path, dataset_path, part_prefix, chunk_rows, schema, row_filter=None, read_options=None,
+                      columns=None):
+    """Menulis satu file ke dataset Arrow sambil mengukurnya; mengembalikan record metrik."""
+    with measure('parse_file', file=os.path.basename(file_path), bytes_read=input_size(file_path)) as record:
+        timings = {}
+        record['rows'] = append_file_to_dataset(file_path, dataset_path, part_prefix, chunk_rows, schema, timings,
+                                                row_filter, read_options, columns)
+        record.update(timings)
+        record['bytes_written'] = sum(os.path.getsize(p) for p in _dataset_parts(dataset_path, part_prefix))
+    return record
+
+
+def _add_parse_record(metrics, plan, record, done, log):
+    record['source'] = plan.input_path
+    metrics.add(record, done, len(plan.files) if plan.cache is None else len(plan.cache.pending))
+    skipped = f", {record['rows_skipped']} baris dilewati filter" if record.get('rows_skipped') else ""
+    log(f"  -> Memproses: {record['file']} ({record['rows']} baris{skipped})")
+    return record['rows']
+
+
+def _finish_dataset(plan, parsed_rows, metrics, log):
+    """Melengkapi dataset Arrow dengan part dari cache lalu menyimpan manifest."""
+    if plan.cache:
+        for f, rows in parsed_rows.items():
+            plan.cache.record(f, rows)
+        with metrics.stage('link_cache', source=plan.input_path, files=len(plan.files)) as record:
+            record['rows_skipped'] = plan.cache.link_into(plan.output_file, plan.row_filter)
+            plan.cache.save()
+        if plan.row_filter is not None:
+            log(f"  -> Filter semi-join: {record['rows_skipped']} baris '{plan.input_path}' dilewati")
+        for f in plan.files:
+            if f not in parsed_rows and plan.cache.is_cached(f):
+                log(f"  -> Dari cache: {os.path.basename(f)} ({plan.cache.rows(f)} baris)")
+    save_schema(_output_schema(plan), plan.output_file)
+    log(f"✅  Konsolidasi '{plan.input_path}' berhasil. Disimpan di '{plan.output_file}'")
+    return True
+
+
+def _consolidate_sequential(plan, metrics, log):
+    """Menjalankan konsolidasi satu sumber, file demi file, di proses saat ini."""
+    if not is_arrow_path(plan.output_file):
+        write_header(plan.columns, plan.output_file)
+        for done, f in enumerate(plan.files, 1):
+            record = _parse_to_csv(f, plan.columns, plan.output_file, plan.chunk_rows, plan.schema, _parse_filter(plan),
+                                   plan.read_options, plan.projected)
+            _add_parse_record(metrics, plan, record, done, log)
+        save_schema(_output_schema(plan), plan.output_file)
+        log(f"✅  Konsolidasi '{plan.input_path}' berhasil. Disimpan di '{plan.output_file}'")
+        return True
+
+    create_dataset(plan.output_file, plan.columns)
+    parsed_rows = {}
+    for done, (f, target, prefix) in enumerate(_parse_tasks(plan), 1):
+        record = _parse_to_dataset(f, target, prefix, plan.chunk_rows, plan.schema, _parse_filter(plan),
+                                   plan.read_options, _parse_columns(plan))
+        parsed_rows[f] = _add_parse_record(metrics, plan, record, done, log)
+    return _finish_dataset(plan, parsed_rows, metrics, log)
+
+
+def _write_part(file_path, columns, part_file, chunk_rows, schema, row_filter=None, read_options=None, project=False):
+    """Dijalankan di proses worker: mengubah satu file input menjadi part CSV tanpa header."""
+    open(part_file, 'w').close()
+    return _parse_to_csv(file_path, columns, part_file, chunk_rows, schema, row_filter, read_options, project)
+
+
+def _parts_dir(output_file):
+    return f"{output_file}.parts"
+
+
+def _submit_parts(pool, plan):
+    """Mengirim setiap file sumber ke process pool; satu file menghasilkan satu part."""
+    if is_arrow_path(plan.output_file):
+        # Part Arrow langsung ditulis ke dataset tujuan (atau cache), urutannya dijaga oleh nama part
+        create_dataset(plan.output_file, plan.columns)
+        return [(f, None, pool.submit(_parse_to_dataset, f, target, prefix, plan.chunk_rows, plan.schema,
+                                      _parse_filter(plan), plan.read_options, _parse_columns(plan)))
+                for f, target, prefix in _parse_tasks(plan)]
+
+    parts_dir = _parts_dir(plan.output_file)
+    os.makedirs(parts_dir, exist_ok=True)
+    futures = []
+    for i, f in enumerate(plan.files):
+        part_file = os.path.join(parts_dir, f"{i:06d}.csv")
+        futures.append((f, part_file, pool.submit(_write_part, f, plan.columns, part_file, plan.chunk_rows,
+                                                        plan.schema, _parse_filter(plan), plan.read_options,
+                                                        plan.projected)))
+    return futures
+
+
+def _assemble_parts(plan, futures, metrics, log):
+    """Menyambung part ke file output sesuai urutan file, sehingga urutan baris tetap deterministik."""
+    if is_arrow_path(plan.output_file):
+        parsed_rows = {}
+        for done, (f, _, future) in enumerate(futures, 1):
+            parsed_rows[f] = _add_parse_record(metrics, plan, future.result(), done, log)
+        return _finish_dataset(plan, parsed_rows, metrics, log)
+
+    write_header(plan.columns, plan.output_file)
+    with open(plan.output_file, 'ab') as out:
+        for done, (f, part_file, future) in enumerate(futures, 1):
+            _add_parse_record(metrics, plan, future.result(), done, log)
+            with metrics.stage('append_part', source=plan.input_path, file=os.path.basename(f),
+                               bytes_written=os.path.getsize(part_file)):
+                with open(part_file, 'rb') as part:
+                    shutil.copyfileobj(part, out)
+            os.remove(part_file)
+    shutil.rmtree(_parts_dir(plan.output_file), ignore_errors=True)
+    save_schema(_output_schema(plan), plan.output_file)
+    log(f"✅  Konsolidasi '{plan.input_path}' berhasil. Disimpan di '{plan.output_file}'")
+    return True
+
+
+def consolidate_sources(jobs, chunk_rows=None, max_memory=None, workers=1, cache_dir=None, row_filter=None,
+                        read_options=None, recursive=False, columns=None, where=None, files=None, key=None,
+                        metrics=None, log=print):
+    """
+    Mengkonsolidasi beberapa folder sumber sekaligus.
+
+    Dengan workers > 1, parsing dan reindex setiap file dijalankan paralel di
+    process pool yang sama untuk semua sumber, sehingga Source A dan Source B
+    diproses bersamaan. Hasil tiap file ditulis ke part terpisah lalu disambung
+    sesuai urutan file, jadi urutan baris output sama dengan mode sekuensial.
+
+    Args:
+        jobs (list): Daftar pasangan (folder input, file output). Output berakhiran
+            `.arrow` ditulis sebagai dataset Arrow IPC, selain itu sebagai CSV.
+        chunk_rows (int): Jumlah baris per chunk (opsional).
+        max_memory (str | int): Batas memori total untuk chunk yang sedang diproses (opsional).
+        workers (int): Jumlah proses paralel; 0 berarti semua core CPU.
+        cache_dir (str): Folder cache inkremental untuk output Arrow (opsional).
+        row_filter (KeyFilter): Filter semi-join; baris yang tidak lolos tidak
+            ditulis ke output (opsional, lihat key_filter.py).
+        read_options (CsvReadOptions): Mesin baca CSV (opsional, lihat csv_reader.py).
+        recursive (bool): Ikut mencari file input di subfolder.
+        columns (list): Hanya kolom ini yang di-parsing dan ditulis (opsional, --columns).
+        where (str): Ekspresi filter baris (opsional, --where, lihat pushdown.py). Tidak
+            dipakai untuk sumber yang tidak punya semua kolom di ekspresi.
+        files (list): File input yang dikonsolidasi, menggantikan pencarian file di
+            folder (opsional; mis. hanya file baru di mode pantau, lihat watch_mode.py).
+            Berlaku untuk setiap pasangan di `jobs` dan tidak memakai cache.
+        key (MergeKey): Kunci merge yang kolomnya dinormalisasi (dan di-hash) per
+            chunk saat konsolidasi (opsional, lihat merge_keys.py).
+        metrics (RunMetrics): Tempat mencatat metrik setiap tahap (opsional).
+        log (callable): Fungsi untuk menampilkan pesan progres.
+
+    Returns:
+        list: Status berhasil (bool) untuk setiap pasangan di `jobs`.
+    """
+    workers = resolve_workers(workers)
+    metrics = metrics or RunMetrics('consolidation')
+    plans = [_prepare_source(input_path, output_file, chunk_rows, max_memory, workers, cache_dir, row_filter,
+                             read_options, recursive, columns, where, files, key, metrics, log)
+             for input_path, output_file in jobs]
+
+    if workers == 1 or not any(plan and (plan.cache is None or plan.cache.pending) for plan in plans):
+        return [_consolidate_sequential(plan, metrics, log) if plan else False for plan in plans]
+
+    log(f"Menjalankan konsolidasi paralel dengan {workers} worker...")
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        submitted = [_submit_parts(pool, plan) if plan else None for plan in plans]
+        results = [_assemble_parts(plan, futures, metrics, log) if plan else False
+                   for plan, futures in zip(plans, submitted)]
+    except BaseException:
+        pool.shutdown(wait=True, cancel_futures=True)
+        for plan in plans:
+            if plan:
+                shutil.rmtree(_parts_dir(plan.output_file), ignore_errors=True)
+        raise
+    pool.shutdown(wait=True)
+    return results
+
+
+def consolidate_folder(input_path, output_file, chunk_rows=None, max_memory=None, workers=1, cache_dir=None,
+                       row_filter=None, read_options=None, recursive=False, columns=None, where=None, metrics=None,
+                       log=print):
+    """
+    Mengkonsolidasi semua file CSV dalam satu folder secara streaming.
+
+    Args:
+        input_path (str): Folder yang berisi file CSV (boleh terkompresi atau di dalam arsip .zip).
+        output_file (str): File CSV atau dataset `.arrow` hasil konsolidasi.
+        chunk_rows (int): Jumlah baris per chunk (opsional).
+        max_memory (str | int): Batas memori per chunk, mis. '512MB' (opsional).
+        workers (int): Jumlah proses paralel; 0 berarti semua core CPU.
+        cache_dir (str): Folder cache inkremental untuk output Arrow (opsional).
+        row_filter (KeyFilter): Filter semi-join (opsional, lihat key_filter.py).
+        read_options (CsvReadOptions): Mesin baca CSV (opsional, lihat csv_reader.py).
+        recursive (bool): Ikut mencari file input di subfolder.
+        columns (list): Hanya kolom ini yang di-parsing dan ditulis (opsional, --columns).
+        where (str): Ekspresi filter baris (opsional, --where, lihat pushdown.py). Tidak
+            dipakai untuk sumber yang tidak punya semua kolom di ekspresi.
+        metrics (RunMetrics): Tempat mencatat metrik setiap tahap (opsional).
+        log (callable): Fungsi untuk menampilkan pesan progres.
+
+    Returns:
+        bool: True jika konsolidasi berhasil, False jika folder/file tidak ada.
+        Kesalahan saat membaca atau menulis data dilempar sebagai exception.
+    """
+    return consolidate_sources([(input_path, output_file)], chunk_rows, max_memory, workers, cache_dir, row_filter,
+                               read_options, recursive, columns, where, metrics=metrics, log=log)[0]
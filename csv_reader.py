@@ -0,0 +1,243 @@
+import csv
+import io
+import warnings
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+from input_sources import archive_member, is_compressed, open_input
+
+# ==============================================================================
+# Mesin pembaca CSV: pandas atau pyarrow.csv
+# ==============================================================================
+# Semua pembacaan CSV (konsolidasi, pembuatan dataset laporan, dan pemuatan
+# laporan di aplikasi desktop) lewat modul ini. Mesin 'pandas' memakai parser C
+# pandas (satu thread). Mesin 'pyarrow' memakai pyarrow.csv: teks dibaca per
+# blok dan setiap blok di-parsing oleh beberapa thread sekaligus, lalu hasilnya
+# diubah ke DataFrame dengan dtype yang sama seperti pandas:
+#
+# - kolom yang ada di peta dtype langsung di-parsing ke tipe Arrow yang sesuai,
+# - kolom tanggal dibaca sebagai teks lalu diubah seperti parse_dates pandas
+#   (kolom yang formatnya campur tetap teks),
+# - kolom lain dibaca sebagai teks lalu ditebak seperti pandas (angka, boolean,
+#   atau teks), karena tebakan tipe pyarrow berbeda (mis. tanggal menjadi date32),
+# - daftar nilai kosong dan nilai boolean disamakan dengan pandas, dan chunk
+#   diberi index lanjutan seperti pd.read_csv(chunksize=...).
+#
+# Satu-satunya perbedaan: pyarrow mengubah teks angka pecahan ke float secara
+# tepat, sedangkan parser cepat pandas kadang meleset di digit terakhir (seperti
+# float_precision='round_trip' vs default), jadi angka seperti
+# 0.32519977488370766 bisa berbeda di digit ke-17.
+#
+# Nama kolom selalu diambil dari baris header oleh `read_header`, yang hanya
+# membaca baris pertama file (tanpa membuat DataFrame) dan menamai kolom
+# duplikat/kosong seperti pandas ('a.1', 'Unnamed: 3').
+#
+# File berakhiran .gz atau .zst (mis. laporan terkompresi, lihat
+# report_writer.py) didekompresi saat dibaca oleh kedua mesin, begitu juga
+# CSV di dalam arsip .zip (lihat input_sources.py).
+
+READ_ENGINES = ('pandas', 'pyarrow')
+
+# Ukuran blok teks yang di-parsing sekaligus oleh pyarrow (byte)
+DEFAULT_BLOCK_SIZE = 16 * 1024 ** 2
+
+# Nilai yang dibaca sebagai kosong oleh pd.read_csv (na_values default)
+_NULL_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>',
+                'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+_TRUE_VALUES = ['True', 'TRUE', 'true']
+_FALSE_VALUES = ['False', 'FALSE', 'false']
+
+# dtype pd.read_csv -> tipe kolom pyarrow.csv. Kolom Int64 dibaca sebagai teks
+# lalu diubah di `_int_column`, karena pandas juga menerima angka bulat yang
+# ditulis sebagai pecahan ('7.0', mis. kolom bulat berisi kosong di laporan).
+_ARROW_TYPES = {
+    'Int64': pa.string(),
+    'float64': pa.float64(),
+    'boolean': pa.bool_(),
+    'category': pa.string(),
+    'str': pa.string(),
+}
+
+# Tipe Arrow -> dtype pandas untuk kolom yang dibaca dengan tipe dari peta dtype
+_PANDAS_TYPES = {pa.int64(): pd.Int64Dtype(), pa.bool_(): pd.BooleanDtype()}
+
+# Pengaturan mesin baca: nama mesin, ukuran blok pyarrow (byte), dan jumlah thread pyarrow
+CsvReadOptions = namedtuple('CsvReadOptions', ['engine', 'block_size', 'threads'], defaults=('pandas', None, None))
+
+
+@contextmanager
+def _source(file_path, native_compression=False):
+    """
+    Path file untuk pembaca CSV, atau stream yang sudah didekompresi (dengan
+    readahead) untuk file .gz/.zst dan member arsip .zip.
+
+    Dengan `native_compression`, file .gz/.zst tetap diberikan sebagai path
+    karena pyarrow.csv mendekompresinya sendiri di thread I/O-nya.
+    """
+    if archive_member(file_path) is None and (native_compression or not is_compressed(file_path)):
+        yield file_path
+        return
+    with open_input(file_path) as stream:
+        yield stream
+
+
+def read_header(file_path):
+    """
+    Daftar kolom file CSV dari baris header saja, dengan nama seperti pd.read_csv.
+
+    Raises:
+        pd.errors.EmptyDataError: Jika file tidak berisi baris header.
+    """
+    with io.TextIOWrapper(open_input(file_path, readahead=False), newline='', encoding='utf-8-sig') as f:
+        header = next((row for row in csv.reader(f) if row), None)
+    if header is None:
+        raise pd.errors.EmptyDataError("No columns to parse from file")
+    columns = []
+    seen = {}
+    for i, name in enumerate(header):
+        name = name or f"Unnamed: {i}"
+        # Nama duplikat diberi akhiran .1, .2, ... seperti pandas
+        base, count = name, seen.get(name, 0)
+        while name in seen:
+            count += 1
+            name = f"{base}.{count}"
+        seen[base] = count
+        seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def _is_arrow(options):
+    return options is not None and options.engine == 'pyarrow'
+
+
+def _arrow_options(file_path, options, dtype, parse_dates, usecols=None):
+    """ReadOptions dan ConvertOptions pyarrow.csv yang setara dengan pd.read_csv(dtype=, parse_dates=, usecols=)."""
+    if options.threads:
+        pa.set_cpu_count(options.threads)
+    header = read_header(file_path)
+    # Seperti pandas, kolom yang dibaca tetap mengikuti urutan di file
+    columns = [col for col in header if col in usecols] if usecols else header
+    column_types = {col: pa.string() for col in columns}
+    for col, col_dtype in (dtype or {}).items():
+        if col in column_types and col_dtype in _ARROW_TYPES:
+            column_types[col] = _ARROW_TYPES[col_dtype]
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=options.block_size or DEFAULT_BLOCK_SIZE,
+                                      column_names=header, skip_rows=1)
+    convert_options = pa_csv.ConvertOptions(column_types=column_types, null_values=_NULL_VALUES,
+                                            true_values=_TRUE_VALUES, false_values=_FALSE_VALUES,
+                                            strings_can_be_null=True, include_columns=columns if usecols else [])
+    inferred = [col for col in columns if col not in (dtype or {})]
+    ints = [col for col, col_dtype in (dtype or {}).items() if col in column_types and col_dtype == 'Int64']
+    dates = [col for col in parse_dates or [] if col in column_types]
+    return read_options, convert_options, inferred, dates, ints
+
+
+def _int_column(column):
+    """Kolom teks -> Int64 seperti dtype='Int64' pd.read_csv ('7.0' menjadi 7, '7.5' ditolak)."""
+    try:
+        return column.cast(pa.int64()).to_pandas(types_mapper=_PANDAS_TYPES.get)
+    except pa.ArrowInvalid:
+        return pd.to_numeric(column.to_pandas()).astype('Int64')
+
+
+def _infer_column(values):
+    """Menebak dtype kolom teks seperti parser pandas: angka, boolean, atau tetap teks."""
+    present = values.dropna()
+    if present.empty:
+        return values.astype('float64')
+    if present.isin(_TRUE_VALUES + _FALSE_VALUES).all():
+        booleans = values.map(lambda v: v if pd.isna(v) else v in _TRUE_VALUES)
+        return booleans.astype(bool) if len(present) == len(values) else booleans
+    try:
+        return pd.to_numeric(values)
+    except (ValueError, TypeError):
+        return values
+
+
+def _parse_dates(values):
+    """Seperti parse_dates pd.read_csv: format ditebak dari nilai pertama; jika tidak cocok, kolom tetap teks."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            return pd.to_datetime(values)
+    except (ValueError, TypeError, OverflowError):
+        return values
+
+
+def _to_frame(table, inferred, dates, ints, offset=0):
+    df = table.drop_columns(ints).to_pandas(types_mapper=_PANDAS_TYPES.get)
+    for col in ints:
+        df.insert(table.column_names.index(col), col, _int_column(table.column(col)))
+    df.index = pd.RangeIndex(offset, offset + len(df))
+    for col in df.columns:
+        # pandas mengisi sel kosong kolom teks dengan NaN, Arrow dengan None
+        if df[col].dtype == object and table.column(col).null_count:
+            df[col] = df[col].where(df[col].notna(), np.nan)
+    for col in inferred:
+        df[col] = _parse_dates(df[col]) if col in dates else _infer_column(df[col])
+    return df
+
+
+def _arrow_chunks(file_path, chunk_rows, options, dtype, parse_dates, usecols):
+    read_options, convert_options, inferred, dates, ints = _arrow_options(file_path, options, dtype, parse_dates,
+                                                                          usecols)
+    with _source(file_path, native_compression=True) as source:
+        reader = pa_csv.open_csv(source, read_options=read_options, convert_options=convert_options)
+        # Blok pyarrow berukuran byte, jadi baris dikumpulkan ulang menjadi chunk berukuran chunk_rows
+        pending, rows, offset = [], 0, 0
+        for batch in reader:
+            pending.append(batch)
+            rows += batch.num_rows
+            while rows >= chunk_rows:
+                table = pa.Table.from_batches(pending, schema=reader.schema)
+                yield _to_frame(table.slice(0, chunk_rows), inferred, dates, ints, offset)
+                offset += chunk_rows
+                rest = table.slice(chunk_rows)
+                pending, rows = rest.to_batches(), rest.num_rows
+        if rows:
+            yield _to_frame(pa.Table.from_batches(pending, schema=reader.schema), inferred, dates, ints, offset)
+
+
+def read_csv_chunks(file_path, chunk_rows, options=None, dtype=None, parse_dates=None, usecols=None):
+    """
+    Membaca file CSV per chunk `chunk_rows` baris, seperti pd.read_csv(chunksize=...).
+
+    Args:
+        file_path (str): File CSV.
+        chunk_rows (int): Jumlah baris per chunk.
+        options (CsvReadOptions): Mesin baca (opsional; default pandas).
+        dtype (dict): Peta kolom -> dtype untuk pd.read_csv (opsional).
+        parse_dates (list): Kolom tanggal (opsional).
+        usecols (list): Kolom yang dibaca (opsional; default semua). Kolom lain
+            tidak di-parsing sama sekali. Harus berisi minimal satu kolom.
+    """
+    if _is_arrow(options):
+        yield from _arrow_chunks(file_path, chunk_rows, options, dtype, parse_dates, usecols)
+        return
+    kwargs = {'dtype': dtype} if dtype else {}
+    if parse_dates:
+        kwargs['parse_dates'] = parse_dates
+    if usecols:
+        kwargs['usecols'] = usecols
+    with _source(file_path) as source, pd.read_csv(source, chunksize=chunk_rows, **kwargs) as reader:
+        yield from reader
+
+
+def read_csv(file_path, options=None, dtype=None, parse_dates=None):
+    """Membaca seluruh file CSV sebagai satu DataFrame, seperti pd.read_csv."""
+    if _is_arrow(options):
+        read_options, convert_options, inferred, dates, ints = _arrow_options(file_path, options, dtype, parse_dates)
+        with _source(file_path, native_compression=True) as source:
+            table = pa_csv.read_csv(source, read_options=read_options, convert_options=convert_options)
+        return _to_frame(table, inferred, dates, ints)
+    kwargs = {'dtype': dtype} if dtype else {}
+    if parse_dates:
+        kwargs['parse_dates'] = parse_dates
+    with _source(file_path) as source:
+        return pd.read_csv(source, **kwargs)
@@ -1,9 +1,28 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import glob
+import math
 import os
 
+from bounded_cache import BoundedCache
+from chart_data import CATEGORY_AGGREGATIONS, DEFAULT_BINS, category_totals, column_histogram, preview_rows
+from consolidation import parse_memory_size
+from csv_reader import CsvReadOptions
+from report_access import ReportReader
+from report_catalog import ReportCatalog, start_reconciler
+from report_summary import load_report_summary, write_report_summary
+
+# Laporan CSV dibaca sekali (saat dataset Arrow-nya dibuat) dengan parser pyarrow multi-thread
+READ_OPTIONS = CsvReadOptions('pyarrow')
+
+# Batas memori cache laporan dan agregasi (dipakai bersama semua sesi di server) dan umur maksimal entrinya
+CACHE_MEMORY = parse_memory_size(os.environ.get('DASHBOARD_CACHE_MEMORY', '512MB'))
+CACHE_TTL = float(os.environ.get('DASHBOARD_CACHE_TTL', 30 * 60))
+
+# Folder laporan dan jumlah laporan per halaman daftar laporan
+REPORTS_FOLDER = 'files/outputs/'
+REPORT_PAGE_SIZE = 50
+
 # Konfigurasi Halaman Dashboard
 st.set_page_config(
     page_title="Dashboard Laporan Merge",
@@ -17,84 +36,244 @@ st.title("📊 Dashboard Laporan Hasil Merge")
 # --- PEMILIHAN FILE ---
 st.markdown("### Pilih Laporan untuk Ditampilkan")
 
-# Fungsi untuk mendapatkan daftar semua file laporan
-def get_report_files(folder_path):
-    """Mendapatkan daftar file CSV di folder, diurutkan dari yang terbaru."""
+# Katalog laporan (lihat report_catalog.py) dipakai bersama semua sesi; isinya
+# dicocokkan dengan folder laporan oleh satu thread latar belakang
+@st.cache_resource
+def get_catalog(folder_path):
+    catalog = ReportCatalog(folder_path)
+    if os.path.isdir(folder_path) and not catalog.exists():
+        # Katalog pertama kali diisi langsung, agar laporan lama langsung terlihat
+        with st.spinner("Menyusun katalog laporan..."):
+            catalog.reconcile()
+    start_reconciler(catalog)
+    return catalog
+
+# Fungsi untuk membaca katalog; folder laporan yang belum ada (belum pernah ada merge) dianggap kosong
+def count_reports(catalog, search, merge_key):
+    """Jumlah laporan yang cocok dengan filter nama dan kunci merge."""
+    try:
+        return catalog.count(search, merge_key)
+    except Exception:
+        return 0
+
+def get_report_page(catalog, page, search, merge_key):
+    """Laporan di halaman `page` (mulai 1) yang cocok dengan filter, dari yang terbaru."""
     try:
-        list_of_files = glob.glob(os.path.join(folder_path, '*.csv'))
-        if not list_of_files:
-            return []
-        # Urutkan file berdasarkan waktu modifikasi (terbaru di atas)
-        list_of_files.sort(key=os.path.getctime, reverse=True)
-        return list_of_files
+        return catalog.query((page - 1) * REPORT_PAGE_SIZE, REPORT_PAGE_SIZE, search, merge_key)
     except Exception:
         return []
 
-# Fungsi untuk memuat data dari path file yang spesifik
-@st.cache_data
-def load_data(file_path):
-    """Memuat data dari file path yang dipilih."""
+def describe_entry(entry):
+    """Nama laporan untuk dropdown, dengan jumlah baris dan kunci merge jika tercatat di katalog."""
+    details = [f"{entry.rows:,} baris" if entry.rows is not None else None,
+               f"kunci {entry.merge_key}" if entry.merge_key else None]
+    details = ', '.join(detail for detail in details if detail)
+    return f"{entry.name} ({details})" if details else entry.name
+
+# Satu cache berbatas memori untuk semua sesi (lihat bounded_cache.py). Kunci setiap
+# entri berisi path dan mtime laporan, jadi laporan yang ditulis ulang dibaca ulang.
+@st.cache_resource
+def get_cache():
+    return BoundedCache(CACHE_MEMORY, ttl=CACHE_TTL)
+
+cache = get_cache()
+
+# Fungsi untuk membuka laporan secara lazy; hanya kolom dan baris yang ditampilkan yang dibaca
+def open_report(file_path, mtime):
+    """Membuka pembaca laporan (untuk laporan CSV, dataset Arrow di cache dibuat sekali jika belum ada)."""
     try:
-        df = pd.read_csv(file_path)
-        return df
+        return cache.get_or_compute(('reader', file_path, mtime),
+                                    lambda: ReportReader(file_path, read_options=READ_OPTIONS))
     except Exception as e:
         st.error(f"Gagal memuat file {os.path.basename(file_path)}: {e}")
         return None
 
-# Dapatkan semua file laporan
-report_files = get_report_files('files/outputs/')
+# Fungsi untuk membaca satu halaman data mentah
+def load_page(file_path, mtime, offset, limit):
+    """Baris [offset, offset + limit) laporan; halaman yang baru dibuka tetap di cache."""
+    reader = open_report(file_path, mtime)
+    if reader is None:
+        return None
+    return cache.get_or_compute(('page', file_path, mtime, offset, limit), lambda: reader.page(offset, limit))
+
+# Fungsi untuk agregasi bar chart: dihitung di server per record batch, hanya hasilnya yang dikirim ke browser
+def load_category_totals(file_path, mtime, category_col, value_col, aggregation):
+    """Agregasi kolom numerik per kategori (kategori terbanyak saja) dari laporan yang dipilih."""
+    reader = open_report(file_path, mtime)
+    if reader is None:
+        return None
+    return cache.get_or_compute(('category_totals', file_path, mtime, category_col, value_col, aggregation),
+                                lambda: category_totals(reader, category_col, value_col, aggregation))
+
+# Fungsi untuk histogram dengan jumlah bin selain bawaan ringkasan
+def load_histogram(file_path, mtime, column, bins, value_range):
+    """Batas bin dan jumlah nilai per bin satu kolom angka, dihitung di server."""
+    reader = open_report(file_path, mtime)
+    if reader is None:
+        return None
+    return cache.get_or_compute(('histogram', file_path, mtime, column, bins),
+                                lambda: column_histogram(reader, column, bins, value_range))
+
+# Fungsi untuk sampel baris grafik sebaran
+def load_preview(file_path, mtime, x_col, y_col):
+    """Sampel baris berjarak sama dari dua kolom, agar grafik sebaran tetap ringan untuk laporan besar."""
+    reader = open_report(file_path, mtime)
+    if reader is None:
+        return None
+    return cache.get_or_compute(('preview', file_path, mtime, x_col, y_col),
+                                lambda: preview_rows(reader, list(dict.fromkeys([x_col, y_col]))))
+
+# Fungsi untuk memuat ringkasan laporan (berisi histogram yang sudah di-bin saat merge)
+def load_summary(file_path, mtime):
+    """Memuat sidecar ringkasan laporan; jika belum ada (laporan lama), ringkasan dibuat dan disimpan."""
+    def compute():
+        return load_report_summary(file_path) or write_report_summary(file_path, read_options=READ_OPTIONS)
+
+    try:
+        return cache.get_or_compute(('summary', file_path, mtime), compute)
+    except Exception as e:
+        st.error(f"Gagal membuat ringkasan {os.path.basename(file_path)}: {e}")
+        return None
+
+def show_cache_stats():
+    """Statistik cache server (hit/miss dan pemakaian memori) di sidebar."""
+    stats = cache.stats()
+    lookups = stats.hits + stats.misses
+    with st.sidebar.expander("Statistik Cache"):
+        st.metric("Hit rate", f"{stats.hits / lookups:.0%}" if lookups else "-")
+        st.write(f"Hit: {stats.hits:,} · Miss: {stats.misses:,}")
+        st.write(f"Memori: {stats.bytes / 1024 ** 2:,.1f} / {stats.max_bytes / 1024 ** 2:,.0f} MB "
+                 f"({stats.entries:,} entri)")
+        st.write(f"Dibuang: {stats.evictions:,} (penuh), {stats.expired:,} (TTL), {stats.rejected:,} (terlalu besar)")
+
+# Daftar laporan dibaca per halaman dari katalog, dengan filter nama dan kunci merge
+catalog = get_catalog(REPORTS_FOLDER)
+filter_col1, filter_col2, filter_col3 = st.columns([3, 2, 1])
+search = filter_col1.text_input("Cari nama laporan:").strip()
+try:
+    merge_keys = catalog.values('merge_key')
+except Exception:
+    merge_keys = []
+merge_key = filter_col2.selectbox("Kunci merge:", options=[None] + merge_keys, format_func=lambda k: k or "Semua")
+report_total = count_reports(catalog, search, merge_key)
+report_pages = max(1, math.ceil(report_total / REPORT_PAGE_SIZE))
+report_page = filter_col3.number_input(f"Halaman (1-{report_pages:,}):", min_value=1, max_value=report_pages,
+                                       value=1)
+report_entries = {entry.path: entry for entry in get_report_page(catalog, report_page, search, merge_key)}
 
 # Cek jika ada file laporan
-if report_files:
-    # Buat dropdown menu dengan nama file (tanpa path) sebagai pilihan
-    # `format_func` digunakan untuk menampilkan nama file yang lebih ramah
+if report_entries:
+    # Buat dropdown menu dengan nama file, jumlah baris, dan kunci merge sebagai pilihan
     selected_file = st.selectbox(
-        "Pilih file laporan:",
-        options=report_files,
-        format_func=lambda x: os.path.basename(x)
+        f"Pilih file laporan ({report_total:,} laporan):",
+        options=list(report_entries),
+        format_func=lambda path: describe_entry(report_entries[path])
     )
+    selected_entry = report_entries[selected_file]
+
+    # Laporan yang dihapus sejak pencocokan katalog terakhir dilewati sampai katalog diperbarui
+    if not os.path.exists(selected_file):
+        st.warning(f"Laporan {selected_entry.name} sudah tidak ada; daftar laporan sedang diperbarui.")
+        catalog.reconcile()
+        st.stop()
 
-    # Muat data dari file yang dipilih
-    df = load_data(selected_file)
+    # Ringkasan dibaca dari sidecar `<laporan>.summary.json` tanpa memuat laporannya
+    report_mtime = os.path.getmtime(selected_file)
+    # Entri versi lama laporan ini dan entri yang melewati TTL dibuang dari cache
+    cache.evict_where(lambda key: key[1] == selected_file and key[2] != report_mtime)
+    cache.expire()
+    summary = load_summary(selected_file, report_mtime)
 
-    if df is not None:
+    if summary is not None:
         st.success(f"Menampilkan data dari: **{os.path.basename(selected_file)}**")
 
         # --- Tampilkan Metrik Utama ---
         st.markdown("## Ringkasan Data")
         col1, col2, col3 = st.columns(3)
-        col1.metric("Jumlah Baris", f"{df.shape[0]:,}")
-        col2.metric("Jumlah Kolom", f"{df.shape[1]:,}")
-        missing_cells = df.isnull().sum().sum()
-        col3.metric("Sel Kosong (NaN)", f"{missing_cells:,}")
+        col1.metric("Jumlah Baris", f"{summary['rows']:,}")
+        col2.metric("Jumlah Kolom", f"{summary['columns']:,}")
+        col3.metric("Sel Kosong (NaN)", f"{summary['null_cells']:,}")
+
+        column_stats = summary['column_stats']
+        with st.expander("Lihat Ringkasan per Kolom"):
+            st.dataframe(pd.DataFrame([
+                {'Kolom': col, 'Tipe': info['dtype'], 'Sel Kosong': info['nulls'],
+                 'Nilai Unik (perkiraan)': info['distinct'], 'Min': info['min'], 'Max': info['max']}
+                for col, info in column_stats.items()
+            ]).astype({'Min': str, 'Max': str}))
 
         # --- Tampilkan Data Mentah ---
         with st.expander("Lihat Data Mentah (Raw Data)"):
-            st.dataframe(df)
+            # Data ditampilkan per halaman; hanya halaman yang dipilih yang dibaca
+            page_col1, page_col2 = st.columns(2)
+            page_size = page_col1.selectbox("Baris per halaman:", options=[50, 100, 500, 1000], index=1)
+            total_pages = max(1, math.ceil(summary['rows'] / page_size))
+            page = page_col2.number_input(f"Halaman (1-{total_pages:,}):", min_value=1, max_value=total_pages, value=1)
+            page_df = load_page(selected_file, report_mtime, (page - 1) * page_size, page_size)
+            if page_df is not None:
+                st.dataframe(page_df)
 
         # --- Visualisasi Interaktif ---
         st.markdown("## Analisis Visual")
-        
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+
+        numeric_cols = [col for col, info in column_stats.items() if info['kind'] == 'numeric']
+        categorical_cols = [col for col, info in column_stats.items() if info['kind'] == 'categorical']
 
         viz_col1, viz_col2 = st.columns(2)
 
         with viz_col1:
             st.subheader("Distribusi Data (Histogram)")
             hist_col = st.selectbox("Pilih kolom untuk melihat distribusi:", options=numeric_cols, key="hist")
-            if hist_col:
-                fig_hist = px.histogram(df, x=hist_col, title=f"Distribusi Kolom {hist_col}")
+            bins = st.slider("Jumlah bin:", min_value=5, max_value=200, value=DEFAULT_BINS, key="hist_bins")
+            edges, counts = None, None
+            if hist_col and 'histogram' in column_stats[hist_col] and bins == DEFAULT_BINS:
+                # Histogram bawaan sudah di-bin saat merge, jadi cukup digambar dari ringkasan
+                edges = column_stats[hist_col]['histogram']['edges']
+                counts = column_stats[hist_col]['histogram']['counts']
+            elif hist_col and column_stats[hist_col]['min'] is not None:
+                # Jumlah bin lain dihitung di server; rentang nilainya diambil dari ringkasan
+                value_range = (column_stats[hist_col]['min'], column_stats[hist_col]['max'])
+                histogram = load_histogram(selected_file, report_mtime, hist_col, bins, value_range)
+                if histogram is not None:
+                    edges, counts = histogram.edges.tolist(), histogram.counts.tolist()
+            if edges is not None:
+                hist_df = pd.DataFrame({
+                    hist_col: [(low + high) / 2 for low, high in zip(edges, edges[1:])],
+                    'count': counts,
+                })
+                fig_hist = px.bar(hist_df, x=hist_col, y='count', title=f"Distribusi Kolom {hist_col}")
+                fig_hist.update_traces(width=edges[1] - edges[0])
                 st.plotly_chart(fig_hist, use_container_width=True)
 
         with viz_col2:
             st.subheader("Perbandingan Kategori (Bar Chart)")
             bar_cat_col = st.selectbox("Pilih kolom kategori (Sumbu X):", options=categorical_cols, key="bar_cat")
             bar_num_col = st.selectbox("Pilih kolom numerik (Sumbu Y):", options=numeric_cols, key="bar_num")
+            bar_agg = st.selectbox("Agregasi:", options=CATEGORY_AGGREGATIONS, key="bar_agg")
+            agg_df = None
             if bar_cat_col and bar_num_col:
-                agg_df = df.groupby(bar_cat_col)[bar_num_col].sum().reset_index()
-                fig_bar = px.bar(agg_df, x=bar_cat_col, y=bar_num_col, title=f"{bar_num_col} berdasarkan {bar_cat_col}")
+                agg_df = load_category_totals(selected_file, report_mtime, bar_cat_col, bar_num_col, bar_agg)
+            if agg_df is not None:
+                fig_bar = px.bar(agg_df, x=bar_cat_col, y=bar_num_col,
+                                 title=f"{bar_num_col} ({bar_agg}) berdasarkan {bar_cat_col}")
                 st.plotly_chart(fig_bar, use_container_width=True)
+
+        st.subheader("Sebaran Dua Kolom (Sampel)")
+        scatter_col1, scatter_col2 = st.columns(2)
+        scatter_x = scatter_col1.selectbox("Sumbu X:", options=numeric_cols, key="scatter_x")
+        scatter_y = scatter_col2.selectbox("Sumbu Y:", options=numeric_cols, index=1 if len(numeric_cols) > 1 else 0,
+                                           key="scatter_y")
+        if scatter_x and scatter_y:
+            preview = load_preview(selected_file, report_mtime, scatter_x, scatter_y)
+            if preview is not None:
+                st.caption(f"{len(preview):,} dari {summary['rows']:,} baris "
+                           "(diambil berjarak sama di seluruh laporan).")
+                fig_scatter = px.scatter(preview, x=scatter_x, y=scatter_y, render_mode='webgl')
+                st.plotly_chart(fig_scatter, use_container_width=True)
+    show_cache_stats()
 else:
-    st.warning("Tidak ada file laporan yang ditemukan di folder 'files/outputs/'.")
+    if search or merge_key:
+        st.warning("Tidak ada laporan yang cocok dengan filter.")
+    else:
+        st.warning(f"Tidak ada file laporan yang ditemukan di folder '{REPORTS_FOLDER}'.")
     st.info("Silakan jalankan script `main_merge.py` terlebih dahulu untuk menghasilkan laporan.")
\ No newline at end of file
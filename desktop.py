@@ -1,16 +1,49 @@
 import sys
 import os
-import glob
 import shutil
+import multiprocessing
 from datetime import datetime
+import numpy as np
 import pandas as pd
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QLineEdit, QFileDialog, QTextEdit, QComboBox,
-    QHeaderView, QTableWidget, QTableWidgetItem, QMessageBox
+    QHeaderView, QTableView, QMessageBox, QSpinBox, QCheckBox
 )
-from PyQt6.QtCore import QThread, pyqtSignal, QObject
-from PyQt6.QtGui import QFont, QIcon
+from PyQt6.QtCore import QThread, pyqtSignal, QObject, Qt, QAbstractTableModel, QModelIndex, QTimer
+from PyQt6.QtGui import QColor, QFont, QIcon, QPainter
+
+from consolidation import parse_memory_size
+from csv_reader import READ_ENGINES, CsvReadOptions
+from arrow_store import read_columns
+from chart_data import DEFAULT_BINS, series_histogram
+from join_engine import JOIN_STRATEGIES, partitioned_hash_join
+from join_planner import join_statistics, plan_join
+from key_filter import consolidate_with_semi_join
+from key_index import index_lookup_join
+from key_skew import EXPLOSION_ACTIONS, JoinExplosionError, check_join_size
+from merge_keys import MergeKey, MergeKeyError, join_frames, without_key_column
+from metrics import METRICS_SUFFIX, RunMetrics, StageProgress
+from pushdown import FilterExpressionError, RowPredicate, parse_columns
+from report_catalog import ReportCatalog, register_report
+from report_summary import write_report_summary
+from report_writer import OutputOptions, report_file_name, write_report
+from schema_inference import read_merge_input, read_report, save_merge_schema
+from sort_merge import sort_merge_join
+from table_query import query_rows
+from watch_mode import SourceWatcher, consolidate_delta, delta_files, describe_changes
+
+# Report formats offered in the settings panel (label -> format and compression)
+OUTPUT_CHOICES = {
+    'CSV': OutputOptions('csv'),
+    'CSV (gzip)': OutputOptions('csv', 'gzip'),
+    'CSV (zstd)': OutputOptions('csv', 'zstd'),
+    'Parquet': OutputOptions('parquet'),
+    'Hive (Parquet per kolom partisi)': OutputOptions('hive'),
+}
+
+# Number of reports per page in the report selector
+REPORT_PAGE_SIZE = 100
 
 # ==============================================================================
 # Helper Function to get correct Base Path (for App Icon)
@@ -33,23 +66,97 @@ class MergeWorker(QObject):
     finished = pyqtSignal()
     log = pyqtSignal(str)
     error = pyqtSignal(str)
-    progress = pyqtSignal(str)
+    progress = pyqtSignal(object)  # Will carry a StageProgress
+    report_ready = pyqtSignal()
 
-    def __init__(self, source_a, source_b, merge_key, output_dir, merge_type):
+    def __init__(self, source_a, source_b, merge_key, output_dir, merge_type, max_memory=None, workers=1,
+                 join_strategy='memory', use_cache=True, read_options=None, output_options=None, recursive=False,
+                 columns=None, where=None, watch=False, max_output_rows=None, on_explosion='warn'):
         super().__init__()
         self.source_a = source_a
         self.source_b = source_b
-        self.merge_key = merge_key
+        # Key columns are normalized while consolidating; every join strategy joins on key.join_column
+        self.key = MergeKey(merge_key)
+        self.merge_key = self.key.join_column
         self.output_dir = output_dir
         self.merge_type = merge_type
+        self.max_memory = max_memory
+        self.workers = workers
+        self.join_strategy = join_strategy
+        self.read_options = read_options
+        self.output_options = output_options
+        self.recursive = recursive
+        # The merge key columns are always read, even when the column list leaves them out
+        self.columns = list(dict.fromkeys(self.key.columns + list(columns))) if columns else None
+        self.where = where
+        # Join size guard: None keeps key_skew's default limit (a multiple of the largest source)
+        self.max_output_rows = max_output_rows
+        self.on_explosion = on_explosion
+        # The cache lives outside 'temp' so it survives into the next run
+        self.path_cache = os.path.join(output_dir, 'cache') if use_cache else None
+        # The Source B key index also outlives 'temp' so unchanged references are not re-indexed
+        self.path_index = os.path.join(output_dir, 'index')
+        # Watch mode keeps re-merging as source files land until stop_requested is set from the UI thread
+        self.watch = watch
+        self.stop_requested = False
+
+    def emit_phase(self, label):
+        """Reports the start of a phase (no stage measured yet) through the typed progress signal."""
+        self.progress.emit(StageProgress(None, label, None, None, None, None, None))
 
     def run(self):
-        path_temp = ""
+        path_temp = os.path.join(self.output_dir, 'temp')
+        try:
+            # The folders are snapshotted before the first run so files landing during it are picked up
+            watcher = SourceWatcher(self.source_a, self.source_b, self.recursive, log=self.log.emit) \
+                if self.watch else None
+            success = self.merge_once(path_temp)
+            while watcher and not self.stop_requested:
+                self.log.emit("\n👀 Memantau folder Source A dan Source B...")
+                self.emit_phase("Memantau folder sumber (mode pantau)...")
+                changes = watcher.wait(should_stop=lambda: self.stop_requested)
+                if changes is None:
+                    break
+                self.log.emit(f"\n--- Perubahan file sumber: {describe_changes(changes)} ---")
+                # Only new Source A files are merged as a delta; anything else (or a failed run) re-runs in full
+                files = delta_files(changes, self.merge_type) if success else None
+                success = self.merge_once(path_temp, files)
+        except Exception as e:
+            self.error.emit(f"Terjadi kesalahan: {e}")
+        finally:
+            self.log.emit("\n--- Membersihkan file sementara ---")
+            if os.path.isdir(path_temp):
+                try:
+                    shutil.rmtree(path_temp)
+                    self.log.emit("✅  Folder 'temp' berhasil dihapus.")
+                except Exception as e:
+                    self.log.emit(f"⚠️ Gagal menghapus folder 'temp': {e}")
+            
+            self.finished.emit()
+
+    def merge_once(self, path_temp, new_files=None):
+        """
+        Runs one consolidation + merge cycle and writes its report.
+
+        With `new_files`, only those Source A files are consolidated and joined against the Source B
+        dataset left in `path_temp` by the last full run, and the result is written as a delta report.
+        Returns True when the report was written.
+        """
+        kind = 'delta_merge' if new_files else 'final_merge'
+        metrics = RunMetrics('desktop_merge', on_stage=self.progress.emit)
+        metrics.info.update(merge_key=self.key.text, merge_type=self.merge_type, join_strategy=self.join_strategy,
+                            max_memory=self.max_memory, workers=self.workers, use_cache=bool(self.path_cache),
+                            recursive=self.recursive, columns=self.columns, where=self.where, watch=self.watch,
+                            max_output_rows=self.max_output_rows, on_explosion=self.on_explosion,
+                            read_options=(self.read_options or CsvReadOptions())._asdict(),
+                            output_options=(self.output_options or OutputOptions())._asdict())
+        if new_files:
+            metrics.info['delta_files'] = new_files
+        metrics_file = None
         try:
             self.log.emit("--- Memulai Proses Penggabungan Data ---")
 
             base_output_path = self.output_dir
-            path_temp = os.path.join(base_output_path, 'temp')
             path_output = os.path.join(base_output_path, 'outputs')
 
             os.makedirs(path_temp, exist_ok=True)
@@ -57,90 +164,149 @@ class MergeWorker(QObject):
             os.makedirs(path_output, exist_ok=True)
             self.log.emit(f"Folder output disiapkan di: {path_output}")
 
-            temp_a_file = os.path.join(path_temp, 'consolidated_a.csv')
-            temp_b_file = os.path.join(path_temp, 'consolidated_b.csv')
+            temp_a_file = os.path.join(path_temp, 'delta_a.arrow' if new_files else 'consolidated_a.arrow')
+            temp_b_file = os.path.join(path_temp, 'consolidated_b.arrow')
 
-            self.log.emit("\n--- Tahap 1: Konsolidasi Masing-Masing Sumber ---")
-            self.progress.emit("Mengonsolidasi Source A...")
-            success_a = self.consolidate_csvs(self.source_a, temp_a_file)
-            QThread.msleep(100)
-            self.progress.emit("Mengonsolidasi Source B...")
-            success_b = self.consolidate_csvs(self.source_b, temp_b_file)
+            # Report and metrics share the run's start time in their names
+            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+            final_output_file = report_file_name(os.path.join(path_output, f"{timestamp}_{kind}"),
+                                                 self.output_options)
+            metrics_file = os.path.join(path_output, f"{timestamp}_{kind}{METRICS_SUFFIX}")
+            metrics.info['report_file'] = final_output_file
+
+            if new_files:
+                self.log.emit(f"\n--- Tahap 1: Konsolidasi {len(new_files)} File Baru Source A ---")
+                self.emit_phase("Mengonsolidasi file baru Source A...")
+                success_a = success_b = self.consolidate_new_files(new_files, temp_a_file, temp_b_file, metrics)
+            else:
+                self.log.emit("\n--- Tahap 1: Konsolidasi Masing-Masing Sumber ---")
+                self.emit_phase("Mengonsolidasi Source A dan Source B...")
+                success_a, success_b = self.consolidate_csvs([(self.source_a, temp_a_file),
+                                                              (self.source_b, temp_b_file)], metrics)
             QThread.msleep(100)
 
             if not (success_a and success_b):
                 self.error.emit("Proses dihentikan karena salah satu tahap konsolidasi gagal.")
-                return
+                return False
 
             self.log.emit("\n--- Tahap 2: Penggabungan (Merge) Berdasarkan Kunci ---")
-            self.progress.emit(f"Menggabungkan data (tipe: {self.merge_type}) dengan kunci: '{self.merge_key}'...")
+            self.emit_phase(f"Menggabungkan data (tipe: {self.merge_type}) dengan kunci: '{self.key}'...")
             
-            df_a = pd.read_csv(temp_a_file)
-            df_b = pd.read_csv(temp_b_file)
+            columns_a = read_columns(temp_a_file)
+            columns_b = read_columns(temp_b_file)
+            missing = [col for col in self.columns or [] if col not in columns_a and col not in columns_b]
+            if missing:
+                self.log.emit(f"⚠️  Kolom tidak ditemukan di kedua sumber: {', '.join(missing)}")
 
-            if self.merge_key not in df_a.columns or self.merge_key not in df_b.columns:
-                err_msg = (f"Error: Kolom kunci '{self.merge_key}' tidak ditemukan di salah satu sumber.\n"
-                           f"Kolom di Source A: {list(df_a.columns)}\n"
-                           f"Kolom di Source B: {list(df_b.columns)}")
+            if any(col not in columns_a or col not in columns_b for col in [self.merge_key] + self.key.columns):
+                err_msg = (f"Error: Kolom kunci '{self.key}' tidak ditemukan di salah satu sumber.\n"
+                           f"Kolom di Source A: {without_key_column(columns_a)}\n"
+                           f"Kolom di Source B: {without_key_column(columns_b)}")
                 self.error.emit(err_msg)
-                return
-            
-            final_df = pd.merge(df_a, df_b, on=self.merge_key, how=self.merge_type)
+                return False
 
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            final_output_file = os.path.join(path_output, f"{timestamp}_final_merge.csv")
-            final_df.to_csv(final_output_file, index=False, encoding='utf-8')
+            # Key statistics: estimated output size and the heaviest duplicated keys
+            stats = join_statistics(temp_a_file, temp_b_file, self.merge_key, self.merge_type, metrics=metrics,
+                                    log=self.log.emit)
+            metrics.info['estimated_rows'] = stats.estimated_rows
+            check_join_size(stats.estimated_rows, stats.heavy_keys, stats.a.rows, stats.b.rows,
+                            max_output_rows=self.max_output_rows, on_explosion=self.on_explosion, log=self.log.emit)
+
+            join_strategy, partitions = self.join_strategy, None
+            if join_strategy == 'auto':
+                # Let the planner pick the strategy from size and distinct-key estimates
+                plan = plan_join(temp_a_file, temp_b_file, self.merge_key, self.merge_type,
+                                 max_memory=self.max_memory, stats=stats, metrics=metrics, log=self.log.emit)
+                metrics.info['join_plan'] = plan._asdict()
+                join_strategy, partitions = plan.strategy, plan.partitions
+
+            final_df = None
+            if join_strategy == 'partitioned':
+                total_rows = partitioned_hash_join(
+                    temp_a_file, temp_b_file, self.merge_key, self.merge_type, final_output_file,
+                    partitions=partitions, max_memory=self.max_memory, work_dir=os.path.join(path_temp, 'join'),
+                    skew_keys=stats.heavy_keys, workers=self.workers, output_options=self.output_options,
+                    key_columns=self.key.key_columns, metrics=metrics, log=self.log.emit
+                )
+            elif join_strategy == 'indexed':
+                total_rows = index_lookup_join(
+                    temp_a_file, temp_b_file, self.merge_key, self.merge_type, final_output_file, self.path_index,
+                    max_memory=self.max_memory, work_dir=os.path.join(path_temp, 'join'),
+                    output_options=self.output_options, key_columns=self.key.key_columns, metrics=metrics,
+                    log=self.log.emit
+                )
+            elif join_strategy == 'presorted':
+                total_rows = sort_merge_join(
+                    temp_a_file, temp_b_file, self.merge_key, self.merge_type, final_output_file,
+                    work_dir=os.path.join(path_temp, 'join'), output_options=self.output_options,
+                    key_columns=self.key.key_columns, metrics=metrics, log=self.log.emit
+                )
+            else:
+                with metrics.stage('load_inputs') as record:
+                    df_a = read_merge_input(temp_a_file, self.merge_key)
+                    df_b = read_merge_input(temp_b_file, self.merge_key)
+                    record['rows'] = len(df_a) + len(df_b)
+                with metrics.stage('join') as record:
+                    final_df = join_frames(df_a, df_b, self.merge_key, self.merge_type, self.key.key_columns)
+                    final_df = final_df[without_key_column(final_df.columns)]
+                    record['rows'] = len(final_df)
+                with metrics.stage('write_report', rows=len(final_df)) as record:
+                    record['bytes_written'] = write_report(final_df, final_output_file, self.output_options)
+                total_rows = len(final_df)
+            with metrics.stage('schema_sidecar'):
+                save_merge_schema(temp_a_file, temp_b_file, self.merge_key, final_output_file)
+            self.log.emit("Menyusun ringkasan laporan...")
+            self.emit_phase("Menyusun ringkasan laporan...")
+            with metrics.stage('report_summary', rows=total_rows):
+                write_report_summary(final_output_file, final_df, read_options=self.read_options)
+            metrics.info['rows'] = total_rows
 
             self.log.emit("\n🎉  Sukses! Proses merge selesai.")
             self.log.emit(f"Hasil disimpan di: '{final_output_file}'")
-            self.log.emit(f"Total baris hasil merge: {len(final_df)}")
-            self.progress.emit("Selesai!")
+            self.log.emit(f"Total baris hasil merge: {total_rows}")
+            self.emit_phase("Selesai!")
+            register_report(final_output_file, self.key.text, self.merge_type, total_rows, log=self.log.emit)
+            self.report_ready.emit()
+            return True
 
+        except JoinExplosionError as e:
+            self.error.emit(f"Merge dibatalkan: {e}")
+            return False
         except Exception as e:
             self.error.emit(f"Terjadi kesalahan: {e}")
+            return False
         finally:
-            self.log.emit("\n--- Membersihkan file sementara ---")
-            if path_temp and os.path.isdir(path_temp):
+            if metrics_file:
                 try:
-                    shutil.rmtree(path_temp)
-                    self.log.emit("✅  Folder 'temp' berhasil dihapus.")
-                except Exception as e:
-                    self.log.emit(f"⚠️ Gagal menghapus folder 'temp': {e}")
-            
-            self.finished.emit()
+                    metrics.save(metrics_file)
+                    self.log.emit(f"Metrik performa disimpan di: '{metrics_file}'")
+                except OSError as e:
+                    self.log.emit(f"⚠️ Gagal menyimpan metrik performa: {e}")
 
-    def consolidate_csvs(self, input_path, output_file):
+    def consolidate_csvs(self, jobs, metrics=None):
         try:
-            if not os.path.isdir(input_path):
-                self.log.emit(f"⚠️  Folder input '{input_path}' tidak ditemukan.")
-                return False
-
-            all_files = glob.glob(os.path.join(input_path, "*.csv"))
-            if not all_files:
-                self.log.emit(f"⚠️  Tidak ada file CSV di '{input_path}'.")
-                return False
+            # Rows whose key cannot survive the merge are dropped while consolidating (semi-join pushdown);
+            # the 'indexed' strategy keeps Source B whole so its key index stays valid across runs, and watch
+            # mode keeps it whole so later delta runs can join against it
+            keep_right = self.watch or self.join_strategy == 'indexed'
+            return consolidate_with_semi_join(jobs, self.merge_key, self.merge_type, keep_right=keep_right,
+                                              max_memory=self.max_memory,
+                                              workers=self.workers, cache_dir=self.path_cache,
+                                              read_options=self.read_options, recursive=self.recursive,
+                                              columns=self.columns, where=self.where, key=self.key,
+                                              metrics=metrics, log=self.log.emit)
+        except Exception as e:
+            self.error.emit(f"Gagal saat konsolidasi: {e}")
+            return [False] * len(jobs)
 
-            all_columns = set()
-            for f in all_files:
-                try:
-                    df_header = pd.read_csv(f, nrows=0)
-                    all_columns.update(df_header.columns)
-                except Exception:
-                    continue
-            
-            final_columns = sorted(list(all_columns))
-            pd.DataFrame(columns=final_columns).to_csv(output_file, index=False, encoding='utf-8')
-
-            for f in all_files:
-                df = pd.read_csv(f)
-                df_reindexed = df.reindex(columns=final_columns)
-                df_reindexed.to_csv(output_file, mode='a', header=False, index=False, encoding='utf-8')
-                self.log.emit(f"  -> Memproses: {os.path.basename(f)}")
-            
-            self.log.emit(f"✅  Konsolidasi '{input_path}' berhasil.")
-            return True
+    def consolidate_new_files(self, files, delta_file, temp_b_file, metrics=None):
+        try:
+            return consolidate_delta(self.source_a, delta_file, files, self.merge_key, self.merge_type, temp_b_file,
+                                     max_memory=self.max_memory, workers=self.workers,
+                                     read_options=self.read_options, columns=self.columns, where=self.where,
+                                     key=self.key, metrics=metrics, log=self.log.emit)
         except Exception as e:
-            self.error.emit(f"Gagal saat konsolidasi '{input_path}': {e}")
+            self.error.emit(f"Gagal saat konsolidasi file baru: {e}")
             return False
 
 # ==============================================================================
@@ -150,17 +316,154 @@ class ReportLoaderWorker(QObject):
     finished = pyqtSignal(object)  # Will carry the DataFrame
     error = pyqtSignal(str)
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, read_options=None):
         super().__init__()
         self.file_path = file_path
+        self.read_options = read_options
 
     def run(self):
         try:
-            df = pd.read_csv(self.file_path)
+            df = read_report(self.file_path, self.read_options)
             self.finished.emit(df)
         except Exception as e:
             self.error.emit(f"Gagal memuat file laporan: {e}")
 
+# ==============================================================================
+# Worker Thread for Reconciling the Report Catalog with the Output Folder
+# ==============================================================================
+class CatalogReconcileWorker(QObject):
+    finished = pyqtSignal(int)  # Number of catalog rows that changed
+    error = pyqtSignal(str)
+
+    def __init__(self, catalog):
+        super().__init__()
+        self.catalog = catalog
+
+    def run(self):
+        try:
+            self.finished.emit(self.catalog.reconcile())
+        except Exception as e:
+            self.error.emit(f"Gagal mencocokkan katalog laporan: {e}")
+            self.finished.emit(0)
+
+# ==============================================================================
+# Table Model backed directly by the report DataFrame
+# ==============================================================================
+class DataFrameTableModel(QAbstractTableModel):
+    """
+    Read-only model over a DataFrame. No per-cell Qt objects are created: a cell
+    is formatted only when the view asks for it (i.e. when it is visible).
+    Sorting and filtering only replace `rows`, the positions of the DataFrame
+    rows currently shown, which are computed in a TableQueryWorker.
+    """
+    sort_requested = pyqtSignal(int, bool)  # column, ascending
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.df = pd.DataFrame()
+        self.rows = np.arange(0, dtype=np.int64)
+
+    def set_frame(self, df):
+        self.beginResetModel()
+        self.df = df
+        self.rows = np.arange(len(df), dtype=np.int64)
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.df.shape[1]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        value = self.df.iat[self.rows[index.row()], index.column()]
+        return "" if pd.isna(value) else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return str(self.df.columns[section])
+        return str(self.rows[section] + 1)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        # Sorting a large report would block the GUI thread, so it is only requested here
+        if 0 <= column < self.df.shape[1]:
+            self.sort_requested.emit(column, order == Qt.SortOrder.AscendingOrder)
+
+# ==============================================================================
+# Worker Thread for Sorting/Filtering the Report Table
+# ==============================================================================
+class TableQueryWorker(QObject):
+    finished = pyqtSignal(int, object)  # query id, row positions
+    error = pyqtSignal(str)
+
+    def __init__(self, query_id, df, text, filter_column, sort_column, ascending):
+        super().__init__()
+        self.query_id = query_id
+        self.df = df
+        self.text = text
+        self.filter_column = filter_column
+        self.sort_column = sort_column
+        self.ascending = ascending
+
+    def run(self):
+        try:
+            rows = query_rows(self.df, self.text, self.filter_column, self.sort_column, self.ascending)
+            self.finished.emit(self.query_id, rows)
+        except Exception as e:
+            self.error.emit(f"Gagal mengurutkan/memfilter tabel: {e}")
+            self.finished.emit(self.query_id, None)
+
+# ==============================================================================
+# Histogram drawn from pre-computed bins (see chart_data.py)
+# ==============================================================================
+class HistogramWidget(QWidget):
+    """Paints a Histogram (bin edges + counts) as bars; only the bins are kept, never the raw values."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.histogram = None
+        self.setMinimumHeight(160)
+
+    def set_histogram(self, histogram):
+        self.histogram = histogram
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor('white'))
+        if self.histogram is None or not self.histogram.counts.any():
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Tidak ada data angka untuk kolom ini")
+            return
+        edges, counts = self.histogram
+        margin, label_height = 8, 18
+        width = self.width() - 2 * margin
+        height = self.height() - 2 * margin - label_height
+        bar_width = width / len(counts)
+        peak = counts.max()
+        painter.setBrush(QColor('#4CAF50'))
+        painter.setPen(QColor('#2E7D32'))
+        for i, count in enumerate(counts):
+            bar_height = int(height * count / peak)
+            painter.drawRect(int(margin + i * bar_width), margin + height - bar_height,
+                             max(1, int(bar_width) - 1), bar_height)
+        painter.setPen(QColor('black'))
+        baseline = self.height() - margin
+        painter.drawText(margin, baseline, f"{edges[0]:,.4g}")
+        right_label = f"{edges[-1]:,.4g}"
+        painter.drawText(self.width() - margin - painter.fontMetrics().horizontalAdvance(right_label), baseline,
+                         right_label)
+        painter.drawText(margin, margin + painter.fontMetrics().ascent(), f"maks. {peak:,} baris/bin")
+
+
 # ==============================================================================
 # Main Application Window
 # ==============================================================================
@@ -193,6 +496,9 @@ class App(QMainWindow):
         self.main_layout.addWidget(self.left_panel)
         self.main_layout.addWidget(self.right_panel)
 
+        # True while a watch-mode worker is running; the run button then stops it
+        self.watching = False
+
         self.init_ui_controls()
         self.init_ui_dashboard()
 
@@ -233,7 +539,7 @@ class App(QMainWindow):
         self.left_layout.addLayout(source_b_layout)
         self.merge_key_label = QLabel("4. Masukkan Foreign Key untuk Merge:")
         self.merge_key_input = QLineEdit()
-        self.merge_key_input.setPlaceholderText("Contoh: id_transaksi")
+        self.merge_key_input.setPlaceholderText("Contoh: id_transaksi, atau kode_toko:trim:upper,tanggal")
         self.left_layout.addWidget(self.merge_key_label)
         self.left_layout.addWidget(self.merge_key_input)
         self.merge_type_label = QLabel("5. Pilih Tipe Merge:")
@@ -241,6 +547,62 @@ class App(QMainWindow):
         self.merge_type_selector.addItems(['inner', 'left', 'right', 'outer'])
         self.left_layout.addWidget(self.merge_type_label)
         self.left_layout.addWidget(self.merge_type_selector)
+        self.max_memory_label = QLabel("6. Batas Memori per Chunk (opsional):")
+        self.max_memory_input = QLineEdit()
+        self.max_memory_input.setPlaceholderText("Contoh: 512MB (kosong = 100000 baris/chunk)")
+        self.left_layout.addWidget(self.max_memory_label)
+        self.left_layout.addWidget(self.max_memory_input)
+        self.workers_label = QLabel("7. Jumlah Worker Paralel:")
+        self.workers_input = QSpinBox()
+        self.workers_input.setRange(1, os.cpu_count() or 1)
+        self.workers_input.setValue(1)
+        self.left_layout.addWidget(self.workers_label)
+        self.left_layout.addWidget(self.workers_input)
+        self.join_strategy_label = QLabel("8. Strategi Join:")
+        self.join_strategy_selector = QComboBox()
+        self.join_strategy_selector.addItems(JOIN_STRATEGIES)
+        self.left_layout.addWidget(self.join_strategy_label)
+        self.left_layout.addWidget(self.join_strategy_selector)
+        self.read_engine_label = QLabel("9. Mesin Baca CSV:")
+        self.read_engine_selector = QComboBox()
+        self.read_engine_selector.addItems(READ_ENGINES)
+        self.left_layout.addWidget(self.read_engine_label)
+        self.left_layout.addWidget(self.read_engine_selector)
+        self.output_format_label = QLabel("10. Format Laporan:")
+        self.output_format_selector = QComboBox()
+        self.output_format_selector.addItems(OUTPUT_CHOICES)
+        self.partition_by_input = QLineEdit()
+        self.partition_by_input.setPlaceholderText("Kolom partisi (khusus Hive), contoh: kota")
+        self.left_layout.addWidget(self.output_format_label)
+        self.left_layout.addWidget(self.output_format_selector)
+        self.left_layout.addWidget(self.partition_by_input)
+        self.columns_label = QLabel("11. Kolom yang Dipakai (opsional):")
+        self.columns_input = QLineEdit()
+        self.columns_input.setPlaceholderText("Dipisah koma, contoh: tanggal, kota, jumlah (kosong = semua)")
+        self.left_layout.addWidget(self.columns_label)
+        self.left_layout.addWidget(self.columns_input)
+        self.where_label = QLabel("12. Filter Baris (opsional):")
+        self.where_input = QLineEdit()
+        self.where_input.setPlaceholderText("Contoh: tanggal >= '2024-06-01' and kota == 'Jakarta'")
+        self.left_layout.addWidget(self.where_label)
+        self.left_layout.addWidget(self.where_input)
+        self.max_output_rows_label = QLabel("13. Batas Baris Hasil Join (opsional):")
+        self.max_output_rows_input = QLineEdit()
+        self.max_output_rows_input.setPlaceholderText("Contoh: 50000000 (kosong = 10x sumber terbesar)")
+        self.left_layout.addWidget(self.max_output_rows_label)
+        self.left_layout.addWidget(self.max_output_rows_input)
+        self.on_explosion_label = QLabel("14. Jika Perkiraan Hasil Melewati Batas:")
+        self.on_explosion_selector = QComboBox()
+        self.on_explosion_selector.addItems(EXPLOSION_ACTIONS)
+        self.left_layout.addWidget(self.on_explosion_label)
+        self.left_layout.addWidget(self.on_explosion_selector)
+        self.use_cache_checkbox = QCheckBox("Gunakan cache (hanya parsing file baru/berubah)")
+        self.use_cache_checkbox.setChecked(True)
+        self.left_layout.addWidget(self.use_cache_checkbox)
+        self.recursive_checkbox = QCheckBox("Cari file input di subfolder (termasuk .csv.gz, .csv.zst, .zip)")
+        self.left_layout.addWidget(self.recursive_checkbox)
+        self.watch_checkbox = QCheckBox("Mode pantau (merge ulang otomatis saat ada file baru)")
+        self.left_layout.addWidget(self.watch_checkbox)
         self.run_button = QPushButton("Jalankan Proses Merge")
         self.run_button.setFont(QFont("Arial", 12, QFont.Weight.Bold))
         self.run_button.setStyleSheet("background-color: #4CAF50; color: white; padding: 10px;")
@@ -273,13 +635,84 @@ class App(QMainWindow):
         selector_layout.addWidget(self.refresh_button)
         self.right_layout.addLayout(selector_layout)
 
-        self.table_widget = QTableWidget()
-        self.right_layout.addWidget(self.table_widget)
+        # The report list is read page by page from the report catalog (see report_catalog.py)
+        catalog_layout = QHBoxLayout()
+        self.report_search_input = QLineEdit()
+        self.report_search_input.setPlaceholderText("Cari nama laporan...")
+        self.report_key_filter = QComboBox()
+        self.report_prev_button = QPushButton("◀")
+        self.report_page_label = QLabel("")
+        self.report_next_button = QPushButton("▶")
+        catalog_layout.addWidget(self.report_search_input, 1)
+        catalog_layout.addWidget(self.report_key_filter)
+        catalog_layout.addWidget(self.report_prev_button)
+        catalog_layout.addWidget(self.report_page_label)
+        catalog_layout.addWidget(self.report_next_button)
+        self.right_layout.addLayout(catalog_layout)
+
+        filter_layout = QHBoxLayout()
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter baris (teks yang dicari)...")
+        self.filter_column_selector = QComboBox()
+        self.row_count_label = QLabel("")
+        filter_layout.addWidget(self.filter_input, 1)
+        filter_layout.addWidget(self.filter_column_selector)
+        filter_layout.addWidget(self.row_count_label)
+        self.right_layout.addLayout(filter_layout)
+
+        # The view only asks the model for visible cells, so large reports stay responsive
+        self.table_model = DataFrameTableModel(self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.horizontalHeader().setSortIndicatorShown(False)
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.right_layout.addWidget(self.table_view)
+
+        histogram_layout = QHBoxLayout()
+        histogram_layout.addWidget(QLabel("Distribusi kolom:"))
+        self.histogram_column_selector = QComboBox()
+        self.histogram_bins_input = QSpinBox()
+        self.histogram_bins_input.setRange(5, 200)
+        self.histogram_bins_input.setValue(DEFAULT_BINS)
+        self.histogram_bins_input.setSuffix(" bin")
+        histogram_layout.addWidget(self.histogram_column_selector, 1)
+        histogram_layout.addWidget(self.histogram_bins_input)
+        self.right_layout.addLayout(histogram_layout)
+        self.histogram_widget = HistogramWidget()
+        self.right_layout.addWidget(self.histogram_widget)
+        self.histogram_column_selector.currentIndexChanged.connect(self.update_histogram)
+        self.histogram_bins_input.valueChanged.connect(self.update_histogram)
+
+        self.query_threads = {}
+        self.query_id = 0
+        self.sort_column = None
+        self.sort_ascending = True
 
-        self.refresh_button.clicked.connect(self.populate_report_selector)
+        # Filtering waits until the user stops typing
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(300)
+        self.filter_timer.timeout.connect(self.run_table_query)
+        self.filter_input.textChanged.connect(self.filter_timer.start)
+        self.filter_column_selector.currentIndexChanged.connect(self.run_table_query)
+        self.table_model.sort_requested.connect(self.on_sort_requested)
+
+        self.report_page = 0
+        self.reconcile_thread = None
+        self.report_search_timer = QTimer(self)
+        self.report_search_timer.setSingleShot(True)
+        self.report_search_timer.setInterval(300)
+        self.report_search_timer.timeout.connect(self.show_first_report_page)
+        self.report_search_input.textChanged.connect(self.report_search_timer.start)
+        self.report_key_filter.currentIndexChanged.connect(self.show_first_report_page)
+        self.report_prev_button.clicked.connect(lambda: self.change_report_page(-1))
+        self.report_next_button.clicked.connect(lambda: self.change_report_page(1))
+
+        self.refresh_button.clicked.connect(self.refresh_reports)
         self.report_selector.currentIndexChanged.connect(self.display_report)
 
-        self.populate_report_selector()
+        self.refresh_reports()
 
     def browse_folder(self, line_edit):
         folder = QFileDialog.getExistingDirectory(self, "Pilih Folder")
@@ -287,22 +720,78 @@ class App(QMainWindow):
             line_edit.setText(folder)
     
     def run_merge_process(self):
+        if self.watching:
+            # The worker notices the flag at its next folder check (or after the merge in progress)
+            self.worker.stop_requested = True
+            self.run_button.setEnabled(False)
+            self.run_button.setText("Menghentikan Pemantauan...")
+            return
+
         output_dir = self.output_dir_path.text()
         source_a = self.source_a_path.text()
         source_b = self.source_b_path.text()
         merge_key = self.merge_key_input.text()
         merge_type = self.merge_type_selector.currentText() 
+        max_memory = self.max_memory_input.text().strip() or None
+        workers = self.workers_input.value()
+        join_strategy = self.join_strategy_selector.currentText()
+        read_options = CsvReadOptions(self.read_engine_selector.currentText())
+        output_options = OUTPUT_CHOICES[self.output_format_selector.currentText()]._replace(
+            partition_by=self.partition_by_input.text().strip() or None)
+        use_cache = self.use_cache_checkbox.isChecked()
+        recursive = self.recursive_checkbox.isChecked()
+        columns = parse_columns(self.columns_input.text())
+        where = self.where_input.text().strip() or None
+        watch = self.watch_checkbox.isChecked()
+        max_output_rows = self.max_output_rows_input.text().strip() or None
+        on_explosion = self.on_explosion_selector.currentText()
 
         if not all([output_dir, source_a, source_b, merge_key]):
             self.show_error_message("Harap isi semua field (Folder Output, Source A, B, dan Foreign Key).")
             return
 
-        self.run_button.setEnabled(False)
-        self.run_button.setText("Sedang Memproses...")
+        if output_options.format == 'hive' and not output_options.partition_by:
+            self.show_error_message("Format Hive membutuhkan nama kolom partisi.")
+            return
+
+        try:
+            MergeKey(merge_key)
+        except MergeKeyError as e:
+            self.show_error_message(str(e))
+            return
+
+        if where:
+            try:
+                RowPredicate(where)
+            except FilterExpressionError as e:
+                self.show_error_message(str(e))
+                return
+
+        if max_memory:
+            try:
+                max_memory = parse_memory_size(max_memory)
+            except ValueError as e:
+                self.show_error_message(str(e))
+                return
+
+        if max_output_rows:
+            if not max_output_rows.isdigit() or int(max_output_rows) < 1:
+                self.show_error_message("Batas baris hasil join harus bilangan bulat positif.")
+                return
+            max_output_rows = int(max_output_rows)
+
+        self.watching = watch
+        if watch:
+            self.run_button.setText("Hentikan Pemantauan")
+        else:
+            self.run_button.setEnabled(False)
+            self.run_button.setText("Sedang Memproses...")
         self.log_area.clear()
 
         self.thread = QThread()
-        self.worker = MergeWorker(source_a, source_b, merge_key, output_dir, merge_type)
+        self.worker = MergeWorker(source_a, source_b, merge_key, output_dir, merge_type, max_memory, workers,
+                                  join_strategy, use_cache, read_options, output_options, recursive, columns,
+                                  where, watch, max_output_rows, on_explosion)
         self.worker.moveToThread(self.thread)
 
         self.thread.started.connect(self.worker.run)
@@ -312,20 +801,38 @@ class App(QMainWindow):
         
         self.worker.log.connect(self.log_area.append)
         self.worker.error.connect(self.on_merge_error)
-        self.worker.progress.connect(self.progress_label.setText)
+        self.worker.progress.connect(self.on_merge_progress)
+        self.worker.report_ready.connect(self.populate_report_selector)
         self.thread.finished.connect(self.on_merge_finished)
         
         self.thread.start()
 
     def on_merge_finished(self):
+        self.watching = False
         self.run_button.setEnabled(True)
         self.run_button.setText("Jalankan Proses Merge")
         self.progress_label.setText("Status: Idle")
-        self.populate_report_selector()
+        self.refresh_reports()
         if not self.thread.isInterruptionRequested():
              QMessageBox.information(self, "Selesai", "Proses penggabungan data telah selesai!")
 
 
+    def on_merge_progress(self, event):
+        """Shows a StageProgress event: a phase message, or the finished stage with its throughput."""
+        if event.stage is None:
+            self.progress_label.setText(f"Status: {event.label}")
+            return
+        text = f"Status: {event.stage}"
+        if event.label:
+            text += f" {event.label}"
+        if event.total:
+            text += f" ({event.done}/{event.total})"
+        if event.rows_per_s is not None:
+            text += f" — {event.rows_per_s:,.0f} baris/dtk"
+        if event.mb_per_s is not None:
+            text += f", {event.mb_per_s:.1f} MB/dtk"
+        self.progress_label.setText(text)
+
     def on_merge_error(self, message):
         self.log_area.append(f"❌ ERROR: {message}")
         self.show_error_message(message)
@@ -338,58 +845,122 @@ class App(QMainWindow):
         msg.setWindowTitle("Error")
         msg.exec()
 
+    def report_catalog(self):
+        """The catalog of the selected output folder, or None if the folder does not exist."""
+        output_dir_path = self.output_dir_path.text()
+        output_dir = os.path.join(output_dir_path, 'outputs')
+        if not output_dir_path or not os.path.isdir(output_dir):
+            return None
+        return ReportCatalog(output_dir)
+
+    def refresh_reports(self):
+        """Shows the catalog right away, then reconciles it with the folder in a worker thread."""
+        self.populate_report_selector()
+        catalog = self.report_catalog()
+        if catalog is None or self.reconcile_thread is not None:
+            return
+        self.reconcile_thread = QThread()
+        self.reconcile_worker = CatalogReconcileWorker(catalog)
+        self.reconcile_worker.moveToThread(self.reconcile_thread)
+
+        self.reconcile_thread.started.connect(self.reconcile_worker.run)
+        self.reconcile_worker.finished.connect(self.on_reconcile_finished)
+        self.reconcile_worker.error.connect(self.log_area.append)
+        self.reconcile_worker.finished.connect(self.reconcile_thread.quit)
+        self.reconcile_worker.finished.connect(self.reconcile_worker.deleteLater)
+        self.reconcile_thread.finished.connect(self.reconcile_thread.deleteLater)
+        self.reconcile_thread.start()
+
+    def on_reconcile_finished(self, changes):
+        self.reconcile_thread = None
+        if changes:
+            self.populate_report_selector()
+
+    def show_first_report_page(self):
+        self.report_page = 0
+        self.populate_report_selector()
+
+    def change_report_page(self, step):
+        self.report_page = max(0, self.report_page + step)
+        self.populate_report_selector()
+
     def populate_report_selector(self):
+        """Fills the selector with one page of the catalog, keeping the selected report if it is still listed."""
+        selected = self.report_selector.currentData()
+        # Signals stay blocked while refilling so the first item is not loaded before the selection is restored
+        self.report_selector.blockSignals(True)
         self.report_selector.clear()
-        output_dir_path = self.output_dir_path.text()
-        if not output_dir_path:
+        self.fill_report_selector()
+        index = self.report_selector.findData(selected) if selected else -1
+        self.report_selector.setCurrentIndex(max(index, 0))
+        self.report_selector.blockSignals(False)
+        if self.report_selector.currentData() != selected or selected is None:
+            self.display_report(self.report_selector.currentIndex())
+
+    def fill_report_selector(self):
+        self.report_prev_button.setEnabled(False)
+        self.report_next_button.setEnabled(False)
+        self.report_page_label.setText("")
+        if not self.output_dir_path.text():
             self.report_selector.addItem("Pilih Folder Output terlebih dahulu")
             return
-
-        output_dir = os.path.join(output_dir_path, 'outputs')
-        if not os.path.isdir(output_dir):
+        catalog = self.report_catalog()
+        if catalog is None:
             self.report_selector.addItem("Folder 'outputs' tidak ditemukan")
             return
-            
         try:
-            files = glob.glob(os.path.join(output_dir, "*.csv"))
-            files.sort(key=os.path.getmtime, reverse=True)
-            if files:
-                self.report_selector.addItems([os.path.basename(f) for f in files])
-            else:
-                self.report_selector.addItem("Tidak ada laporan ditemukan")
+            self.populate_report_key_filter(catalog)
+            merge_key = self.report_key_filter.currentData()
+            search = self.report_search_input.text().strip()
+            total = catalog.count(search, merge_key)
+            pages = max(1, -(-total // REPORT_PAGE_SIZE))
+            self.report_page = min(self.report_page, pages - 1)
+            entries = catalog.query(self.report_page * REPORT_PAGE_SIZE, REPORT_PAGE_SIZE, search, merge_key)
         except Exception as e:
+            self.report_selector.addItem("Gagal memuat daftar laporan")
             self.show_error_message(f"Gagal memuat daftar laporan: {e}")
+            return
+
+        for entry in entries:
+            rows = f"{entry.rows:,} baris" if entry.rows is not None else "? baris"
+            self.report_selector.addItem(f"{entry.name}  ({rows})", entry.path)
+        if not entries:
+            self.report_selector.addItem("Tidak ada laporan ditemukan")
+        self.report_page_label.setText(f"Hal. {self.report_page + 1}/{pages} ({total} laporan)")
+        self.report_prev_button.setEnabled(self.report_page > 0)
+        self.report_next_button.setEnabled(self.report_page < pages - 1)
+
+    def populate_report_key_filter(self, catalog):
+        """Lists the merge keys found in the catalog, keeping the current choice."""
+        selected = self.report_key_filter.currentData()
+        keys = catalog.values('merge_key')
+        self.report_key_filter.blockSignals(True)
+        self.report_key_filter.clear()
+        self.report_key_filter.addItem("Semua kunci merge", None)
+        for key in keys:
+            self.report_key_filter.addItem(key, key)
+        self.report_key_filter.setCurrentIndex(max(self.report_key_filter.findData(selected), 0) if selected else 0)
+        self.report_key_filter.blockSignals(False)
 
     def display_report(self, index):
         if index < 0: return
-        output_dir_path = self.output_dir_path.text()
-        if not output_dir_path: return
 
-        file_name = self.report_selector.itemText(index)
-        if not file_name or "tidak ditemukan" in file_name.lower() or "pilih folder" in file_name.lower():
-            self.table_widget.clear()
-            self.table_widget.setRowCount(0)
-            self.table_widget.setColumnCount(0)
+        file_path = self.report_selector.itemData(index)
+        if not file_path:
+            self.show_table_frame(pd.DataFrame())
             return
 
-        output_dir = os.path.join(output_dir_path, 'outputs')
-        file_path = os.path.join(output_dir, file_name)
-
         if not os.path.exists(file_path):
             return
         
         # --- UI Changes for Loading State ---
-        self.table_widget.clear()
-        self.table_widget.setRowCount(1)
-        self.table_widget.setColumnCount(1)
-        self.table_widget.setHorizontalHeaderLabels(["Status"])
-        self.table_widget.setItem(0, 0, QTableWidgetItem("Sedang memuat laporan..."))
+        self.show_table_frame(pd.DataFrame({"Status": ["Sedang memuat laporan..."]}))
         self.report_selector.setEnabled(False)
         self.refresh_button.setEnabled(False)
 
         # --- Run Report Loader in a new thread ---
         self.report_thread = QThread()
-        self.report_worker = ReportLoaderWorker(file_path)
+        self.report_worker = ReportLoaderWorker(file_path, CsvReadOptions(self.read_engine_selector.currentText()))
         self.report_worker.moveToThread(self.report_thread)
 
         self.report_thread.started.connect(self.report_worker.run)
@@ -402,18 +973,47 @@ class App(QMainWindow):
 
         self.report_thread.start()
 
+    def show_table_frame(self, df):
+        """Replaces the table contents and resets the sort/filter state."""
+        self.query_id += 1  # Results of queries still running for the old frame are ignored
+        self.filter_timer.stop()
+        self.sort_column = None
+        self.table_view.horizontalHeader().setSortIndicatorShown(False)
+        self.table_model.set_frame(df)
+
+        self.filter_input.blockSignals(True)
+        self.filter_input.clear()
+        self.filter_input.blockSignals(False)
+        self.filter_column_selector.blockSignals(True)
+        self.filter_column_selector.clear()
+        self.filter_column_selector.addItem("Semua kolom")
+        self.filter_column_selector.addItems([str(c) for c in df.columns])
+        self.filter_column_selector.blockSignals(False)
+        self.update_row_count_label()
+
+        # Only numeric columns get a histogram
+        self.histogram_column_selector.blockSignals(True)
+        self.histogram_column_selector.clear()
+        self.histogram_column_selector.addItems([str(c) for c in df.columns
+                                                 if pd.api.types.is_numeric_dtype(df[c])
+                                                 and not pd.api.types.is_bool_dtype(df[c])])
+        self.histogram_column_selector.blockSignals(False)
+        self.update_histogram()
+
+    def update_histogram(self):
+        """Bins the selected column of the loaded report with the same kernel as the web dashboard."""
+        column = self.histogram_column_selector.currentText()
+        df = self.table_model.df
+        histogram = None
+        if column in df.columns:
+            histogram = series_histogram(df[column], self.histogram_bins_input.value())
+        self.histogram_widget.set_histogram(histogram)
+
     def populate_table_with_data(self, df):
         try:
-            self.table_widget.clear()
-            self.table_widget.setRowCount(df.shape[0])
-            self.table_widget.setColumnCount(df.shape[1])
-            self.table_widget.setHorizontalHeaderLabels(df.columns)
-
-            for i, row in df.iterrows():
-                for j, val in enumerate(row):
-                    self.table_widget.setItem(i, j, QTableWidgetItem(str(val)))
-            
-            self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+            self.show_table_frame(df)
+            # Column widths are measured from a sample of rows, not the whole report
+            self.table_view.resizeColumnsToContents()
         except Exception as e:
             self.show_error_message(f"Gagal menampilkan data di tabel: {e}")
         finally:
@@ -422,15 +1022,65 @@ class App(QMainWindow):
 
     def on_report_load_error(self, message):
         self.show_error_message(message)
-        self.table_widget.clear()
-        self.table_widget.setRowCount(1)
-        self.table_widget.setColumnCount(1)
-        self.table_widget.setHorizontalHeaderLabels(["Error"])
-        self.table_widget.setItem(0, 0, QTableWidgetItem("Gagal memuat data."))
+        self.show_table_frame(pd.DataFrame({"Error": ["Gagal memuat data."]}))
         self.report_selector.setEnabled(True)
         self.refresh_button.setEnabled(True)
 
+    def update_row_count_label(self):
+        shown, total = len(self.table_model.rows), len(self.table_model.df)
+        self.row_count_label.setText(f"{shown:,} dari {total:,} baris")
+
+    def on_sort_requested(self, column, ascending):
+        self.sort_column = self.table_model.df.columns[column]
+        self.sort_ascending = ascending
+        self.run_table_query()
+
+    def run_table_query(self):
+        """Runs the current filter and sort settings on the report in a worker thread."""
+        df = self.table_model.df
+        if df.empty and not len(df.columns):
+            return
+        text = self.filter_input.text().strip()
+        filter_index = self.filter_column_selector.currentIndex()
+        filter_column = df.columns[filter_index - 1] if filter_index > 0 else None
+
+        self.query_id += 1
+        self.row_count_label.setText("Memproses...")
+        thread = QThread()
+        worker = TableQueryWorker(self.query_id, df, text, filter_column, self.sort_column, self.sort_ascending)
+        worker.moveToThread(thread)
+        # Keep references until the thread finishes; several queries may be in flight
+        self.query_threads[thread] = worker
+
+        thread.started.connect(worker.run)
+        worker.finished.connect(self.on_table_query_finished)
+        worker.error.connect(self.show_error_message)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(self.on_query_thread_finished)
+        thread.start()
+
+    def on_query_thread_finished(self):
+        thread = self.sender()
+        thread.wait()
+        self.query_threads.pop(thread, None)
+
+    def on_table_query_finished(self, query_id, rows):
+        if query_id != self.query_id:
+            return  # A newer query has been started; this result is outdated
+        if rows is not None:
+            self.table_model.set_rows(rows)
+            if self.sort_column is not None:
+                header = self.table_view.horizontalHeader()
+                order = Qt.SortOrder.AscendingOrder if self.sort_ascending else Qt.SortOrder.DescendingOrder
+                header.blockSignals(True)
+                header.setSortIndicator(list(self.table_model.df.columns).index(self.sort_column), order)
+                header.blockSignals(False)
+                header.setSortIndicatorShown(True)
+        self.update_row_count_label()
+
 if __name__ == "__main__":
+    # Required for the consolidation process pool in PyInstaller builds
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = App()
     window.show()
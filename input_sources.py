@@ -0,0 +1,233 @@
+import io
+import os
+import queue
+import threading
+import zipfile
+
+import pyarrow as pa
+
+# ==============================================================================
+# Penemuan dan pembukaan file input (CSV biasa, terkompresi, dan arsip .zip)
+# ==============================================================================
+# Folder sumber boleh berisi file `.csv`, `.csv.gz`, `.csv.zst`, dan arsip
+# `.zip` berisi banyak CSV. Semuanya dibaca langsung sebagai stream, tanpa
+# diekstrak ke disk lebih dulu.
+#
+# File CSV di dalam arsip ditunjuk dengan path virtual `<arsip.zip>/<member>`,
+# mis. 'files/source_a/bundle.zip/2024/jan.csv'. Path ini dipakai seperti path
+# file biasa di seluruh proses (daftar file, manifest cache, log), dan dibuka
+# lewat `open_input`.
+#
+# Untuk input terkompresi, dekompresi dijalankan oleh thread terpisah yang
+# membaca beberapa blok di depan (readahead), sehingga dekompresi blok
+# berikutnya berjalan bersamaan dengan parsing blok saat ini (zlib, zstd, dan
+# dekompresi pyarrow melepas GIL).
+
+# Kompresi yang didukung dan akhiran nama filenya
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+# Akhiran file input yang dikenali, dan akhiran arsip
+INPUT_SUFFIXES = ('.csv',) + tuple('.csv' + suffix for suffix in COMPRESSION_SUFFIXES.values())
+ARCHIVE_SUFFIX = '.zip'
+
+# Ukuran satu blok readahead (byte) dan jumlah blok yang boleh menunggu di antrean
+READAHEAD_BLOCK_SIZE = 1024 ** 2
+READAHEAD_BLOCKS = 4
+
+
+def is_compressed(file_path):
+    return str(file_path).endswith(tuple(COMPRESSION_SUFFIXES.values()))
+
+
+def archive_member(file_path):
+    """
+    Memecah path virtual member arsip.
+
+    Returns:
+        tuple: (path arsip .zip, nama member) jika `file_path` menunjuk file di
+        dalam arsip, selain itu None.
+    """
+    file_path = str(file_path)
+    lowered = file_path.lower()
+    start = 0
+    while True:
+        index = lowered.find(ARCHIVE_SUFFIX, start)
+        if index < 0:
+            return None
+        end = index + len(ARCHIVE_SUFFIX)
+        if file_path[end:end + 1] in ('/', os.sep) and os.path.isfile(file_path[:end]):
+            return file_path[:end], file_path[end + 1:].replace(os.sep, '/')
+        start = end
+
+
+def _is_hidden(name):
+    return any(part.startswith('.') or part == '__MACOSX' for part in name.split('/'))
+
+
+def archive_files(archive_path):
+    """Daftar path virtual file CSV di dalam arsip .zip, diurutkan berdasarkan nama member."""
+    with zipfile.ZipFile(archive_path) as archive:
+        names = [info.filename for info in archive.infolist()
+                 if not info.is_dir() and info.filename.endswith('.csv') and not _is_hidden(info.filename)]
+    return [f"{archive_path}/{name}" for name in sorted(names)]
+
+
+def list_input_files(input_path, recursive=False, log=print):
+    """
+    Mendapatkan daftar file input di dalam folder, diurutkan berdasarkan path.
+
+    Args:
+        input_path (str): Folder sumber.
+        recursive (bool): Ikut mencari di semua subfolder.
+        log (callable): Fungsi untuk menampilkan pesan progres.
+
+    Returns:
+        list: Path file `.csv`, `.csv.gz`, `.csv.zst`, dan path virtual setiap
+        CSV di dalam arsip `.zip`.
+    """
+    if recursive:
+        paths = []
+        for root, dirs, names in os.walk(input_path):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            paths.extend(os.path.join(root, name) for name in names)
+    else:
+        paths = [os.path.join(input_path, name) for name in os.listdir(input_path)]
+
+    files = []
+    for path in sorted(paths):
+        name = os.path.basename(path)
+        if name.startswith('.') or not os.path.isfile(path):
+            continue
+        if name.lower().endswith(ARCHIVE_SUFFIX):
+            try:
+                files.extend(archive_files(path))
+            except (zipfile.BadZipFile, OSError) as e:
+                log(f"❌ Gagal membuka arsip {name}: {e}")
+        elif name.endswith(INPUT_SUFFIXES):
+            files.append(path)
+    return files
+
+
+def input_stat(file_path):
+    """
+    Ukuran dan waktu modifikasi file input, untuk mendeteksi perubahan.
+
+    Untuk member arsip, ukurannya adalah ukuran member setelah didekompresi dan
+    waktunya adalah waktu modifikasi arsip.
+
+    Returns:
+        tuple: (ukuran dalam byte, mtime dalam nanodetik).
+    """
+    member = archive_member(file_path)
+    if member is None:
+        stat = os.stat(file_path)
+        return stat.st_size, stat.st_mtime_ns
+    archive_path, name = member
+    with zipfile.ZipFile(archive_path) as archive:
+        size = archive.getinfo(name).file_size
+    return size, os.stat(archive_path).st_mtime_ns
+
+
+def input_size(file_path):
+    """Jumlah byte yang dibaca dari disk untuk file input (ukuran terkompresi untuk member arsip)."""
+    member = archive_member(file_path)
+    if member is None:
+        return os.path.getsize(file_path)
+    archive_path, name = member
+    with zipfile.ZipFile(archive_path) as archive:
+        return archive.getinfo(name).compress_size
+
+
+class _ReadaheadStream(io.RawIOBase):
+    """
+    Stream yang dibaca oleh thread latar belakang beberapa blok di depan pembacanya.
+
+    Args:
+        raw: Stream sumber (mis. stream dekompresi); ditutup bersama stream ini.
+        block_size (int): Ukuran satu blok (byte).
+        blocks (int): Jumlah blok maksimal yang menunggu di antrean.
+    """
+
+    def __init__(self, raw, block_size=READAHEAD_BLOCK_SIZE, blocks=READAHEAD_BLOCKS):
+        super().__init__()
+        self._raw = raw
+        self._block_size = block_size
+        self._queue = queue.Queue(blocks)
+        self._stop = threading.Event()
+        self._pending = memoryview(b'')
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                block = self._raw.read(self._block_size)
+                self._put(block)
+                if not block:
+                    return
+        except BaseException as e:
+            # Kesalahan baca (mis. file rusak) dilempar ulang di thread pembaca
+            self._put(e)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._pending:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._pending = memoryview(item)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._raw.close()
+        super().close()
+
+
+def open_input(file_path, readahead=True):
+    """
+    Membuka file input sebagai stream biner berisi teks CSV yang sudah didekompresi.
+
+    Args:
+        file_path (str): Path file, atau path virtual member arsip .zip.
+        readahead (bool): Dekompresi oleh thread terpisah, bersamaan dengan
+            parsing. Matikan untuk pembacaan pendek (header atau sampel).
+
+    Returns:
+        Stream biner yang harus ditutup oleh pemanggil.
+    """
+    member = archive_member(file_path)
+    if member is not None:
+        # Arsip tetap terbuka sampai member ditutup
+        with zipfile.ZipFile(member[0]) as archive:
+            raw = archive.open(member[1])
+    elif is_compressed(file_path):
+        # pandas butuh paket zstandard untuk .zst, jadi dekompresi dilakukan oleh pyarrow
+        raw = pa.input_stream(file_path, compression='detect')
+    else:
+        return open(file_path, 'rb')
+    if not readahead:
+        return raw
+    return io.BufferedReader(_ReadaheadStream(raw), READAHEAD_BLOCK_SIZE)
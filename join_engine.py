@@ -0,0 +1,430 @@
+import math
+import os
+import shutil
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import ipc
+
+from arrow_store import (ARROW_SUFFIX, batch_offsets, dataset_size, iter_tables, null_columns, unified_schema,
+                         write_table_file)
+from consolidation import DEFAULT_CHUNK_ROWS, parse_memory_size, resolve_workers
+from key_skew import format_key, skew_splits
+from merge_keys import join_frames, key_hashes, without_key_column
+from metrics import RunMetrics, measure
+from report_writer import ReportWriter
+from schema_inference import merge_input_dtypes, merge_input_frame
+
+# ==============================================================================
+# Join out-of-core (grace hash join)
+# ==============================================================================
+# Kedua sisi hasil konsolidasi (dataset Arrow) dipecah ke N file partisi Arrow
+# di disk berdasarkan hash kolom kunci, lalu setiap pasangan partisi di-join
+# satu per satu dengan pd.merge. Kunci yang sama selalu jatuh ke partisi yang
+# sama, jadi hasilnya identik dengan pd.merge pada seluruh data, tetapi memori
+# yang dipakai hanya sebesar satu pasangan partisi. Kunci berat yang lebih besar
+# dari satu partisi dipecah ke beberapa pasangan (lihat _Router), dan pasangan
+# partisi bisa di-join oleh beberapa proses sekaligus.
+
+JOIN_TYPES = ('inner', 'left', 'right', 'outer')
+
+# 'auto' = dipilih oleh perencana join dari perkiraan ukuran (lihat join_planner.py),
+# 'memory' = pd.merge biasa, 'partitioned' = grace hash join di disk,
+# 'indexed' = lookup join lewat indeks kunci Source B di disk (lihat key_index.py),
+# 'presorted' = sort-merge join streaming untuk sumber yang terurut (lihat sort_merge.py)
+JOIN_STRATEGIES = ('auto', 'memory', 'partitioned', 'indexed', 'presorted')
+
+DEFAULT_PARTITIONS = 16
+
+# Perkiraan rasio memori pandas terhadap ukuran file Arrow saat satu pasangan
+# partisi dan hasil merge-nya berada di memori bersamaan.
+_JOIN_MEMORY_FACTOR = 3
+
+# Kolom bantu berisi nomor baris asli, dipakai untuk mengembalikan urutan
+# baris hasil join agar sama persis dengan pd.merge.
+_SEQ_A = '__seq_a__'
+_SEQ_B = '__seq_b__'
+
+# Tipe Arrow bilangan bulat -> dtype nullable pandas, agar kolom bulat yang
+# sebagian kosong tidak berubah menjadi float saat hasil join dibaca ulang.
+_NULLABLE_INTS = {
+    pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(), pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(), pa.uint8(): pd.UInt8Dtype(), pa.uint16(): pd.UInt16Dtype(),
+    pa.uint32(): pd.UInt32Dtype(), pa.uint64(): pd.UInt64Dtype(),
+}
+
+
+def estimate_partitions(files, max_memory):
+    """Menghitung jumlah partisi agar satu pasangan partisi (dari dataset Arrow) muat dalam batas memori."""
+    if not max_memory:
+        return DEFAULT_PARTITIONS
+    total_size = sum(dataset_size(f) for f in files)
+    return max(1, math.ceil(total_size * _JOIN_MEMORY_FACTOR / parse_memory_size(max_memory)))
+
+
+class _Router:
+    """
+    Menentukan file partisi setiap baris.
+
+    Baris biasa masuk partisi nomor hash kunci % `partitions` (kunci kosong
+    selalu partisi 0). Baris kunci berat yang dipecah (lihat key_skew.skew_splits)
+    mendapat file sendiri: baris di sisi yang dipecah dibagi ke beberapa bagian
+    yang sama besar sesuai urutannya, baris sisi lainnya ditulis ke satu file
+    yang dibaca oleh setiap bagian.
+
+    Args:
+        partitions (int): Jumlah partisi biasa.
+        splits (list): (HeavyKey, sisi yang dipecah, jumlah bagian) untuk setiap kunci yang dipecah.
+    """
+
+    def __init__(self, partitions, splits=()):
+        self.partitions = partitions
+        self.splits = list(splits)
+        self.starts = np.cumsum([0] + [slices for _, _, slices in self.splits])
+        self.shared = partitions + int(self.starts[-1])
+        self.seen = {'a': [0] * len(self.splits), 'b': [0] * len(self.splits)}
+
+    def ids(self):
+        """Semua nomor file partisi yang mungkin ditulis."""
+        return range(self.shared + len(self.splits))
+
+    def jobs(self):
+        """Pasangan yang di-join: (nomor partisi Source A, nomor partisi Source B, nomor file hasil)."""
+        jobs = [(p, p, p) for p in range(self.partitions)]
+        for j, (_, split_side, slices) in enumerate(self.splits):
+            for i in range(slices):
+                part = self.partitions + int(self.starts[j]) + i
+                jobs.append((part, self.shared + j, part) if split_side == 'a' else (self.shared + j, part, part))
+        return jobs
+
+    def route(self, side, keys):
+        """Nomor partisi setiap baris satu chunk `side` ('a'/'b'), dengan urutan baris seperti di dataset."""
+        hashes = key_hashes(keys)
+        ids = (hashes % np.uint64(self.partitions)).astype(np.int64)
+        for j, (key, split_side, slices) in enumerate(self.splits):
+            rows = np.flatnonzero(hashes == np.uint64(key.hash))
+            if not len(rows):
+                continue
+            if side == split_side:
+                start = self.partitions + int(self.starts[j])
+                # Bagian berurutan (bukan bergiliran) agar hasil setiap bagian tidak saling menyela saat digabung
+                rank = self.seen[side][j] + np.arange(len(rows))
+                ids[rows] = start + np.minimum(rank * slices // max(key.rows_a, key.rows_b), slices - 1)
+                self.seen[side][j] += len(rows)
+            else:
+                ids[rows] = self.shared + j
+        return ids
+
+
+def _spill_path(work_dir, prefix, partition):
+    return os.path.join(work_dir, f"{prefix}_{partition:04d}{ARROW_SUFFIX}")
+
+
+def _read_spill(path, schema, dtypes, nulls):
+    """Satu file partisi sebagai DataFrame dengan dtype seperti read_merge_input."""
+    table = pa.concat_tables(iter_tables(path, schema=schema)) if os.path.exists(path) else schema.empty_table()
+    return merge_input_frame(table, dtypes, nulls)
+
+
+def _partition_side(dataset_path, merge_key, router, work_dir, prefix, seq_col, chunk_rows):
+    """
+    Membaca satu sisi per chunk dan menulis setiap baris ke file partisi sesuai hash kuncinya.
+
+    Returns:
+        tuple: (skema file partisi (kolom dataset ditambah kolom nomor baris), jumlah baris).
+    """
+    source_schema = unified_schema(dataset_path)
+    schema = source_schema.append(pa.field(seq_col, pa.int64()))
+    writers = {}
+    offset = 0
+    try:
+        for table in iter_tables(dataset_path, chunk_rows, schema=source_schema):
+            table = table.append_column(seq_col, pa.array(np.arange(offset, offset + table.num_rows, dtype=np.int64)))
+            offset += table.num_rows
+            ids = router.route(prefix, table.column(merge_key).to_pandas())
+            # Baris dikelompokkan per partisi dengan sort stabil, urutan asli di dalam partisi tetap
+            order = np.argsort(ids, kind='stable')
+            present, starts = np.unique(ids[order], return_index=True)
+            for partition, start, end in zip(present, starts, list(starts[1:]) + [len(order)]):
+                if partition not in writers:
+                    writers[partition] = ipc.new_file(_spill_path(work_dir, prefix, partition), schema)
+                writers[partition].write_table(table.take(order[start:end]))
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return schema, offset
+
+
+def _sort_columns(merge_key, how, key_columns=()):
+    """
+    Urutan baris pd.merge: kanan untuk 'right', kunci terurut untuk 'outer', selain itu kiri.
+
+    Untuk join hash (`key_columns`, lihat merge_keys.py), 'outer' diurutkan menurut
+    kolom kunci, bukan menurut hash di kolom join.
+    """
+    if how == 'right':
+        return [_SEQ_B, _SEQ_A]
+    if how == 'outer':
+        return (list(key_columns) or [merge_key]) + [_SEQ_A, _SEQ_B]
+    return [_SEQ_A, _SEQ_B]
+
+
+def _min_nan_last(values):
+    present = [v for v in values if not pd.isna(v)]
+    return min(present) if present else np.nan
+
+
+def _before(series, frontier):
+    """Baris yang nilainya pasti lebih kecil dari frontier (NaN dianggap paling akhir)."""
+    if pd.isna(frontier):
+        return series.notna()
+    return series.notna() & (series < frontier)
+
+
+def _same(value, frontier):
+    if pd.isna(frontier):
+        return pd.isna(value)
+    return not pd.isna(value) and value == frontier
+
+
+def concat_frames(frames, **kwargs):
+    """
+    pd.concat untuk potongan dari dataset yang sama.
+
+    Kolom yang seluruhnya kosong di satu potongan (mis. kolom category tanpa
+    nilai) tidak mengubah hasil, jadi FutureWarning pandas untuk kasus itu
+    tidak perlu ditampilkan.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='The behavior of DataFrame concatenation', category=FutureWarning)
+        return pd.concat(frames, **kwargs)
+
+
+def merge_sorted_frames(readers, sort_columns):
+    """
+    Menggabungkan beberapa aliran DataFrame yang masing-masing sudah terurut
+    menurut `sort_columns` (k-way merge) menjadi satu aliran DataFrame terurut.
+
+    Hanya beberapa chunk dari setiap aliran yang berada di memori.
+
+    Args:
+        readers (list): Iterator DataFrame, masing-masing terurut (NaN di akhir).
+        sort_columns (list): Kolom urutan; kolom pertama menjadi acuan frontier.
+
+    Yields:
+        pd.DataFrame: Potongan hasil gabungan yang terurut dan tidak kosong.
+    """
+    primary = sort_columns[0]
+    readers = list(readers)
+    buffers = [None] * len(readers)
+    exhausted = [False] * len(readers)
+
+    def refill(i):
+        chunk = next(readers[i], None)
+        if chunk is None:
+            exhausted[i] = True
+        else:
+            buffers[i] = chunk if buffers[i] is None or buffers[i].empty else concat_frames([buffers[i], chunk])
+
+    def batch(parts):
+        parts = [p for p in parts if p is not None and not p.empty]
+        if parts:
+            return concat_frames(parts).sort_values(sort_columns, na_position='last', kind='stable')
+        return None
+
+    for i in range(len(readers)):
+        refill(i)
+
+    while True:
+        open_readers = [i for i in range(len(readers)) if not exhausted[i]]
+        if not open_readers:
+            ready = batch(buffers)
+            if ready is not None:
+                yield ready
+            return
+
+        # Baris di bawah frontier sudah pasti tidak akan didahului baris lain yang belum dibaca
+        frontier = _min_nan_last([buffers[i][primary].iloc[-1] for i in open_readers])
+        ready = []
+        for i, buffer in enumerate(buffers):
+            if buffer is None or buffer.empty:
+                continue
+            mask = _before(buffer[primary], frontier)
+            ready.append(buffer[mask])
+            buffers[i] = buffer[~mask]
+        ready = batch(ready)
+        if ready is not None:
+            yield ready
+
+        for i in open_readers:
+            if buffers[i].empty or _same(buffers[i][primary].iloc[-1], frontier):
+                refill(i)
+
+
+def _merge_sorted_files(files, sort_columns, writer, chunk_rows):
+    """
+    Menggabungkan beberapa file hasil join yang masing-masing sudah terurut
+    (k-way merge) ke laporan (`writer`, lihat report_writer.ReportWriter),
+    dengan membaca setiap file per chunk.
+
+    Returns:
+        int: Jumlah baris yang ditulis.
+    """
+    # Dtype hasil tiap partisi bisa berbeda (mis. int vs float jika ada NaN), jadi disatukan dulu
+    schema = unified_schema(files) if files else None
+    readers = [(table.to_pandas(types_mapper=_NULLABLE_INTS.get) for table in iter_tables(f, chunk_rows, schema))
+               for f in files]
+    total_rows = 0
+    try:
+        for batch in merge_sorted_frames(readers, sort_columns):
+            writer.write(batch)
+            total_rows += len(batch)
+    finally:
+        for reader in readers:
+            reader.close()
+    return total_rows
+
+
+def _join_partition(work_dir, job, sides, merge_key, how, sort_columns, chunk_rows, key_columns=()):
+    """
+    Men-join satu pasangan partisi dan menulis hasilnya (terurut) ke file Arrow.
+
+    Args:
+        job (tuple): (nomor partisi Source A, nomor partisi Source B, nomor file hasil).
+        sides (dict): Untuk 'a' dan 'b': (skema file partisi, peta dtype, kolom yang berisi null).
+        key_columns (list): Kolom kunci yang disatukan setelah join hash (lihat merge_keys.join_frames).
+
+    Returns:
+        tuple: (file hasil atau None jika hasilnya kosong, jumlah baris hasil).
+    """
+    a_part, b_part, result_part = job
+    left = _read_spill(_spill_path(work_dir, 'a', a_part), *sides['a'])
+    right = _read_spill(_spill_path(work_dir, 'b', b_part), *sides['b'])
+    if left.empty and right.empty:
+        return None, 0
+    merged = join_frames(left, right, merge_key, how, key_columns)
+    if merged.empty:
+        return None, 0
+    merged = merged.sort_values(sort_columns, na_position='last', kind='stable')
+    result_file = _spill_path(work_dir, 'r', result_part)
+    write_table_file(merged, result_file, chunk_rows)
+    return result_file, len(merged)
+
+
+def _measure_partition(work_dir, job, sides, merge_key, how, sort_columns, chunk_rows, key_columns=()):
+    """Menjalankan _join_partition sebagai satu record tahap (juga di proses worker)."""
+    with measure('join_partition', partition=job[2]) as record:
+        result_file, record['rows'] = _join_partition(work_dir, job, sides, merge_key, how, sort_columns, chunk_rows,
+                                                      key_columns)
+        if result_file:
+            record['bytes_written'] = os.path.getsize(result_file)
+    return result_file, record
+
+
+def _collect_partitions(results, total, metrics, log):
+    """Mencatat hasil setiap pasangan partisi (urut sesuai daftar job) dan mengembalikan file hasilnya."""
+    result_files = []
+    for done, (result_file, record) in enumerate(results, 1):
+        metrics.add(record, done, total)
+        if result_file:
+            result_files.append(result_file)
+            log(f"  -> Partisi {done}/{total}: {record['rows']} baris")
+    return result_files
+
+
+def partitioned_hash_join(left_file, right_file, merge_key, how, output_file,
+                          partitions=None, max_memory=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                          work_dir=None, skew_keys=None, workers=1, output_options=None, key_columns=(), metrics=None,
+                          log=print):
+    """
+    Menjalankan join dua dataset Arrow hasil konsolidasi tanpa memuat keduanya ke memori.
+
+    Hasilnya (kolom, isi, dan urutan baris) sama dengan merge di memori:
+    pd.merge(read_merge_input(left_file, ...), read_merge_input(right_file, ...), on=merge_key, how=how).
+
+    Args:
+        left_file (str): Dataset Arrow Source A (sisi kiri).
+        right_file (str): Dataset Arrow Source B (sisi kanan).
+        merge_key (str): Kolom kunci merge.
+        how (str): Tipe merge: 'inner', 'left', 'right', atau 'outer'.
+        output_file (str): File laporan hasil join.
+        partitions (int): Jumlah partisi; jika kosong dihitung dari `max_memory`.
+        max_memory (str | int): Batas memori untuk satu pasangan partisi (opsional).
+        chunk_rows (int): Jumlah baris per chunk saat membaca file.
+        work_dir (str): Folder untuk file partisi sementara.
+        skew_keys (list): Kunci berat dari tahap statistik (HeavyKey, lihat key_skew.py).
+            Kunci yang lebih besar dari satu partisi dipecah ke beberapa bagian (opsional).
+        workers (int): Jumlah proses paralel untuk men-join partisi; 0 berarti semua core CPU.
+        output_options (OutputOptions): Format laporan (opsional; default CSV, lihat report_writer.py).
+        key_columns (list): Kolom kunci yang disatukan setelah join hash (MergeKey.key_columns, lihat
+            merge_keys.py); KEY_COLUMN tidak ditulis ke laporan.
+        metrics (RunMetrics): Tempat mencatat metrik setiap tahap (opsional).
+        log (callable): Fungsi untuk menampilkan pesan progres.
+
+    Returns:
+        int: Jumlah baris hasil join.
+    """
+    if how not in JOIN_TYPES:
+        raise ValueError(f"Tipe merge tidak dikenal: '{how}'. Pilihan: {', '.join(JOIN_TYPES)}")
+    partitions = partitions or estimate_partitions([left_file, right_file], max_memory)
+    chunk_rows = chunk_rows or DEFAULT_CHUNK_ROWS
+    work_dir = work_dir or f"{output_file}.join"
+    metrics = metrics or RunMetrics('join')
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir, exist_ok=True)
+
+    try:
+        # Ukuran satu partisi: baris input ditambah baris hasil kunci berat, dibagi rata
+        skew_keys = skew_keys or []
+        rows = sum(n for f in (left_file, right_file) for _, _, _, n in batch_offsets(f))
+        rows += sum(k.output_rows for k in skew_keys)
+        router = _Router(partitions, skew_splits(skew_keys, math.ceil(rows / partitions)))
+        log(f"Mempartisi kedua sumber ke {partitions} partisi berdasarkan hash '{merge_key}'...")
+        for key, split_side, slices in router.splits:
+            log(f"  -> Kunci berat {format_key(key.key)} ({key.rows_a} baris A, {key.rows_b} baris B) "
+                f"dipecah ke {slices} bagian")
+        # Dtype kedua sisi disamakan dengan read_merge_input
+        sides = {}
+        for side, dataset_path, seq_col in (('a', left_file, _SEQ_A), ('b', right_file, _SEQ_B)):
+            with metrics.stage('partition', source=dataset_path, bytes_read=dataset_size(dataset_path)) as record:
+                schema, record['rows'] = _partition_side(dataset_path, merge_key, router, work_dir,
+                                                         side, seq_col, chunk_rows)
+                record['bytes_written'] = sum(os.path.getsize(_spill_path(work_dir, side, i))
+                                              for i in router.ids()
+                                              if os.path.exists(_spill_path(work_dir, side, i)))
+            sides[side] = (schema, merge_input_dtypes(dataset_path, merge_key), null_columns(dataset_path))
+
+        sort_columns = _sort_columns(merge_key, how, key_columns)
+        empty_a, empty_b = (merge_input_frame(schema.empty_table(), dtypes, nulls)
+                            for schema, dtypes, nulls in (sides['a'], sides['b']))
+        merged_columns = list(join_frames(empty_a, empty_b, merge_key, how, key_columns).columns)
+        output_columns = [c for c in without_key_column(merged_columns) if c not in (_SEQ_A, _SEQ_B)]
+
+        jobs = router.jobs()
+        args = (sides, merge_key, how, sort_columns, chunk_rows, key_columns)
+        workers = min(resolve_workers(workers), len(jobs))
+        if workers > 1:
+            log(f"Men-join {len(jobs)} partisi dengan {workers} worker...")
+            pool = ProcessPoolExecutor(max_workers=workers)
+            try:
+                futures = [pool.submit(_measure_partition, work_dir, job, *args) for job in jobs]
+                results = (future.result() for future in futures)
+                result_files = _collect_partitions(results, len(jobs), metrics, log)
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+        else:
+            results = (_measure_partition(work_dir, job, *args) for job in jobs)
+            result_files = _collect_partitions(results, len(jobs), metrics, log)
+
+        # Setiap file hasil dibaca per chunk, jadi ukuran chunk dibagi jumlah file
+        merge_chunk_rows = max(1000, chunk_rows // max(1, len(result_files)))
+        with metrics.stage('merge_output', files=len(result_files)) as record:
+            with ReportWriter(output_file, output_columns, output_options) as writer:
+                record['rows'] = _merge_sorted_files(result_files, sort_columns, writer, merge_chunk_rows)
+            record['bytes_written'] = writer.bytes_written
+        return record['rows']
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
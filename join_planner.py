@@ -0,0 +1,322 @@
+import math
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from arrow_store import batch_offsets, dataset_size, iter_tables, unified_schema
+from consolidation import DEFAULT_CHUNK_ROWS, parse_memory_size
+from join_engine import estimate_partitions
+from key_index import LOOKUP_JOIN_TYPES
+from key_skew import KeyCounter, heavy_keys
+from merge_keys import key_hashes
+from metrics import RunMetrics
+from schema_inference import merge_input_dtypes, merge_input_frame
+from sort_merge import NO_PREVIOUS_KEY, keys_in_order
+
+# ==============================================================================
+# Perencana strategi join ('auto')
+# ==============================================================================
+# Sebelum Tahap 2, kedua dataset hasil konsolidasi diukur: jumlah baris (dari
+# metadata batch), lebar baris di memori (dari sampel), jumlah kunci unik
+# (HyperLogLog atas kolom kunci), kunci berat (lihat key_skew.py), dan apakah
+# kuncinya sudah terurut. Dari situ diperkirakan jumlah baris hasil dan memori
+# yang dibutuhkan pd.merge, lalu dipilih strategi termurah yang muat dalam
+# batas memori:
+#
+#   1. 'memory'      jika pd.merge di memori muat,
+#   2. 'partitioned' jika hasil satu kunci berat pun tidak muat (kunci itu
+#                    dipecah ke beberapa bagian),
+#   3. 'presorted'   jika kedua sumber terurut (satu kali baca berurutan),
+#   4. 'indexed'     untuk 'inner'/'left' jika Source A hanya menyentuh
+#                    sebagian kecil Source B (lookup lewat indeks kunci),
+#   5. 'partitioned' selain itu (grace hash join yang menulis partisi ke disk).
+#
+# Semua strategi menghasilkan laporan yang sama, jadi rencana yang kurang tepat
+# hanya berpengaruh ke waktu dan memori, tidak ke isi laporan.
+
+# Jumlah register HyperLogLog = 2^presisi (16384 register, galat ~0,8%)
+HLL_PRECISION = 14
+
+# Jumlah baris sampel untuk mengukur lebar baris di memori
+SAMPLE_ROWS = 10_000
+
+# Pengali memori pd.merge: salinan indeks dan kolom sementara saat merge
+_MERGE_OVERHEAD = 1.5
+
+# Lookup join dipilih jika baris Source B yang kuncinya muncul di Source A
+# tidak lebih dari bagian ini dari seluruh Source B
+_LOOKUP_MAX_FRACTION = 0.5
+
+# Tanpa --max-memory, batas memori adalah bagian ini dari RAM fisik
+_DEFAULT_MEMORY_FRACTION = 0.5
+
+SideStats = namedtuple('SideStats', ['rows', 'null_keys', 'distinct_keys', 'row_bytes', 'key_sorted', 'sketch',
+                                     'counter'])
+JoinStats = namedtuple('JoinStats', ['a', 'b', 'how', 'estimated_rows', 'common_keys', 'heavy_keys'])
+JoinPlan = namedtuple('JoinPlan', ['strategy', 'estimated_rows', 'memory_bytes', 'budget_bytes', 'partitions',
+                                   'reason'])
+
+
+class HyperLogLog:
+    """
+    Sketch HyperLogLog untuk memperkirakan jumlah nilai unik dari hash uint64.
+
+    Args:
+        precision (int): Jumlah bit hash untuk memilih register (2^precision register).
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes):
+        """Menambahkan array hash uint64."""
+        if not len(hashes):
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = hashes & np.uint64((1 << width) - 1)
+        # Posisi bit 1 pertama (dari kiri) di sisa bit hash
+        rank = (width - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def union(self, other):
+        """Sketch gabungan dua himpunan (register maksimum)."""
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def estimate(self):
+        """Perkiraan jumlah nilai unik."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Koreksi untuk jumlah kecil: linear counting
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+def _bit_length(values):
+    """Jumlah bit setiap nilai uint64 (0 untuk nilai 0), tanpa konversi ke float."""
+    values = values.copy()
+    length = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= np.uint64(1 << shift)
+        length[high] += shift
+        values[high] >>= np.uint64(shift)
+    return length + (values > 0)
+
+
+def _key_chunks(dataset_path, merge_key, chunk_rows):
+    """Kolom kunci dataset per chunk; kolom lain tidak dibaca."""
+    key_schema = pa.schema([unified_schema(dataset_path).field(merge_key)])
+    for table in iter_tables(dataset_path, chunk_rows, schema=key_schema):
+        yield table.column(0).to_pandas()
+
+
+def side_stats(dataset_path, merge_key, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Statistik satu dataset untuk perencanaan join.
+
+    Hanya kolom kunci yang dibaca seluruhnya; lebar baris diukur dari sampel
+    baris pertama dengan dtype yang sama seperti merge di memori.
+    """
+    rows = sum(n for _, _, _, n in batch_offsets(dataset_path))
+    schema = unified_schema(dataset_path)
+
+    sample = next(iter_tables(dataset_path, SAMPLE_ROWS, schema=schema), schema.empty_table())
+    frame = merge_input_frame(sample, merge_input_dtypes(dataset_path, merge_key), set())
+    row_bytes = frame.memory_usage(index=False, deep=True).sum() / len(frame) if len(frame) else 0
+
+    # Kunci kosong dihitung terpisah: bagi pd.merge semuanya satu kunci yang sama
+    sketch = HyperLogLog()
+    counter = KeyCounter(rows)
+    null_keys = 0
+    key_sorted = True
+    last = NO_PREVIOUS_KEY
+    for keys in _key_chunks(dataset_path, merge_key, chunk_rows):
+        present = keys[keys.notna()]
+        null_keys += len(keys) - len(present)
+        hashes = key_hashes(present)
+        sketch.add(hashes)
+        counter.add(present, hashes)
+        if key_sorted and len(keys):
+            key_sorted = keys_in_order(keys, last)
+            last = keys.iloc[-1]
+    distinct_keys = sketch.estimate() if rows > null_keys else 0
+    return SideStats(rows, null_keys, distinct_keys, float(row_bytes), key_sorted, sketch, counter)
+
+
+def _exact_counts(dataset_path, merge_key, hashes, chunk_rows):
+    """Jumlah baris tepat untuk setiap hash kunci di `hashes` (kunci kosong tidak dihitung)."""
+    counts = {}
+    if not hashes:
+        return counts
+    wanted = np.array(sorted(hashes), dtype=np.uint64)
+    for keys in _key_chunks(dataset_path, merge_key, chunk_rows):
+        found = key_hashes(keys[keys.notna()])
+        found = found[np.isin(found, wanted)]
+        for h, n in zip(*np.unique(found, return_counts=True)):
+            counts[int(h)] = counts.get(int(h), 0) + int(n)
+    return counts
+
+
+def estimate_join_rows(a, b, how, heavy=()):
+    """
+    Perkiraan jumlah baris hasil merge dari statistik kedua sisi.
+
+    Baris kunci berat (termasuk kunci kosong, yang semuanya cocok satu sama
+    lain) dihitung tepat per kunci. Untuk kunci lainnya, jumlah kunci yang sama
+    di kedua sisi diperkirakan dari sketch gabungan (|A ∩ B| = |A| + |B| -
+    |A ∪ B|), lalu setiap kunci dianggap punya rata-rata jumlah baris per
+    kunci di masing-masing sisi.
+
+    Args:
+        heavy (list): Daftar HeavyKey (lihat key_skew.heavy_keys).
+
+    Returns:
+        tuple: (perkiraan baris hasil, perkiraan jumlah kunci yang sama).
+    """
+    if not a.distinct_keys or not b.distinct_keys:
+        common = 0
+    else:
+        union = a.sketch.union(b.sketch).estimate()
+        common = min(a.distinct_keys, b.distinct_keys, max(0, a.distinct_keys + b.distinct_keys - union))
+
+    keyed = [k for k in heavy if not pd.isna(k.key)]
+    a_rows = a.rows - a.null_keys - sum(k.rows_a for k in keyed)
+    b_rows = b.rows - b.null_keys - sum(k.rows_b for k in keyed)
+    a_keys = max(0, a.distinct_keys - sum(1 for k in keyed if k.rows_a))
+    b_keys = max(0, b.distinct_keys - sum(1 for k in keyed if k.rows_b))
+    light_common = max(0, min(a_keys, b_keys, common - sum(1 for k in keyed if k.rows_a and k.rows_b)))
+    a_per_key = a_rows / a_keys if a_keys else 0
+    b_per_key = b_rows / b_keys if b_keys else 0
+    matched = light_common * a_per_key * b_per_key
+    a_unmatched = max(0, a_rows - light_common * a_per_key)
+    b_unmatched = max(0, b_rows - light_common * b_per_key)
+    rows = {
+        'inner': matched,
+        'left': matched + a_unmatched,
+        'right': matched + b_unmatched,
+        'outer': matched + a_unmatched + b_unmatched,
+    }[how]
+    return int(round(rows + sum(k.output_rows for k in heavy))), common
+
+
+def join_statistics(left_file, right_file, merge_key, how, chunk_rows=DEFAULT_CHUNK_ROWS, metrics=None, log=print):
+    """
+    Tahap statistik sebelum join: kolom kunci kedua sisi dibaca sekali untuk
+    statistik sisi (side_stats), lalu sekali lagi untuk menghitung tepat baris
+    kandidat kunci berat jika ada.
+
+    Returns:
+        JoinStats: Statistik kedua sisi, perkiraan baris hasil, dan kunci berat.
+    """
+    chunk_rows = chunk_rows or DEFAULT_CHUNK_ROWS
+    metrics = metrics or RunMetrics('join_stats')
+    with metrics.stage('key_stats', how=how) as record:
+        a = side_stats(left_file, merge_key, chunk_rows)
+        b = side_stats(right_file, merge_key, chunk_rows)
+        candidates = {**b.counter.candidates, **a.counter.candidates}
+        heavy = heavy_keys(candidates, _exact_counts(left_file, merge_key, candidates, chunk_rows),
+                           _exact_counts(right_file, merge_key, candidates, chunk_rows),
+                           a.null_keys, b.null_keys, how)
+        estimated_rows, common = estimate_join_rows(a, b, how, heavy)
+        record.update(rows=a.rows + b.rows, bytes_read=dataset_size(left_file) + dataset_size(right_file),
+                      estimated_rows=estimated_rows, common_keys=int(common), heavy_keys=len(heavy),
+                      distinct_keys_a=a.distinct_keys, distinct_keys_b=b.distinct_keys,
+                      row_bytes_a=round(a.row_bytes, 1), row_bytes_b=round(b.row_bytes, 1),
+                      key_sorted_a=a.key_sorted, key_sorted_b=b.key_sorted)
+
+    for name, side in (('A', a), ('B', b)):
+        log(f"  Source {name}: {side.rows} baris, ~{side.distinct_keys} kunci unik, "
+            f"~{side.row_bytes:.0f} byte/baris, kunci {'terurut' if side.key_sorted else 'tidak terurut'}")
+    log(f"Perkiraan hasil join '{how}': {estimated_rows} baris.")
+    return JoinStats(a, b, how, estimated_rows, common, heavy)
+
+
+def memory_budget(max_memory=None):
+    """Batas memori dalam byte: --max-memory, atau sebagian RAM fisik; None jika tidak diketahui."""
+    if max_memory:
+        return parse_memory_size(max_memory)
+    try:
+        return int(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') * _DEFAULT_MEMORY_FRACTION)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def plan_join(left_file, right_file, merge_key, how, max_memory=None, chunk_rows=DEFAULT_CHUNK_ROWS, stats=None,
+              metrics=None, log=print):
+    """
+    Memilih strategi join untuk dua dataset Arrow hasil konsolidasi.
+
+    Args:
+        left_file (str): Dataset Arrow Source A.
+        right_file (str): Dataset Arrow Source B.
+        merge_key (str): Kolom kunci merge.
+        how (str): Tipe merge: 'inner', 'left', 'right', atau 'outer'.
+        max_memory (str | int): Batas memori (opsional; default sebagian RAM fisik).
+        chunk_rows (int): Jumlah baris per chunk saat membaca kolom kunci.
+        stats (JoinStats): Hasil `join_statistics` jika sudah dihitung (opsional).
+        metrics (RunMetrics): Tempat mencatat metrik setiap tahap (opsional).
+        log (callable): Fungsi untuk menampilkan pesan progres.
+
+    Returns:
+        JoinPlan: Strategi terpilih beserta perkiraannya.
+    """
+    metrics = metrics or RunMetrics('join_plan')
+    if stats is None:
+        stats = join_statistics(left_file, right_file, merge_key, how, chunk_rows, metrics, log)
+    a, b, estimated_rows = stats.a, stats.b, stats.estimated_rows
+    with metrics.stage('join_plan', how=how) as record:
+        memory_bytes = int((a.rows * a.row_bytes + b.rows * b.row_bytes
+                            + estimated_rows * (a.row_bytes + b.row_bytes)) * _MERGE_OVERHEAD)
+        budget = memory_budget(max_memory)
+        # Baris Source B yang kuncinya juga ada di Source A (yang akan diambil lookup join)
+        b_touched = stats.common_keys * ((b.rows - b.null_keys) / b.distinct_keys) if b.distinct_keys else 0
+        b_touched += b.null_keys if a.null_keys else 0
+        # Hasil kunci terberat harus muat di memori untuk join yang memuat satu kelompok kunci sekaligus
+        heaviest = stats.heavy_keys[0].output_rows if stats.heavy_keys else 0
+        heaviest_bytes = heaviest * (a.row_bytes + b.row_bytes) * _MERGE_OVERHEAD
+
+        partitions = None
+        if budget is None or memory_bytes <= budget:
+            strategy = 'memory'
+            reason = "pd.merge muat dalam batas memori"
+        elif heaviest_bytes > budget:
+            strategy = 'partitioned'
+            # Jumlah partisi juga dihitung dari hasil join, agar bagian kunci berat muat dalam batas
+            partitions = max(estimate_partitions([left_file, right_file], budget), math.ceil(memory_bytes / budget))
+            reason = f"kunci terberat menghasilkan ~{heaviest} baris, dipecah ke beberapa partisi"
+        elif a.key_sorted and b.key_sorted:
+            strategy = 'presorted'
+            reason = "kedua sumber sudah terurut menurut kunci"
+        elif how in LOOKUP_JOIN_TYPES and b_touched <= _LOOKUP_MAX_FRACTION * b.rows:
+            strategy = 'indexed'
+            reason = f"Source A hanya menyentuh ~{b_touched / max(1, b.rows):.1%} baris Source B"
+        else:
+            strategy = 'partitioned'
+            partitions = estimate_partitions([left_file, right_file], budget)
+            reason = "pd.merge tidak muat dalam batas memori"
+
+        plan = JoinPlan(strategy, estimated_rows, memory_bytes, budget, partitions, reason)
+        record.update(strategy=strategy, estimated_rows=estimated_rows, memory_bytes=memory_bytes,
+                      budget_bytes=budget, partitions=partitions)
+
+    budget_text = _format_bytes(budget) if budget is not None else "tidak diketahui"
+    log(f"Rencana join: '{strategy}'{f' ({partitions} partisi)' if partitions else ''} — {reason}; "
+        f"pd.merge butuh ~{_format_bytes(memory_bytes)} (batas {budget_text}).")
+    return plan
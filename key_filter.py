@@ -0,0 +1,198 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from arrow_store import is_arrow_path, iter_tables, read_columns, unified_schema
+from consolidation import DEFAULT_CHUNK_ROWS, consolidate_sources
+from merge_keys import key_hashes
+from metrics import RunMetrics
+from schema_inference import apply_schema, load_schema, read_csv_kwargs
+
+# ==============================================================================
+# Semi-join pushdown: filter kunci saat konsolidasi
+# ==============================================================================
+# Untuk merge 'inner', baris Source A yang kuncinya tidak ada di Source B pasti
+# dibuang oleh pd.merge. Setelah satu sumber selesai dikonsolidasi, semua hash
+# kuncinya dikumpulkan ke sebuah filter; sumber lainnya lalu dikonsolidasi
+# dengan filter itu sehingga baris yang tidak mungkin cocok dibuang per chunk
+# dan tidak pernah ditulis ke folder temp.
+#
+# Filter berisi hash kunci (lihat merge_keys.key_hashes), jadi bisa saja
+# meloloskan baris yang sebenarnya tidak cocok (tabrakan hash atau positif
+# palsu Bloom filter), tetapi tidak pernah membuang baris yang cocok.
+# Kesamaan kunci tetap diputuskan oleh pd.merge, sehingga hasil merge sama.
+
+# Sampai jumlah hash unik ini filter menyimpan hash secara tepat (8 byte per
+# kunci); di atasnya dipakai Bloom filter (~10 bit per kunci).
+EXACT_MAX_KEYS = 1_000_000
+
+# Peluang positif palsu Bloom filter
+BLOOM_FALSE_POSITIVE_RATE = 0.01
+
+# Sumber yang dipakai membuat filter dan sumber yang difilter untuk setiap tipe
+# merge (0 = Source A / kiri, 1 = Source B / kanan). Sisi yang semua barisnya
+# dipertahankan oleh merge tidak boleh difilter; 'outer' tidak bisa difilter.
+_SEMI_JOIN_SIDES = {
+    'inner': (1, 0),
+    'left': (0, 1),
+    'right': (1, 0),
+}
+
+
+def semi_join_sides(how, keep_right=False):
+    """
+    (sumber pembuat filter, sumber yang difilter) untuk tipe merge `how`, atau None.
+
+    Dengan `keep_right`, Source B tidak pernah difilter (mis. untuk strategi
+    'indexed', yang memakai indeks Source B yang sama antar run).
+    """
+    sides = _SEMI_JOIN_SIDES.get(how)
+    if sides and keep_right and sides[1] == 1:
+        return None
+    return sides
+
+
+class KeyFilter:
+    """
+    Himpunan hash kunci merge untuk menyaring baris sebelum ditulis.
+
+    Args:
+        merge_key (str): Kolom kunci merge.
+        hashes (np.ndarray): Hash uint64 semua kunci di sumber pembuat filter.
+    """
+
+    def __init__(self, merge_key, hashes):
+        self.merge_key = merge_key
+        hashes = np.unique(hashes)
+        self.keys = len(hashes)
+        if self.keys <= EXACT_MAX_KEYS:
+            self.kind = 'exact'
+            self.hashes = hashes
+            return
+        self.kind = 'bloom'
+        self.hashes = None
+        self.bits = max(64, int(math.ceil(-self.keys * math.log(BLOOM_FALSE_POSITIVE_RATE) / math.log(2) ** 2)))
+        self.probes = max(1, int(round(self.bits / self.keys * math.log(2))))
+        present = np.zeros(self.bits, dtype=bool)
+        present[self._positions(hashes)] = True
+        self.bloom = np.packbits(present, bitorder='little')
+
+    def _positions(self, hashes):
+        """Posisi bit setiap hash untuk semua probe (double hashing dari dua separuh hash 64-bit)."""
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = hashes >> np.uint64(32)
+        steps = np.arange(self.probes, dtype=np.uint64)[:, None]
+        return ((low[None, :] + steps * high[None, :]) % np.uint64(self.bits)).astype(np.int64)
+
+    @property
+    def columns(self):
+        """Kolom yang dibutuhkan filter ini."""
+        return [self.merge_key]
+
+    @property
+    def size_bytes(self):
+        return self.hashes.nbytes if self.kind == 'exact' else self.bloom.nbytes
+
+    def mask(self, keys):
+        """Array boolean: True untuk nilai kunci yang mungkin ada di sumber pembuat filter."""
+        hashes = key_hashes(keys)
+        if self.kind == 'exact':
+            if not len(self.hashes):
+                return np.zeros(len(hashes), dtype=bool)
+            found = np.searchsorted(self.hashes, hashes)
+            found[found == len(self.hashes)] = 0
+            return self.hashes[found] == hashes
+        positions = self._positions(hashes)
+        hits = (self.bloom[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1
+        return hits.all(axis=0)
+
+    def _keys_of(self, df):
+        if self.merge_key in df.columns:
+            return df[self.merge_key]
+        # File tanpa kolom kunci: kuncinya kosong (NaN) setelah di-reindex
+        return pd.Series(np.nan, index=df.index)
+
+    def filter_frame(self, df):
+        """Baris DataFrame yang lolos filter."""
+        return df[self.mask(self._keys_of(df))]
+
+    def filter_table(self, table):
+        """Baris tabel Arrow yang lolos filter."""
+        if self.merge_key in table.column_names:
+            keys = table.column(self.merge_key).to_pandas()
+        else:
+            keys = pd.Series(np.nan, index=range(table.num_rows))
+        return table.filter(pa.array(self.mask(keys)))
+
+
+def _iter_keys(output_file, merge_key, chunk_rows):
+    """Kolom kunci hasil konsolidasi per chunk; kolom lain tidak dibaca."""
+    if is_arrow_path(output_file):
+        key_schema = pa.schema([unified_schema(output_file).field(merge_key)])
+        for table in iter_tables(output_file, chunk_rows, schema=key_schema):
+            yield table.column(0).to_pandas()
+        return
+    schema = load_schema(output_file)
+    for chunk in pd.read_csv(output_file, usecols=[merge_key], chunksize=chunk_rows,
+                             **read_csv_kwargs(schema, [merge_key])):
+        yield apply_schema(chunk, schema)[merge_key]
+
+
+def build_key_filter(output_file, merge_key, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Membuat KeyFilter dari kolom kunci sebuah hasil konsolidasi (dataset Arrow atau CSV).
+
+    Returns:
+        KeyFilter: Filter berisi hash semua kunci.
+    """
+    hashes = [key_hashes(keys) for keys in _iter_keys(output_file, merge_key, chunk_rows or DEFAULT_CHUNK_ROWS)]
+    return KeyFilter(merge_key, np.concatenate(hashes) if hashes else np.array([], dtype=np.uint64))
+
+
+def consolidate_with_semi_join(jobs, merge_key, how, keep_right=False, metrics=None, log=print, **options):
+    """
+    Mengkonsolidasi Source A dan Source B dengan semi-join pushdown.
+
+    Sumber pembuat filter dikonsolidasi lebih dulu, lalu sumber lainnya
+    dikonsolidasi dengan filter kuncinya. Jika tipe merge tidak bisa difilter,
+    kedua sumber dikonsolidasi seperti biasa.
+
+    Args:
+        jobs (list): [(folder Source A, output A), (folder Source B, output B)].
+        merge_key (str): Kolom kunci merge (kolom join MergeKey.join_column, lihat merge_keys.py).
+        how (str): Tipe merge: 'inner', 'left', 'right', atau 'outer'.
+        keep_right (bool): Jangan filter Source B (lihat `semi_join_sides`).
+        metrics (RunMetrics): Tempat mencatat metrik setiap tahap (opsional).
+        log (callable): Fungsi untuk menampilkan pesan progres.
+        **options: Diteruskan ke consolidate_sources (chunk_rows, max_memory, workers, cache_dir, read_options,
+            recursive, columns, where, key).
+
+    Returns:
+        list: Status berhasil (bool) untuk setiap pasangan di `jobs`.
+    """
+    metrics = metrics or RunMetrics('consolidation')
+    sides = semi_join_sides(how, keep_right)
+    if sides is None:
+        return consolidate_sources(jobs, metrics=metrics, log=log, **options)
+
+    build, probe = sides
+    results = [False] * len(jobs)
+    results[build] = consolidate_sources([jobs[build]], metrics=metrics, log=log, **options)[0]
+    if not results[build]:
+        return results
+
+    input_path, output_file = jobs[build]
+    key_filter = None
+    if merge_key in read_columns(output_file):
+        with metrics.stage('semi_join_filter', source=input_path) as record:
+            key_filter = build_key_filter(output_file, merge_key, options.get('chunk_rows'))
+            record.update(keys=key_filter.keys, kind=key_filter.kind, filter_bytes=key_filter.size_bytes)
+        log(f"Filter semi-join dari '{input_path}': {key_filter.keys} kunci unik "
+            f"({key_filter.kind}, {key_filter.size_bytes / 1024:.0f} KB).")
+    else:
+        log(f"⚠️  Kolom kunci '{merge_key}' tidak ada di '{input_path}'; filter semi-join tidak dipakai.")
+    results[probe] = consolidate_sources([jobs[probe]], row_filter=key_filter, metrics=metrics, log=log,
+                                         **options)[0]
+    return results
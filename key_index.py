@@ -0,0 +1,223 @@
+import json
+import os
+import re
+
+import numpy as np
+import pyarrow as pa
+from pyarrow import ipc
+
+from arrow_store import ARROW_SUFFIX, batch_offsets, iter_tables, null_columns, take_rows, unified_schema
+from consolidation import DEFAULT_CHUNK_ROWS
+from join_engine import _SEQ_A, _SEQ_B, partitioned_hash_join
+from merge_keys import join_frames, key_hashes, without_key_column
+from metrics import RunMetrics, measure
+from report_writer import ReportWriter
+from schema_inference import merge_input_dtypes, merge_input_frame
+
+# ==============================================================================
+# Lookup join lewat indeks kunci di disk
+# ==============================================================================
+# Untuk kasus Source B berupa tabel referensi besar dan Source A berupa
+# transaksi yang masing-masing hanya cocok dengan beberapa baris B, memuat
+# seluruh B (pd.merge) atau mempartisinya setiap run itu boros. Di sini dibuat
+# indeks kunci merge atas dataset Arrow Source B: hash kunci -> nomor baris,
+# disimpan terurut di file Arrow. Source A lalu dibaca per chunk; untuk setiap
+# chunk, hanya baris B dengan hash kunci yang sama yang diambil dari dataset B
+# (di-memory-map), kemudian di-join dengan pd.merge sehingga kesamaan kunci
+# tetap diputuskan oleh pandas.
+#
+# Indeks disimpan di folder indeks dan dipakai ulang selama part dataset B
+# tidak berubah (nama, ukuran, dan mtime setiap part sama). Dengan cache
+# inkremental, part B yang tidak berubah di-hard-link dari cache, jadi indeks
+# tetap berlaku antar run.
+
+# Naikkan jika format indeks berubah agar indeks lama dibuat ulang
+INDEX_VERSION = 2
+
+# Tipe merge yang bisa dijalankan dengan membaca Source A secara berurutan;
+# 'right' dan 'outer' membutuhkan seluruh B sehingga dialihkan ke join partisi.
+LOOKUP_JOIN_TYPES = ('inner', 'left')
+
+_HASH = 'hash'
+_ROW = 'row'
+
+
+def _index_paths(index_dir, merge_key):
+    name = re.sub(r'[^\w.-]', '_', merge_key)
+    base = os.path.join(index_dir, f"key_index_{name}")
+    return f"{base}{ARROW_SUFFIX}", f"{base}.json"
+
+
+def _fingerprint(offsets, merge_key):
+    """Identitas dataset: nama, ukuran, dan mtime setiap part yang berisi baris."""
+    parts = []
+    for part, _, _, _ in offsets:
+        if not parts or parts[-1][0] != os.path.basename(part):
+            stat = os.stat(part)
+            parts.append([os.path.basename(part), stat.st_size, stat.st_mtime_ns])
+    return {
+        'version': INDEX_VERSION,
+        'merge_key': merge_key,
+        'rows': sum(rows for _, _, _, rows in offsets),
+        'parts': parts,
+    }
+
+
+class KeyIndex:
+    """
+    Indeks kunci merge sebuah dataset: hash kunci (terurut) dan nomor baris pasangannya.
+
+    Args:
+        hashes (np.ndarray): Hash uint64 kunci, terurut naik.
+        rows (np.ndarray): Nomor baris di dataset untuk setiap hash.
+    """
+
+    def __init__(self, hashes, rows):
+        self.hashes = hashes
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def lookup(self, keys):
+        """Nomor baris (terurut, unik) yang hash kuncinya sama dengan salah satu nilai di `keys`."""
+        wanted = np.unique(key_hashes(keys))
+        low = np.searchsorted(self.hashes, wanted, side='left')
+        counts = np.searchsorted(self.hashes, wanted, side='right') - low
+        total = int(counts.sum())
+        if not total:
+            return np.array([], dtype=np.int64)
+        # Posisi semua entri di rentang [low, low + count) setiap hash, tanpa loop Python
+        positions = np.arange(total) + np.repeat(low - (np.cumsum(counts) - counts), counts)
+        return np.unique(self.rows[positions])
+
+
+def build_key_index(dataset_path, merge_key, index_dir, offsets=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Membuat indeks kunci untuk dataset Arrow dan menyimpannya di `index_dir`.
+
+    Hanya kolom kunci yang dibaca dari dataset.
+
+    Returns:
+        KeyIndex: Indeks yang baru dibuat.
+    """
+    offsets = batch_offsets(dataset_path) if offsets is None else offsets
+    key_schema = pa.schema([unified_schema(dataset_path).field(merge_key)])
+    hashes = [key_hashes(table.column(0).to_pandas())
+              for table in iter_tables(dataset_path, chunk_rows, schema=key_schema)]
+    hashes = np.concatenate(hashes) if hashes else np.array([], dtype=np.uint64)
+    # Sort stabil: baris dengan hash sama tetap berurutan sesuai nomor barisnya
+    order = np.argsort(hashes, kind='stable')
+    index = KeyIndex(hashes[order], order.astype(np.int64))
+
+    os.makedirs(index_dir, exist_ok=True)
+    index_file, meta_file = _index_paths(index_dir, merge_key)
+    table = pa.table({_HASH: index.hashes, _ROW: index.rows})
+    with ipc.new_file(f"{index_file}.tmp", table.schema) as writer:
+        writer.write_table(table)
+    os.replace(f"{index_file}.tmp", index_file)
+    with open(f"{meta_file}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(_fingerprint(offsets, merge_key), f, indent=2)
+    os.replace(f"{meta_file}.tmp", meta_file)
+    return index
+
+
+def load_key_index(dataset_path, merge_key, index_dir, offsets=None):
+    """Memuat indeks kunci yang tersimpan (di-memory-map); None jika tidak ada atau dataset sudah berubah."""
+    offsets = batch_offsets(dataset_path) if offsets is None else offsets
+    index_file, meta_file = _index_paths(index_dir, merge_key)
+    try:
+        with open(meta_file, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta != _fingerprint(offsets, merge_key):
+            return None
+        table = ipc.open_file(pa.memory_map(index_file)).read_all()
+    except (OSError, ValueError, pa.ArrowInvalid):
+        return None
+    return KeyIndex(table.column(_HASH).to_numpy(), table.column(_ROW).to_numpy())
+
+
+def open_key_index(dataset_path, merge_key, index_dir, offsets=None, log=print):
+    """Memakai indeks yang tersimpan jika masih berlaku, selain itu membuatnya ulang."""
+    offsets = batch_offsets(dataset_path) if offsets is None else offsets
+    index = load_key_index(dataset_path, merge_key, index_dir, offsets)
+    if index is not None:
+        log(f"ℹ️  Indeks kunci '{merge_key}' Source B dipakai ulang ({len(index)} baris).")
+        return index
+    log(f"Membuat indeks kunci '{merge_key}' untuk Source B...")
+    return build_key_index(dataset_path, merge_key, index_dir, offsets)
+
+
+def index_lookup_join(left_file, right_file, merge_key, how, output_file, index_dir,
+                      chunk_rows=DEFAULT_CHUNK_ROWS, partitions=None, max_memory=None, work_dir=None,
+                      output_options=None, key_columns=(), metrics=None, log=print):
+    """
+    Menjalankan join dengan membaca Source A per chunk dan mengambil hanya baris
+    Source B yang cocok lewat indeks kunci.
+
+    Hasilnya (kolom, isi, dan urutan baris) sama dengan merge di memori.
+
+    Args:
+        left_file (str): Dataset Arrow Source A (sisi kiri, dibaca berurutan).
+        right_file (str): Dataset Arrow Source B (sisi yang diindeks).
+        merge_key (str): Kolom kunci merge.
+        how (str): Tipe merge. 'right' dan 'outer' dijalankan dengan join partisi.
+        output_file (str): File laporan hasil join.
+        index_dir (str): Folder tempat indeks kunci disimpan antar run.
+        chunk_rows (int): Jumlah baris Source A per chunk.
+        partitions (int): Jumlah partisi, hanya dipakai jika dialihkan ke join partisi.
+        max_memory (str | int): Batas memori, hanya dipakai jika dialihkan ke join partisi.
+        work_dir (str): Folder file partisi, hanya dipakai jika dialihkan ke join partisi.
+        output_options (OutputOptions): Format laporan (opsional; default CSV, lihat report_writer.py).
+        key_columns (list): Kolom kunci yang disatukan setelah join hash (MergeKey.key_columns, lihat
+            merge_keys.py); KEY_COLUMN tidak ditulis ke laporan.
+        metrics (RunMetrics): Tempat mencatat metrik setiap tahap (opsional).
+        log (callable): Fungsi untuk menampilkan pesan progres.
+
+    Returns:
+        int: Jumlah baris hasil join.
+    """
+    if how not in LOOKUP_JOIN_TYPES:
+        log(f"ℹ️  Tipe merge '{how}' membutuhkan seluruh Source B; memakai strategi 'partitioned'.")
+        return partitioned_hash_join(left_file, right_file, merge_key, how, output_file, partitions=partitions,
+                                     max_memory=max_memory, chunk_rows=chunk_rows, work_dir=work_dir,
+                                     output_options=output_options, key_columns=key_columns, metrics=metrics,
+                                     log=log)
+    chunk_rows = chunk_rows or DEFAULT_CHUNK_ROWS
+    metrics = metrics or RunMetrics('join')
+
+    right_offsets = batch_offsets(right_file)
+    with metrics.stage('key_index', source=right_file) as record:
+        index = open_key_index(right_file, merge_key, index_dir, right_offsets, log=log)
+        record['rows'] = len(index)
+
+    # Dtype kedua sisi disamakan dengan read_merge_input
+    a_schema, b_schema = unified_schema(left_file), unified_schema(right_file)
+    a_dtypes, b_dtypes = merge_input_dtypes(left_file, merge_key), merge_input_dtypes(right_file, merge_key)
+    a_nulls, b_nulls = null_columns(left_file), null_columns(right_file, right_offsets)
+
+    empty_a = merge_input_frame(a_schema.empty_table(), a_dtypes, a_nulls)
+    empty_b = merge_input_frame(b_schema.empty_table(), b_dtypes, b_nulls)
+    output_columns = without_key_column(join_frames(empty_a, empty_b, merge_key, how, key_columns).columns)
+
+    log(f"Menjalankan lookup join per {chunk_rows} baris Source A...")
+    total_rows = 0
+    offset = 0
+    with ReportWriter(output_file, output_columns, output_options) as writer:
+        for table in iter_tables(left_file, chunk_rows, schema=a_schema):
+            with measure('lookup_chunk', offset=offset) as record:
+                left = merge_input_frame(table, a_dtypes, a_nulls)
+                left[_SEQ_A] = np.arange(offset, offset + len(left), dtype=np.int64)
+                offset += len(left)
+
+                rows = index.lookup(left[merge_key])
+                right = merge_input_frame(take_rows(right_file, rows, b_schema, right_offsets), b_dtypes, b_nulls)
+                right[_SEQ_B] = rows
+                record['b_rows'] = len(right)
+
+                merged = join_frames(left, right, merge_key, how, key_columns)
+                writer.write(merged.sort_values([_SEQ_A, _SEQ_B], na_position='last', kind='stable'))
+                record['rows'] = len(merged)
+            metrics.add(record)
+            total_rows += len(merged)
+    return total_rows
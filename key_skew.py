@@ -0,0 +1,194 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# Deteksi ledakan kunci duplikat dan skew
+# ==============================================================================
+# Jika sebuah kunci muncul ribuan kali di Source A dan ribuan kali di Source B,
+# pd.merge menghasilkan jutaan baris hanya untuk kunci itu (hampir Cartesian).
+# Sebelum join, kolom kunci kedua sisi dibaca sekali: setiap sisi dicatat di
+# count-min sketch (jumlah baris per hash kunci, memori tetap), dan kunci yang
+# perkiraan jumlahnya melewati ambang disimpan sebagai kandidat kunci berat.
+# Jumlah baris kandidat lalu dihitung tepat di kedua sisi, sehingga perkiraan
+# baris hasil per kunci berat (baris A x baris B) bisa dilaporkan, dan run
+# dihentikan atau diberi peringatan jika perkiraan total hasil melewati batas.
+#
+# Kunci berat yang lebih besar dari satu partisi dipecah oleh join partisi
+# (lihat join_engine.partitioned_hash_join) ke beberapa bagian yang bisa
+# dikerjakan worker berbeda, alih-alih menjadi satu partisi raksasa.
+
+# Ukuran count-min sketch: 4 baris x 2^20 counter uint32 (16 MB per sisi)
+CMS_DEPTH = 4
+CMS_WIDTH = 1 << 20
+
+# Kunci dianggap kandidat berat jika jumlah barisnya di satu sisi minimal
+# HEAVY_MIN_ROWS dan minimal bagian ini dari seluruh baris sisi itu
+HEAVY_MIN_ROWS = 100
+HEAVY_ROW_FRACTION = 1e-4
+
+# Jumlah kunci terberat yang ditampilkan di log
+TOP_KEYS = 5
+
+# Tanpa --max-output-rows, peringatan diberikan jika perkiraan hasil lebih dari
+# sekian kali jumlah baris sumber terbesar
+EXPLOSION_FACTOR = 10
+
+EXPLOSION_ACTIONS = ('warn', 'abort')
+
+# Konstanta ganjil untuk multiply-shift hashing setiap baris sketch
+_CMS_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+                             0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9],
+                            dtype=np.uint64)
+
+HeavyKey = namedtuple('HeavyKey', ['key', 'hash', 'rows_a', 'rows_b', 'output_rows'])
+
+
+class JoinExplosionError(Exception):
+    """Perkiraan jumlah baris hasil join melewati batas yang diizinkan."""
+
+
+class CountMinSketch:
+    """
+    Count-min sketch: perkiraan jumlah kemunculan setiap hash (tidak pernah kurang dari jumlah sebenarnya).
+
+    Args:
+        depth (int): Jumlah baris (fungsi hash) sketch.
+        width (int): Jumlah counter per baris (pangkat dua).
+    """
+
+    def __init__(self, depth=CMS_DEPTH, width=CMS_WIDTH):
+        self.shift = np.uint64(64 - int(math.log2(width)))
+        self.multipliers = _CMS_MULTIPLIERS[:depth]
+        self.table = np.zeros((depth, width), dtype=np.uint32)
+
+    def _columns(self, hashes):
+        # Perkalian uint64 sengaja overflow (modulo 2^64)
+        with np.errstate(over='ignore'):
+            return (hashes[None, :] * self.multipliers[:, None]) >> self.shift
+
+    def add(self, hashes, counts):
+        for row, columns in zip(self.table, self._columns(hashes)):
+            np.add.at(row, columns.astype(np.int64), counts.astype(np.uint32))
+
+    def query(self, hashes):
+        columns = self._columns(hashes).astype(np.int64)
+        return np.min([row[c] for row, c in zip(self.table, columns)], axis=0)
+
+
+class KeyCounter:
+    """
+    Penghitung kunci satu sisi: count-min sketch dan kandidat kunci berat.
+
+    Args:
+        rows (int): Jumlah baris sisi ini (untuk menentukan ambang kunci berat).
+    """
+
+    def __init__(self, rows):
+        self.sketch = CountMinSketch()
+        self.threshold = max(HEAVY_MIN_ROWS, int(rows * HEAVY_ROW_FRACTION))
+        self.candidates = {}
+
+    def add(self, keys, hashes):
+        """Menambahkan satu chunk kunci (tanpa kunci kosong) beserta hash-nya."""
+        if not len(hashes):
+            return
+        unique, first, counts = np.unique(hashes, return_index=True, return_counts=True)
+        self.sketch.add(unique, counts)
+        heavy = self.sketch.query(unique) >= self.threshold
+        for h, i in zip(unique[heavy].tolist(), first[heavy].tolist()):
+            if h not in self.candidates:
+                self.candidates[h] = keys.iloc[i]
+
+
+def output_rows(rows_a, rows_b, how):
+    """Jumlah baris hasil pd.merge untuk satu kunci dengan `rows_a` baris di A dan `rows_b` baris di B."""
+    if rows_a and rows_b:
+        return rows_a * rows_b
+    return {'inner': 0, 'left': rows_a, 'right': rows_b, 'outer': rows_a + rows_b}[how]
+
+
+def heavy_keys(candidates, exact_a, exact_b, null_a, null_b, how):
+    """
+    Daftar HeavyKey, terurut dari perkiraan baris hasil terbesar.
+
+    Args:
+        candidates (dict): hash -> nilai kunci, gabungan kandidat kedua sisi.
+        exact_a (dict): hash -> jumlah baris tepat di Source A.
+        exact_b (dict): hash -> jumlah baris tepat di Source B.
+        null_a (int): Jumlah baris berkunci kosong di Source A.
+        null_b (int): Jumlah baris berkunci kosong di Source B.
+        how (str): Tipe merge.
+    """
+    keys = [HeavyKey(key, h, exact_a.get(h, 0), exact_b.get(h, 0),
+                     output_rows(exact_a.get(h, 0), exact_b.get(h, 0), how))
+            for h, key in candidates.items()]
+    # Kunci kosong dicocokkan satu sama lain oleh pd.merge, jadi diperlakukan sebagai satu kunci
+    if null_a or null_b:
+        keys.append(HeavyKey(np.nan, 0, null_a, null_b, output_rows(null_a, null_b, how)))
+    return sorted(keys, key=lambda k: k.output_rows, reverse=True)
+
+
+def format_key(key):
+    """Nilai kunci untuk pesan log; kunci kosong ditampilkan sebagai (kosong)."""
+    if pd.isna(key):
+        return '(kosong)'
+    key = key.item() if isinstance(key, np.generic) else key
+    # Kolom bulat yang berisi kosong dibaca sebagai float
+    return repr(int(key) if isinstance(key, float) and key.is_integer() else key)
+
+
+def check_join_size(estimated_rows, heavy, rows_a, rows_b, max_output_rows=None, on_explosion='warn', log=print):
+    """
+    Melaporkan kunci terberat dan memeriksa perkiraan jumlah baris hasil join.
+
+    Args:
+        estimated_rows (int): Perkiraan jumlah baris hasil join.
+        heavy (list): Daftar HeavyKey (lihat `heavy_keys`).
+        rows_a (int): Jumlah baris Source A.
+        rows_b (int): Jumlah baris Source B.
+        max_output_rows (int): Batas baris hasil; jika kosong, EXPLOSION_FACTOR x sumber terbesar.
+        on_explosion (str): 'warn' (lanjut dengan peringatan) atau 'abort'.
+        log (callable): Fungsi untuk menampilkan pesan progres.
+
+    Raises:
+        JoinExplosionError: Jika perkiraan melewati batas dan `on_explosion` adalah 'abort'.
+    """
+    duplicated = [k for k in heavy if k.rows_a > 1 and k.rows_b > 1]
+    if duplicated:
+        log(f"Kunci duplikat terberat ({len(duplicated)} kunci berat di kedua sumber):")
+        for k in duplicated[:TOP_KEYS]:
+            log(f"  -> {format_key(k.key)}: {k.rows_a} baris A x {k.rows_b} baris B = {k.output_rows} baris hasil")
+
+    limit = max_output_rows or EXPLOSION_FACTOR * max(rows_a, rows_b, 1)
+    if estimated_rows <= limit:
+        return
+    message = (f"Perkiraan hasil join {estimated_rows} baris melewati batas {limit} baris "
+               f"({'batas yang diatur' if max_output_rows else f'{EXPLOSION_FACTOR}x sumber terbesar'}).")
+    if on_explosion == 'abort':
+        raise JoinExplosionError(message)
+    log(f"⚠️  {message} Join tetap dijalankan.")
+
+
+def skew_splits(heavy, target_rows):
+    """
+    Menentukan kunci berat yang perlu dipecah oleh join partisi.
+
+    Sebuah kunci dipecah jika baris input atau baris hasilnya lebih besar dari
+    `target_rows` (ukuran satu partisi). Baris di sisi yang lebih banyak dibagi
+    ke beberapa bagian; baris sisi lainnya dibaca oleh setiap bagian.
+
+    Returns:
+        list: (HeavyKey, sisi yang dipecah ('a'/'b'), jumlah bagian), hanya untuk kunci yang dipecah.
+    """
+    splits = []
+    for k in heavy:
+        split_side = 'a' if k.rows_a >= k.rows_b else 'b'
+        split_rows = max(k.rows_a, k.rows_b)
+        size = max(k.output_rows, k.rows_a + k.rows_b)
+        slices = min(split_rows, math.ceil(size / max(1, target_rows)))
+        if slices > 1:
+            splits.append((k, split_side, slices))
+    return splits
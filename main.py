@@ -1,8 +1,11 @@
-import pandas as pd
-import glob
 import os
 from datetime import datetime
 
+from consolidation import (
+    append_file_in_chunks, collect_columns, list_csv_files, resolve_chunk_rows, write_header
+)
+from schema_inference import infer_schema, save_schema
+
 # --- Konfigurasi ---
 # Path folder input
 folder_path = 'files/inputs/' 
@@ -11,14 +14,27 @@ folder_path = 'files/inputs/'
 timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
 nama_file_output = f"files/outputs/{timestamp}_merge_file.csv"
 
+# File dibaca per chunk agar memori tidak bergantung pada ukuran file input.
+# Isi salah satu (atau keduanya) untuk mengatur ukuran chunk; None = default.
+jumlah_baris_per_chunk = None   # contoh: 100000
+batas_memori = None             # contoh: '512MB'
+
+# True = file input di subfolder juga ikut digabungkan. File .csv.gz, .csv.zst,
+# dan CSV di dalam arsip .zip selalu ikut dibaca langsung tanpa diekstrak.
+cari_subfolder = False
+
 
-def gabungkan_csv_hemat_memori(path, file_output):
+def gabungkan_csv_hemat_memori(path, file_output, chunk_rows=None, max_memory=None, recursive=False):
     """
     Menggabungkan file-file CSV dengan skema kolom yang berbeda secara efisien.
+    Setiap file dibaca per chunk sehingga file berukuran besar tidak dimuat utuh ke memori.
     
     Args:
         path (str): Path ke folder yang berisi file CSV.
         file_output (str): Nama file CSV untuk menyimpan hasil gabungan.
+        chunk_rows (int): Jumlah baris per chunk (opsional).
+        max_memory (str | int): Batas memori per chunk, mis. '512MB' (opsional).
+        recursive (bool): Ikut mencari file CSV di subfolder.
     """
     try:
         # Cek apakah folder input ada
@@ -26,7 +42,7 @@ def gabungkan_csv_hemat_memori(path, file_output):
             print(f"⚠️  Error: Folder input '{path}' tidak ditemukan.")
             return
 
-        semua_file = glob.glob(os.path.join(path, "*.csv"))
+        semua_file = list_csv_files(path, recursive)
 
         if not semua_file:
             print(f"⚠️  Tidak ada file .csv yang ditemukan di dalam folder: '{path}'")
@@ -34,17 +50,16 @@ def gabungkan_csv_hemat_memori(path, file_output):
 
         # Langkah 1: Kumpulkan semua header unik
         print("Membaca headers dari semua file...")
-        semua_kolom = set()
-        for f in semua_file:
-            try:
-                df_header = pd.read_csv(f, nrows=0) 
-                semua_kolom.update(df_header.columns)
-            except Exception as e:
-                print(f"❌ Gagal membaca header dari {os.path.basename(f)}: {e}")
-        
-        kolom_final = sorted(list(semua_kolom))
+        kolom_final = collect_columns(semua_file)
         print(f"\n✅  Semua kolom unik ditemukan: {len(kolom_final)} kolom.")
 
+        # Tentukan dtype setiap kolom sekali dari sampel semua file
+        skema = infer_schema(semua_file)
+        print(f"✅  Dtype ditentukan untuk {len(skema)} kolom dari sampel data.")
+
+        baris_per_chunk = resolve_chunk_rows(semua_file, kolom_final, chunk_rows, max_memory, skema)
+        print(f"Ukuran chunk: {baris_per_chunk} baris.")
+
         # Langkah 2: Buat folder output jika belum ada
         output_dir = os.path.dirname(file_output)
         if output_dir:
@@ -52,23 +67,23 @@ def gabungkan_csv_hemat_memori(path, file_output):
             print(f"Folder output '{output_dir}' telah disiapkan.")
 
         # Langkah 3: Buat file output dan tulis headernya
-        pd.DataFrame(columns=kolom_final).to_csv(file_output, index=False, encoding='utf-8')
+        write_header(kolom_final, file_output)
         
         # Langkah 4: Proses setiap file dan tambahkan ke file output
         print("\nMemulai proses penggabungan data...")
         total_baris = 0
         for f in semua_file:
             try:
-                df = pd.read_csv(f)
-                df_reindexed = df.reindex(columns=kolom_final)
-                df_reindexed.to_csv(file_output, mode='a', header=False, index=False, encoding='utf-8')
+                jumlah = append_file_in_chunks(f, kolom_final, file_output, baris_per_chunk, skema)
                 
-                print(f"✅  Memproses dan menambahkan {len(df)} baris dari: {os.path.basename(f)}")
-                total_baris += len(df)
+                print(f"✅  Memproses dan menambahkan {jumlah} baris dari: {os.path.basename(f)}")
+                total_baris += jumlah
 
             except Exception as e:
                 print(f"❌ Gagal memproses file {os.path.basename(f)}: {e}")
 
+        save_schema(skema, file_output)
+
         print(f"\n🎉  Sukses! Proses selesai.")
         print(f"Hasil disimpan di: '{file_output}'")
         print(f"Total baris digabungkan: {total_baris}")
@@ -78,4 +93,4 @@ def gabungkan_csv_hemat_memori(path, file_output):
 
 # --- Panggil Fungsi Utama ---
 if __name__ == "__main__":
-    gabungkan_csv_hemat_memori(folder_path, nama_file_output)
\ No newline at end of file
+    gabungkan_csv_hemat_memori(folder_path, nama_file_output, jumlah_baris_per_chunk, batas_memori, cari_subfolder)
\ No newline at end of file
@@ -1,9 +1,26 @@
-import pandas as pd
-import glob
 import os
 from datetime import datetime
 import argparse # 1. Import library untuk command-line argument
 
+from consolidation import DEFAULT_CHUNK_ROWS, consolidate_folder, consolidate_sources, parse_memory_size
+from csv_reader import READ_ENGINES, CsvReadOptions
+from arrow_store import read_columns
+from join_engine import JOIN_STRATEGIES, partitioned_hash_join
+from join_planner import join_statistics, plan_join
+from key_filter import consolidate_with_semi_join
+from key_index import index_lookup_join
+from key_skew import EXPLOSION_ACTIONS, JoinExplosionError, check_join_size
+from merge_keys import KEY_RULES, MergeKey, MergeKeyError, join_frames, without_key_column
+from metrics import METRICS_SUFFIX, RunMetrics
+from pushdown import FilterExpressionError, RowPredicate, parse_columns
+from report_catalog import register_report
+from report_summary import write_report_summary
+from report_writer import OUTPUT_COMPRESSIONS, OUTPUT_FORMATS, OutputOptions, report_file_name, write_report
+from schema_inference import read_merge_input, save_merge_schema
+from sort_merge import sort_merge_join
+from watch_mode import (DEFAULT_WATCH_DEBOUNCE, DEFAULT_WATCH_INTERVAL, SourceWatcher, consolidate_delta, delta_files,
+                        describe_changes)
+
 # ==============================================================================
 # KONFIGURASI PATH (Kunci Merge dipindah ke command-line)
 # ==============================================================================
@@ -14,94 +31,320 @@ MERGE_TYPE = 'inner'
 path_source_a = 'files/inputs/source-a/'
 path_source_b = 'files/inputs/source-b/'
 path_temp = 'files/temp/'       # Folder untuk menyimpan hasil konsolidasi sementara
+path_cache = 'files/cache/'     # Folder cache hasil parsing per file untuk run inkremental
+path_index = 'files/index/'     # Folder indeks kunci Source B untuk strategi 'indexed'
 path_output = 'files/outputs/'
 # ==============================================================================
 
 
-def consolidate_csvs_in_folder(input_path, output_file):
-    """Fungsi ini sama seperti sebelumnya, untuk mengkonsolidasi banyak CSV dalam satu folder."""
+def consolidate_csvs_in_folder(input_path, output_file, chunk_rows=None, max_memory=None, workers=1, recursive=False):
+    """Mengkonsolidasi banyak CSV dalam satu folder, dibaca per chunk agar hemat memori."""
     try:
-        if not os.path.isdir(input_path):
-            print(f"⚠️  Folder input '{input_path}' tidak ditemukan.")
-            return False
-
-        all_files = glob.glob(os.path.join(input_path, "*.csv"))
-        if not all_files:
-            print(f"⚠️  Tidak ada file CSV di '{input_path}'.")
-            return False
-
-        all_columns = set()
-        for f in all_files:
-            try:
-                df_header = pd.read_csv(f, nrows=0)
-                all_columns.update(df_header.columns)
-            except Exception:
-                continue
-        
-        final_columns = sorted(list(all_columns))
-        pd.DataFrame(columns=final_columns).to_csv(output_file, index=False, encoding='utf-8')
-
-        for f in all_files:
-            df = pd.read_csv(f)
-            df_reindexed = df.reindex(columns=final_columns)
-            df_reindexed.to_csv(output_file, mode='a', header=False, index=False, encoding='utf-8')
-        
-        print(f"✅  Konsolidasi '{input_path}' berhasil. Disimpan di '{output_file}'")
-        return True
+        return consolidate_folder(input_path, output_file, chunk_rows=chunk_rows, max_memory=max_memory,
+                                  workers=workers, recursive=recursive)
     except Exception as e:
         print(f"❌ Gagal saat konsolidasi '{input_path}': {e}")
         return False
 
-def main(merge_key):
-    """Fungsi utama untuk mengatur alur kerja konsolidasi dan merge."""
+
+def consolidate_both_sources(temp_a_file, temp_b_file, chunk_rows=None, max_memory=None, workers=1, use_cache=True,
+                             metrics=None, merge_key=None, join_strategy='memory', read_options=None, recursive=False,
+                             columns=None, where=None, keep_source_b=False, key=None):
+    """
+    Mengkonsolidasi Source A dan Source B; dengan workers > 1 keduanya diproses bersamaan.
+
+    Jika `merge_key` diisi, baris yang pasti tidak ikut hasil merge MERGE_TYPE
+    dibuang saat konsolidasi (semi-join pushdown, lihat key_filter.py). Dengan
+    `recursive`, file input di subfolder setiap sumber ikut dikonsolidasi.
+    `columns` dan `where` (--columns / --where, lihat pushdown.py) langsung
+    diterapkan saat file input dibaca. Dengan `keep_source_b`, Source B tidak
+    difilter semi-join (mode pantau memakai ulang dataset Source B untuk run delta).
+    Kolom kunci `key` (MergeKey) dinormalisasi saat dibaca (lihat merge_keys.py);
+    `merge_key` adalah kolom join-nya.
+    """
+    jobs = [(path_source_a, temp_a_file), (path_source_b, temp_b_file)]
+    options = dict(chunk_rows=chunk_rows, max_memory=max_memory, workers=workers,
+                   cache_dir=path_cache if use_cache else None, read_options=read_options, recursive=recursive,
+                   columns=columns, where=where, key=key, metrics=metrics)
+    try:
+        if merge_key:
+            # Strategi 'indexed' memakai indeks Source B antar run, jadi Source B tidak difilter
+            keep_right = keep_source_b or join_strategy == 'indexed'
+            return consolidate_with_semi_join(jobs, merge_key, MERGE_TYPE, keep_right=keep_right, **options)
+        return consolidate_sources(jobs, **options)
+    except Exception as e:
+        print(f"❌ Gagal saat konsolidasi: {e}")
+        return [False, False]
+
+def main(merge_key, chunk_rows=None, max_memory=None, workers=1, join_strategy='memory', partitions=None,
+         use_cache=True, semi_join=True, max_output_rows=None, on_explosion='warn', read_options=None,
+         output_options=None, recursive=False, columns=None, where=None, watch=False,
+         watch_interval=DEFAULT_WATCH_INTERVAL, watch_debounce=DEFAULT_WATCH_DEBOUNCE):
+    """
+    Fungsi utama untuk mengatur alur kerja konsolidasi dan merge.
+
+    `merge_key` adalah teks --key: satu atau beberapa kolom kunci dipisah koma,
+    masing-masing dengan aturan normalisasi opsional (lihat merge_keys.py).
+    Dengan `watch`, setelah run pertama folder sumber terus dipantau dan merge
+    dijalankan ulang setiap ada file baru atau berubah (lihat watch_mode.py),
+    sampai dihentikan dengan Ctrl+C.
+    """
     print("--- Memulai Proses Penggabungan Data ---")
     
     # Pastikan folder temp dan output ada
     os.makedirs(path_temp, exist_ok=True)
     os.makedirs(path_output, exist_ok=True)
 
-    # Definisikan nama file sementara
-    temp_a_file = os.path.join(path_temp, 'consolidated_a.csv')
-    temp_b_file = os.path.join(path_temp, 'consolidated_b.csv')
+    key = MergeKey(merge_key)
+    info = dict(merge_key=key.text, merge_type=MERGE_TYPE, join_strategy=join_strategy, chunk_rows=chunk_rows,
+                max_memory=max_memory, workers=workers, use_cache=use_cache, semi_join=semi_join,
+                max_output_rows=max_output_rows, on_explosion=on_explosion, recursive=recursive, columns=columns,
+                where=where, watch=watch, read_options=(read_options or CsvReadOptions())._asdict(),
+                output_options=(output_options or OutputOptions())._asdict())
+
+    def full_run():
+        return run_with_metrics('final_merge', info, output_options, lambda report, metrics: run_merge(
+            key, report, metrics, chunk_rows, max_memory, workers, join_strategy, partitions, use_cache,
+            semi_join, max_output_rows, on_explosion, read_options, output_options, recursive, columns, where,
+            keep_source_b=watch))
+
+    def delta_run(files):
+        return run_with_metrics('delta_merge', dict(info, delta_files=files), output_options,
+                                lambda report, metrics: run_delta_merge(
+                                    key, files, report, metrics, chunk_rows, max_memory, workers,
+                                    join_strategy, partitions, semi_join, max_output_rows, on_explosion,
+                                    read_options, output_options, columns, where))
+
+    if not watch:
+        full_run()
+        return
+
+    # Keadaan folder diambil sebelum run pertama agar file yang masuk selama run itu ikut terdeteksi
+    watcher = SourceWatcher(path_source_a, path_source_b, recursive, watch_interval, watch_debounce)
+    success = full_run()
+    try:
+        while True:
+            print(f"\n👀 Memantau '{path_source_a}' dan '{path_source_b}' (Ctrl+C untuk berhenti)...")
+            changes = watcher.wait()
+            print(f"\n--- Perubahan file sumber: {describe_changes(changes)} ---")
+            # Run penuh jika perubahan tidak bisa diproses sebagai delta, atau run sebelumnya gagal
+            files = delta_files(changes, MERGE_TYPE) if success else None
+            success = delta_run(files) if files else full_run()
+    except KeyboardInterrupt:
+        print("\nPemantauan dihentikan.")
+
+
+def run_with_metrics(kind, info, output_options, run):
+    """
+    Menjalankan satu merge yang laporannya bernama `<waktu>_<kind>` dan menyimpan file metriknya.
+
+    Args:
+        kind (str): Jenis laporan, mis. 'final_merge' atau 'delta_merge'.
+        info (dict): Pengaturan run yang dicatat di metrik.
+        output_options (OutputOptions): Format laporan.
+        run (callable): Dipanggil dengan (file laporan, RunMetrics); mengembalikan True jika berhasil.
+
+    Returns:
+        bool: Hasil `run`. Laporan yang berhasil didaftarkan ke katalog laporan.
+    """
+    # Nama laporan dan file metrik memakai waktu mulai run yang sama
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    final_output_file = report_file_name(os.path.join(path_output, f"{timestamp}_{kind}"), output_options)
+    metrics_file = os.path.join(path_output, f"{timestamp}_{kind}{METRICS_SUFFIX}")
+
+    # Metrik performa setiap tahap disimpan juga jika run gagal di tengah jalan
+    metrics = RunMetrics('main_merge')
+    metrics.info.update(info, report_file=final_output_file)
+    try:
+        success = run(final_output_file, metrics)
+    finally:
+        metrics.save(metrics_file)
+        print(f"Metrik performa disimpan di: '{metrics_file}'")
+    if success:
+        # Dashboard membaca daftar laporan dari katalog, bukan dari isi folder
+        register_report(final_output_file, info['merge_key'], info['merge_type'], metrics.info.get('rows'))
+    return success
+
+
+def run_merge(key, final_output_file, metrics, chunk_rows=None, max_memory=None, workers=1,
+              join_strategy='memory', partitions=None, use_cache=True, semi_join=True, max_output_rows=None,
+              on_explosion='warn', read_options=None, output_options=None, recursive=False, columns=None,
+              where=None, keep_source_b=False):
+    """
+    Menjalankan konsolidasi dan merge, lalu menulis laporan ke `final_output_file`.
+
+    Args:
+        key (MergeKey): Kunci merge.
+
+    Returns:
+        bool: True jika laporan berhasil ditulis.
+    """
+    # Kolom kunci selalu ikut dibaca walaupun tidak disebut di --columns
+    if columns:
+        columns = list(dict.fromkeys(key.columns + list(columns)))
+
+    # Definisikan nama file sementara (dataset Arrow IPC, lihat arrow_store.py)
+    temp_a_file = os.path.join(path_temp, 'consolidated_a.arrow')
+    temp_b_file = os.path.join(path_temp, 'consolidated_b.arrow')
 
     # --- TAHAP 1: KONSOLIDASI ---
     print("\n--- Tahap 1: Konsolidasi Masing-Masing Sumber ---")
-    success_a = consolidate_csvs_in_folder(path_source_a, temp_a_file)
-    success_b = consolidate_csvs_in_folder(path_source_b, temp_b_file)
+    success_a, success_b = consolidate_both_sources(temp_a_file, temp_b_file, chunk_rows, max_memory, workers,
+                                                    use_cache, metrics, key.join_column if semi_join else None,
+                                                    join_strategy, read_options, recursive, columns, where,
+                                                    keep_source_b, key)
 
     if not (success_a and success_b):
         print("\n❌ Proses dihentikan karena salah satu tahap konsolidasi gagal.")
-        return
+        return False
+
+    return merge_consolidated(temp_a_file, temp_b_file, key, final_output_file, metrics, chunk_rows,
+                              max_memory, workers, join_strategy, partitions, max_output_rows, on_explosion,
+                              read_options, output_options, columns)
+
+
+def run_delta_merge(key, files, final_output_file, metrics, chunk_rows=None, max_memory=None, workers=1,
+                    join_strategy='memory', partitions=None, semi_join=True, max_output_rows=None,
+                    on_explosion='warn', read_options=None, output_options=None, columns=None, where=None):
+    """
+    Menggabungkan hanya file baru Source A dengan dataset Source B dari run penuh
+    terakhir (mode pantau), lalu menulis laporan delta ke `final_output_file`.
+
+    Returns:
+        bool: True jika laporan berhasil ditulis.
+    """
+    if columns:
+        columns = list(dict.fromkeys(key.columns + list(columns)))
+
+    temp_delta_file = os.path.join(path_temp, 'delta_a.arrow')
+    temp_b_file = os.path.join(path_temp, 'consolidated_b.arrow')
+
+    print(f"\n--- Tahap 1: Konsolidasi {len(files)} File Baru Source A ---")
+    try:
+        success = consolidate_delta(path_source_a, temp_delta_file, files, key.join_column, MERGE_TYPE, temp_b_file,
+                                    semi_join, metrics, chunk_rows=chunk_rows, max_memory=max_memory,
+                                    workers=workers, read_options=read_options, columns=columns, where=where,
+                                    key=key)
+    except Exception as e:
+        print(f"❌ Gagal saat konsolidasi: {e}")
+        success = False
+    if not success:
+        print("\n❌ Proses dihentikan karena konsolidasi file baru gagal.")
+        return False
+
+    return merge_consolidated(temp_delta_file, temp_b_file, key, final_output_file, metrics, chunk_rows,
+                              max_memory, workers, join_strategy, partitions, max_output_rows, on_explosion,
+                              read_options, output_options, columns)
+
 
-    # --- TAHAP 2: PENGGABUNGAN (MERGE) ---
+def merge_consolidated(temp_a_file, temp_b_file, key, final_output_file, metrics, chunk_rows=None,
+                       max_memory=None, workers=1, join_strategy='memory', partitions=None, max_output_rows=None,
+                       on_explosion='warn', read_options=None, output_options=None, columns=None):
+    """
+    Tahap 2: menggabungkan dua dataset hasil konsolidasi dan menulis laporan ke `final_output_file`.
+
+    Semua strategi join memakai kolom join `key.join_column` (hash kunci untuk
+    kunci gabungan/teks ternormalisasi, lihat merge_keys.py).
+
+    Returns:
+        bool: True jika laporan berhasil ditulis.
+    """
     print("\n--- Tahap 2: Penggabungan (Merge) Berdasarkan Kunci ---")
     try:
-        df_a = pd.read_csv(temp_a_file)
-        df_b = pd.read_csv(temp_b_file)
+        columns_a = read_columns(temp_a_file)
+        columns_b = read_columns(temp_b_file)
+        missing = [col for col in columns or [] if col not in columns_a and col not in columns_b]
+        if missing:
+            print(f"⚠️  Kolom --columns tidak ditemukan di kedua sumber: {', '.join(missing)}")
 
         # Validasi: Cek apakah kolom kunci ada di kedua file
-        if merge_key not in df_a.columns or merge_key not in df_b.columns:
-            print(f"❌ Error: Kolom kunci '{merge_key}' tidak ditemukan di salah satu file hasil konsolidasi.")
-            print(f"Kolom di Source A: {list(df_a.columns)}")
-            print(f"Kolom di Source B: {list(df_b.columns)}")
-            return
-            
-        print(f"Menggabungkan data menggunakan kunci '{merge_key}' dengan metode '{MERGE_TYPE}'...")
-        
-        # Lakukan merge
-        final_df = pd.merge(df_a, df_b, on=merge_key, how=MERGE_TYPE)
-
-        # Simpan hasil akhir
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        final_output_file = os.path.join(path_output, f"{timestamp}_final_merge.csv")
-        final_df.to_csv(final_output_file, index=False, encoding='utf-8')
+        merge_key, key_columns = key.join_column, key.key_columns
+        if any(col not in columns_a or col not in columns_b for col in [merge_key] + key.columns):
+            print(f"❌ Error: Kolom kunci '{key}' tidak ditemukan di salah satu file hasil konsolidasi.")
+            print(f"Kolom di Source A: {without_key_column(columns_a)}")
+            print(f"Kolom di Source B: {without_key_column(columns_b)}")
+            return False
+
+        # Statistik kunci: perkiraan baris hasil dan kunci duplikat terberat, diperiksa sebelum join
+        stats = join_statistics(temp_a_file, temp_b_file, merge_key, MERGE_TYPE, chunk_rows=chunk_rows,
+                                metrics=metrics)
+        metrics.info['estimated_rows'] = stats.estimated_rows
+        check_join_size(stats.estimated_rows, stats.heavy_keys, stats.a.rows, stats.b.rows,
+                        max_output_rows=max_output_rows, on_explosion=on_explosion)
+
+        if join_strategy == 'auto':
+            # Strategi dipilih dari perkiraan ukuran hasil dan memori yang dibutuhkan
+            plan = plan_join(temp_a_file, temp_b_file, merge_key, MERGE_TYPE, max_memory=max_memory,
+                             chunk_rows=chunk_rows, stats=stats, metrics=metrics)
+            metrics.info['join_plan'] = plan._asdict()
+            join_strategy = plan.strategy
+            partitions = partitions or plan.partitions
+
+        print(f"Menggabungkan data menggunakan kunci '{key}' dengan metode '{MERGE_TYPE}' "
+              f"(strategi: {join_strategy})...")
+
+        final_df = None
+        if join_strategy == 'partitioned':
+            # Grace hash join: kedua sisi dipartisi ke disk, lalu di-join per partisi
+            total_rows = partitioned_hash_join(
+                temp_a_file, temp_b_file, merge_key, MERGE_TYPE, final_output_file,
+                partitions=partitions, max_memory=max_memory, chunk_rows=chunk_rows,
+                work_dir=os.path.join(path_temp, 'join'), skew_keys=stats.heavy_keys, workers=workers,
+                output_options=output_options, key_columns=key_columns, metrics=metrics
+            )
+        elif join_strategy == 'indexed':
+            # Lookup join: Source A dibaca per chunk, baris Source B diambil lewat indeks kunci di disk
+            total_rows = index_lookup_join(
+                temp_a_file, temp_b_file, merge_key, MERGE_TYPE, final_output_file, path_index,
+                chunk_rows=chunk_rows, partitions=partitions, max_memory=max_memory,
+                work_dir=os.path.join(path_temp, 'join'), output_options=output_options, key_columns=key_columns,
+                metrics=metrics
+            )
+        elif join_strategy == 'presorted':
+            # Sort-merge join: kedua sumber dibaca sekali secara berurutan menurut kunci
+            total_rows = sort_merge_join(
+                temp_a_file, temp_b_file, merge_key, MERGE_TYPE, final_output_file, chunk_rows=chunk_rows,
+                work_dir=os.path.join(path_temp, 'join'), output_options=output_options, key_columns=key_columns,
+                metrics=metrics
+            )
+        else:
+            # Lakukan merge di memori (dataset Arrow dibaca via memory-map)
+            with metrics.stage('load_inputs') as record:
+                df_a = read_merge_input(temp_a_file, merge_key)
+                df_b = read_merge_input(temp_b_file, merge_key)
+                record['rows'] = len(df_a) + len(df_b)
+            with metrics.stage('join') as record:
+                final_df = join_frames(df_a, df_b, merge_key, MERGE_TYPE, key_columns)
+                final_df = final_df[without_key_column(final_df.columns)]
+                record['rows'] = len(final_df)
+
+            # Simpan hasil akhir
+            with metrics.stage('write_report', rows=len(final_df)) as record:
+                record['bytes_written'] = write_report(final_df, final_output_file, output_options)
+            total_rows = len(final_df)
+
+        # Peta dtype laporan disimpan agar dashboard tidak perlu menebak dtype lagi
+        with metrics.stage('schema_sidecar'):
+            save_merge_schema(temp_a_file, temp_b_file, merge_key, final_output_file)
+
+        # Ringkasan laporan (sidecar .summary.json) untuk dashboard; dihitung dari
+        # hasil merge di memori, atau dengan membaca ulang laporan per chunk
+        print("Menyusun ringkasan laporan...")
+        with metrics.stage('report_summary', rows=total_rows):
+            write_report_summary(final_output_file, final_df, chunk_rows=chunk_rows or DEFAULT_CHUNK_ROWS,
+                                 read_options=read_options)
+        metrics.info['rows'] = total_rows
 
         print("\n🎉  Sukses! Proses merge selesai.")
         print(f"Hasil disimpan di: '{final_output_file}'")
-        print(f"Total baris hasil merge: {len(final_df)}")
+        print(f"Total baris hasil merge: {total_rows}")
+        return True
 
+    except JoinExplosionError as e:
+        print(f"❌ Merge dibatalkan: {e}")
     except Exception as e:
         print(f"❌ Gagal saat melakukan merge: {e}")
+    return False
 
 
 if __name__ == "__main__":
@@ -113,10 +356,214 @@ if __name__ == "__main__":
         '-k', '--key',
         dest='merge_key',
         default='id', # Nilai default jika tidak ada input
-        help="Kolom yang akan digunakan sebagai kunci merge. Default: 'id'"
+        help="Kolom yang akan digunakan sebagai kunci merge. Beberapa kolom dipisah koma (kunci gabungan); "
+             f"setiap kolom boleh diberi aturan normalisasi dipisah titik dua ({', '.join(KEY_RULES)}), "
+             "mis. 'kode_toko:trim:upper,tanggal' atau 'id:int'. Default: 'id'"
+    )
+
+    # Opsi konsolidasi streaming: ukuran chunk dan batas memori
+    parser.add_argument(
+        '--chunk-rows',
+        dest='chunk_rows',
+        type=int,
+        default=None,
+        help="Jumlah baris yang dibaca per chunk saat konsolidasi. Default: 100000"
+    )
+    parser.add_argument(
+        '--max-memory',
+        dest='max_memory',
+        type=parse_memory_size,
+        default=None,
+        help="Batas memori per chunk saat konsolidasi, mis. '512MB' atau '2G'."
+    )
+
+    # Mesin pembaca CSV
+    parser.add_argument(
+        '--read-engine',
+        dest='read_engine',
+        choices=READ_ENGINES,
+        default='pandas',
+        help="Parser CSV: 'pandas' = parser C pandas (satu thread), 'pyarrow' = pyarrow.csv multi-thread. "
+             "Default: 'pandas'"
+    )
+    parser.add_argument(
+        '--read-block-size',
+        dest='read_block_size',
+        type=parse_memory_size,
+        default=None,
+        help="Ukuran blok teks yang di-parsing sekaligus oleh mesin 'pyarrow', mis. '16MB'. Default: 16MB"
+    )
+    parser.add_argument(
+        '--read-threads',
+        dest='read_threads',
+        type=int,
+        default=None,
+        help="Jumlah thread parsing mesin 'pyarrow'. Default: semua core CPU"
+    )
+
+    parser.add_argument(
+        '-w', '--workers',
+        dest='workers',
+        type=int,
+        default=1,
+        help="Jumlah proses paralel untuk parsing file CSV (0 = semua core CPU). Default: 1"
+    )
+
+    # Opsi strategi join untuk Tahap 2
+    parser.add_argument(
+        '--join-strategy',
+        dest='join_strategy',
+        choices=JOIN_STRATEGIES,
+        default='auto',
+        help="'auto' = dipilih otomatis dari perkiraan ukuran data dan --max-memory, 'memory' = pd.merge di memori, 'partitioned' = grace hash join via file partisi di disk, "
+             f"'indexed' = lookup join lewat indeks kunci Source B di '{path_index}', "
+             "'presorted' = sort-merge join untuk sumber yang sudah terurut menurut kunci. Default: 'auto'"
+    )
+    parser.add_argument(
+        '--presorted',
+        dest='join_strategy',
+        action='store_const',
+        const='presorted',
+        help="Singkatan untuk --join-strategy presorted."
+    )
+    parser.add_argument(
+        '--partitions',
+        dest='partitions',
+        type=int,
+        default=None,
+        help="Jumlah partisi untuk strategi 'partitioned'. Default: dihitung dari --max-memory, atau 16."
+    )
+
+    # Pemeriksaan ledakan kunci duplikat sebelum join
+    parser.add_argument(
+        '--max-output-rows',
+        dest='max_output_rows',
+        type=int,
+        default=None,
+        help="Batas perkiraan jumlah baris hasil join. Default: 10x jumlah baris sumber terbesar."
+    )
+    parser.add_argument(
+        '--on-explosion',
+        dest='on_explosion',
+        choices=EXPLOSION_ACTIONS,
+        default='warn',
+        help="Tindakan jika perkiraan hasil join melewati batas: 'warn' = lanjut dengan peringatan, "
+             "'abort' = hentikan sebelum join. Default: 'warn'"
+    )
+
+    # Format file laporan hasil merge
+    parser.add_argument(
+        '--output-format',
+        dest='output_format',
+        choices=OUTPUT_FORMATS,
+        default='csv',
+        help="Format laporan: 'csv', 'parquet' (satu file), atau 'hive' (folder Parquet yang dipartisi per "
+             "nilai kolom --partition-by). Default: 'csv'"
+    )
+    parser.add_argument(
+        '--output-compression',
+        dest='output_compression',
+        choices=OUTPUT_COMPRESSIONS,
+        default=None,
+        help="Kompresi laporan CSV (.csv.gz atau .csv.zst). Default: tanpa kompresi"
+    )
+    parser.add_argument(
+        '--partition-by',
+        dest='partition_by',
+        default=None,
+        help="Kolom partisi untuk --output-format hive."
+    )
+    parser.add_argument(
+        '--write-threads',
+        dest='write_threads',
+        type=int,
+        default=None,
+        help="Jumlah thread untuk menyusun (dan mengompresi) teks CSV laporan. Default: semua core CPU"
+    )
+
+    # Column projection dan filter baris saat file input dibaca
+    parser.add_argument(
+        '--columns',
+        dest='columns',
+        type=parse_columns,
+        default=None,
+        help="Daftar kolom yang dibaca dan ditulis ke laporan, dipisah koma (kolom kunci selalu ikut), "
+             "mis. 'tanggal,kota,jumlah'. Default: semua kolom."
+    )
+    parser.add_argument(
+        '--where',
+        dest='where',
+        default=None,
+        help="Filter baris yang diterapkan ke setiap sumber saat dibaca, mis. \"tanggal >= '2024-06-01' and "
+             "kota in ('Jakarta', 'Bandung')\". Sumber yang tidak punya kolom di filter tidak difilter."
+    )
+
+    parser.add_argument(
+        '--recursive',
+        dest='recursive',
+        action='store_true',
+        help="Cari file input (.csv, .csv.gz, .csv.zst, dan CSV di dalam .zip) juga di subfolder setiap sumber."
+    )
+
+    # Mode pantau: merge ulang otomatis saat file sumber baru masuk
+    parser.add_argument(
+        '--watch',
+        dest='watch',
+        action='store_true',
+        help="Setelah merge selesai, terus pantau folder sumber dan merge ulang setiap ada file baru/berubah. "
+             "File baru di Source A (merge 'inner'/'left') ditulis sebagai laporan delta terpisah."
+    )
+    parser.add_argument(
+        '--watch-interval',
+        dest='watch_interval',
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL,
+        help=f"Jeda antar pemeriksaan folder sumber di mode --watch (detik). Default: {DEFAULT_WATCH_INTERVAL:g}"
+    )
+    parser.add_argument(
+        '--watch-debounce',
+        dest='watch_debounce',
+        type=float,
+        default=DEFAULT_WATCH_DEBOUNCE,
+        help="Lama daftar file harus tidak berubah sebelum merge ulang dijalankan (detik). "
+             f"Default: {DEFAULT_WATCH_DEBOUNCE:g}"
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        dest='use_cache',
+        action='store_false',
+        help=f"Jangan gunakan cache inkremental di '{path_cache}'; semua file di-parsing ulang."
+    )
+
+    parser.add_argument(
+        '--no-semi-join',
+        dest='semi_join',
+        action='store_false',
+        help="Jangan saring baris yang kuncinya pasti tidak cocok saat konsolidasi (semi-join pushdown)."
     )
 
     args = parser.parse_args()
+    if args.output_format == 'hive' and not args.partition_by:
+        parser.error("--output-format hive membutuhkan --partition-by.")
+    if args.output_compression and args.output_format != 'csv':
+        parser.error("--output-compression hanya berlaku untuk --output-format csv.")
+    try:
+        MergeKey(args.merge_key)
+    except MergeKeyError as e:
+        parser.error(str(e))
+    if args.where:
+        try:
+            RowPredicate(args.where)
+        except FilterExpressionError as e:
+            parser.error(str(e))
     
     # 4. Jalankan fungsi main dengan kunci dari argumen
-    main(args.merge_key)
\ No newline at end of file
+    main(args.merge_key, chunk_rows=args.chunk_rows, max_memory=args.max_memory, workers=args.workers,
+         join_strategy=args.join_strategy, partitions=args.partitions, use_cache=args.use_cache,
+         semi_join=args.semi_join, max_output_rows=args.max_output_rows, on_explosion=args.on_explosion,
+         read_options=CsvReadOptions(args.read_engine, args.read_block_size, args.read_threads),
+         output_options=OutputOptions(args.output_format, args.output_compression, args.partition_by,
+                                      args.write_threads),
+         recursive=args.recursive, columns=args.columns, where=args.where, watch=args.watch,
+         watch_interval=args.watch_interval, watch_debounce=args.watch_debounce)
\ No newline at end of file
@@ -0,0 +1,192 @@
+import glob
+import hashlib
+import json
+import os
+
+from arrow_store import ARROW_SUFFIX, add_filtered_part, add_part, part_name
+from input_sources import archive_member, input_stat, open_input
+from schema_inference import merge_stats, resolve_schema, sample_file_stats
+
+# ==============================================================================
+# Cache inkremental untuk konsolidasi
+# ==============================================================================
+# Setiap folder sumber punya folder cache berisi `manifest.json` dan part Arrow
+# hasil parsing per file input. Manifest menyimpan path, ukuran, mtime, hash isi,
+# header, statistik sampel dtype, dan jumlah baris setiap file. Saat proses dijalankan ulang, hanya file
+# baru atau yang isinya berubah yang di-parsing; part file lain diambil dari
+# cache, dan skema kolom gabungan serta peta dtype dihitung dari header dan
+# statistik sampel yang tersimpan.
+#
+# File CSV di dalam arsip .zip dicatat per member: ukurannya adalah ukuran
+# member dan mtime-nya adalah mtime arsip (lihat input_sources.input_stat),
+# jadi jika arsip diganti, hanya member yang isinya berubah yang di-parsing ulang.
+
+MANIFEST_FILE = 'manifest.json'
+
+# Naikkan jika format part di cache berubah agar cache lama tidak dipakai
+_MANIFEST_VERSION = 2
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_digest(file_path):
+    """Menghitung hash isi file (BLAKE2b) secara streaming."""
+    digest = hashlib.blake2b(digest_size=16)
+    # Member arsip .zip di-hash dari isinya yang sudah didekompresi
+    with open_input(file_path) if archive_member(file_path) else open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_cache_dir(cache_root, input_path):
+    """Folder cache untuk satu folder sumber, unik per path absolut folder tersebut."""
+    input_path = os.path.abspath(input_path)
+    path_id = hashlib.sha1(input_path.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(cache_root, f"{os.path.basename(input_path)}-{path_id}")
+
+
+def _file_id(file_path):
+    return hashlib.sha1(file_path.encode('utf-8')).hexdigest()[:16]
+
+
+def _read_stats(file_path, columns, log):
+    try:
+        return sample_file_stats(file_path, columns=columns)
+    except Exception as e:
+        log(f"❌ Gagal membaca header dari {os.path.basename(file_path)}: {e}")
+        return {}
+
+
+class SourceCache:
+    """
+    Cache hasil parsing per file untuk satu folder sumber.
+
+    Args:
+        cache_dir (str): Folder cache sumber ini (lihat `source_cache_dir`).
+        files (list): Daftar file CSV sumber saat ini, sesuai urutan konsolidasi.
+        settings (dict): Pengaturan yang memengaruhi isi part; jika berbeda dari
+            run sebelumnya, seluruh cache dianggap tidak berlaku.
+        columns (list): Hanya kolom ini yang dicatat di statistik sampel (opsional,
+            untuk --columns; daftar kolom harus ikut disimpan di `settings`).
+        log (callable): Fungsi untuk menampilkan pesan progres.
+    """
+
+    def __init__(self, cache_dir, files, settings=None, columns=None, log=print):
+        self.dir = cache_dir
+        self.files = [os.path.abspath(f) for f in files]
+        os.makedirs(self.dir, exist_ok=True)
+
+        manifest = self._load()
+        old_entries = manifest.get('files', {})
+        if manifest.get('version') != _MANIFEST_VERSION or manifest.get('settings') != (settings or {}):
+            if old_entries:
+                log("ℹ️  Pengaturan berubah, cache konsolidasi dibangun ulang.")
+            old_entries = {}
+            self._remove_parts('*')
+        self.settings = settings or {}
+
+        self.entries = {}
+        self.pending = []
+        for path in self.files:
+            size, mtime_ns = input_stat(path)
+            entry = old_entries.get(path)
+            if entry and self._parts_exist(entry):
+                if entry['size'] == size and entry['mtime_ns'] == mtime_ns:
+                    self.entries[path] = entry
+                    continue
+                digest = file_digest(path)
+                if digest == entry['hash']:
+                    # Hanya mtime yang berubah (mis. file di-touch), isi tetap sama
+                    self.entries[path] = dict(entry, size=size, mtime_ns=mtime_ns)
+                    continue
+            else:
+                digest = file_digest(path)
+            self._remove_parts(_file_id(path))
+            stats = _read_stats(path, columns, log)
+            self.entries[path] = {
+                'size': size,
+                'mtime_ns': mtime_ns,
+                'hash': digest,
+                'columns': list(stats),
+                'stats': stats,
+                'rows': None,
+                'parts': [],
+            }
+            self.pending.append(path)
+
+        for path in set(old_entries) - set(self.entries):
+            self._remove_parts(_file_id(path))
+
+        self.columns = sorted(set().union(*(entry['columns'] for entry in self.entries.values())))
+        self.schema_changed = self.columns != manifest.get('columns')
+        self.dtypes = resolve_schema(merge_stats(entry['stats'] for entry in self.entries.values()))
+
+    def _manifest_path(self):
+        return os.path.join(self.dir, MANIFEST_FILE)
+
+    def _load(self):
+        try:
+            with open(self._manifest_path(), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _parts_exist(self, entry):
+        return entry.get('rows') is not None and all(
+            os.path.exists(os.path.join(self.dir, part)) for part in entry['parts'])
+
+    def _remove_parts(self, file_id):
+        for part in glob.glob(os.path.join(self.dir, f"{file_id}-*{ARROW_SUFFIX}")):
+            os.remove(part)
+
+    def is_cached(self, file_path):
+        return os.path.abspath(file_path) not in self.pending
+
+    def rows(self, file_path):
+        return self.entries[os.path.abspath(file_path)]['rows']
+
+    def part_prefix(self, file_path):
+        """Prefix nama part di folder cache untuk sebuah file input."""
+        return _file_id(os.path.abspath(file_path))
+
+    def record(self, file_path, rows):
+        """Mencatat hasil parsing file yang baru di-parsing ke manifest."""
+        path = os.path.abspath(file_path)
+        prefix = self.part_prefix(path)
+        parts = sorted(glob.glob(os.path.join(self.dir, f"{prefix}-*{ARROW_SUFFIX}")))
+        self.entries[path]['rows'] = rows
+        self.entries[path]['parts'] = [os.path.basename(p) for p in parts]
+
+    def link_into(self, dataset_path, row_filter=None):
+        """
+        Memasukkan part semua file (sesuai urutan file) ke dataset hasil konsolidasi.
+
+        Dengan `row_filter`, part disalin hanya dengan baris yang lolos filter,
+        sehingga part di cache sendiri tetap utuh.
+
+        Returns:
+            int: Jumlah baris yang dibuang filter.
+        """
+        skipped = 0
+        for i, path in enumerate(self.files):
+            for segment, part in enumerate(self.entries[path]['parts']):
+                source_file, name = os.path.join(self.dir, part), part_name(f"{i:06d}", segment)
+                if row_filter is None:
+                    add_part(dataset_path, source_file, name)
+                else:
+                    skipped += add_filtered_part(dataset_path, source_file, name, row_filter)
+        return skipped
+
+    def save(self):
+        """Menyimpan manifest secara atomik (tulis ke file sementara lalu rename)."""
+        manifest = {
+            'version': _MANIFEST_VERSION,
+            'settings': self.settings,
+            'columns': self.columns,
+            'files': self.entries,
+        }
+        tmp_path = f"{self._manifest_path()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self._manifest_path())
@@ -0,0 +1,306 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# Kunci merge gabungan dan ternormalisasi
+# ==============================================================================
+# Kunci merge ditulis sebagai daftar kolom yang dipisah koma; setiap kolom boleh
+# diikuti aturan normalisasi yang dipisah titik dua, diterapkan berurutan:
+#
+#     id                          satu kolom, tanpa normalisasi (seperti sebelumnya)
+#     id:int                      teks '00042' dan angka 42 sama-sama menjadi 42
+#     kode_toko:trim:upper,tanggal  dua kolom; kode toko dirapikan dulu
+#     no_rek:str:zfill10          nomor rekening sebagai teks 10 digit
+#
+# Aturan: trim (buang spasi di awal/akhir), upper, lower, zfill<N> (tambah nol
+# di depan sampai N karakter), str (jadikan teks), int (jadikan bilangan bulat;
+# nilai yang bukan bilangan bulat menjadi kosong).
+#
+# Normalisasi dijalankan sekali saat konsolidasi, per chunk tepat setelah
+# parsing (sebelum filter --where dan semi-join), jadi kolom kunci di dataset
+# temp, di laporan, dan di cache sudah berisi nilai yang dinormalisasi dengan
+# dtype yang sama di kedua sumber.
+#
+# Kunci yang terdiri dari beberapa kolom, atau yang hasil normalisasinya teks,
+# juga disimpan sebagai hash 64-bit di kolom tambahan KEY_COLUMN. Semua strategi
+# join lalu men-join kolom int64 ini, sehingga yang dibandingkan adalah bilangan
+# bulat, bukan objek string Python. Setelah join, kolom kunci dari Source A dan
+# Source B (yang nilainya sama) disatukan kembali dan KEY_COLUMN tidak ditulis
+# ke laporan. Hasil merge 'outer' diurutkan menurut nilai kolom kunci (bukan
+# hash-nya), sama seperti pd.merge pada kolom-kolom kunci itu. Dua kunci berbeda bisa mendapat hash yang sama dengan peluang
+# sekitar n² / 2^65 untuk n kunci unik (sekitar 1 banding 370 ribu untuk 10 juta
+# kunci unik); tabrakan seperti itu tidak pernah menghasilkan pasangan yang
+# salah, karena `join_frames` memeriksa ulang nilai kolom kuncinya.
+
+# Kolom hash kunci yang ditambahkan saat konsolidasi dan dipakai sebagai kolom join
+KEY_COLUMN = '__merge_key__'
+
+# Naikkan jika cara `key_hashes` menghitung hash berubah, agar hash yang tersimpan
+# (KEY_COLUMN di cache konsolidasi, indeks kunci) dibuat ulang
+KEY_HASH_VERSION = 2
+
+# Kolom penanda baris yang cocok di kedua sisi, hanya dipakai di dalam `join_frames`
+_MATCH_COLUMN = '__merge_match__'
+
+_ZFILL = re.compile(r'^zfill(\d+)$')
+_TEXT_RULES = ('trim', 'upper', 'lower', 'str')
+KEY_RULES = _TEXT_RULES + ('int', 'zfill<N>')
+
+# Pengali FNV-1a 64-bit untuk menggabungkan hash beberapa kolom
+_HASH_PRIME = np.uint64(0x100000001B3)
+_HASH_SEED = np.uint64(0xCBF29CE484222325)
+
+
+class MergeKeyError(Exception):
+    """Teks kunci merge (--key) tidak valid."""
+
+
+def _hash_values(values):
+    return pd.util.hash_pandas_object(pd.Series(values), index=False).to_numpy()
+
+
+def _number_hashes(values):
+    """
+    Hash nilai numerik: bilangan bulat di-hash sebagai int64 (uint64 untuk nilai
+    di atas batas int64), bukan float64, agar ID besar di atas 2^53 tidak
+    mendapat hash yang sama. Float yang bernilai bulat di-hash seperti bilangan
+    bulatnya, supaya 5 dan 5.0 (yang dianggap sama oleh pd.merge) tetap cocok.
+    """
+    if pd.api.types.is_bool_dtype(values):
+        return _hash_values(values.to_numpy(dtype=np.int64))
+    if pd.api.types.is_unsigned_integer_dtype(values):
+        # int64 dan uint64 dengan nilai sama punya pola bit yang sama, jadi hash-nya sama
+        return _hash_values(values.to_numpy(dtype=np.uint64))
+    if pd.api.types.is_integer_dtype(values):
+        return _hash_values(values.to_numpy(dtype=np.int64))
+    numbers = values.to_numpy(dtype=np.float64)
+    integral = (numbers % 1 == 0) & (np.abs(numbers) < 2.0 ** 63)
+    hashes = np.empty(len(numbers), dtype=np.uint64)
+    hashes[integral] = _hash_values(numbers[integral].astype(np.int64))
+    hashes[~integral] = _hash_values(numbers[~integral])
+    return hashes
+
+
+def key_hashes(keys):
+    """
+    Menghitung hash uint64 untuk setiap nilai kunci.
+
+    Nilai numerik di-hash menurut nilainya (lihat `_number_hashes`), jadi 5 dan
+    5.0 mendapat hash yang sama. Kunci kosong (NaN) selalu mendapat hash 0
+    karena pd.merge juga mencocokkan NaN dengan NaN.
+    """
+    hashes = np.zeros(len(keys), dtype=np.uint64)
+    valid = keys.notna().to_numpy()
+    if valid.any():
+        values = keys[valid]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype(values.cat.categories.dtype)
+        if pd.api.types.is_numeric_dtype(values):
+            hashes[valid] = _number_hashes(values)
+        else:
+            hashes[valid] = _hash_values(values)
+    return hashes
+
+
+def _parse_rule(rule, column):
+    if rule in _TEXT_RULES or rule == 'int' or _ZFILL.match(rule):
+        return rule
+    raise MergeKeyError(f"Aturan normalisasi '{rule}' untuk kolom kunci '{column}' tidak dikenal. "
+                        f"Pilihan: {', '.join(KEY_RULES)}")
+
+
+def _as_text(values):
+    if isinstance(values.dtype, pd.StringDtype):
+        return values
+    # Bilangan bulat yang terbaca sebagai float (kolom dengan sel kosong) ditulis tanpa '.0'
+    if pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+        values = values.astype('Int64')
+    return values.astype('string')
+
+
+def _apply_rule(values, rule):
+    if rule == 'int':
+        if isinstance(values.dtype, pd.StringDtype) or values.dtype == object:
+            values = _as_text(values).str.strip()
+        numbers = pd.to_numeric(values, errors='coerce')
+        return numbers.where(numbers % 1 == 0).astype('Int64')
+    values = _as_text(values)
+    if rule == 'trim':
+        return values.str.strip()
+    if rule == 'upper':
+        return values.str.upper()
+    if rule == 'lower':
+        return values.str.lower()
+    match = _ZFILL.match(rule)
+    if match:
+        return values.str.zfill(int(match.group(1)))
+    return values
+
+
+def _plain_values(values):
+    """Nilai kolom tanpa dtype category/StringDtype, agar kedua sumber punya dtype yang sama."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(values.cat.categories.dtype)
+    if isinstance(values.dtype, pd.StringDtype):
+        values = values.astype(object).where(values.notna(), np.nan)
+    return values
+
+
+class MergeKey:
+    """
+    Kunci merge dari teks --key / isian "Kunci Merge", mis. 'kode_toko:trim:upper,tanggal'.
+
+    Objek ini juga dipakai konsolidasi sebagai langkah pertama rantai filter
+    per chunk (lihat `filter_frame` dan pushdown.chain_filters); langkah ini
+    tidak membuang baris.
+
+    Args:
+        text (str): Kolom kunci dipisah koma, masing-masing dengan aturan normalisasi opsional.
+
+    Raises:
+        MergeKeyError: Jika teks kosong, ada kolom ganda, atau aturannya tidak dikenal.
+    """
+
+    def __init__(self, text):
+        self.text = (text or '').strip()
+        self.rules = {}
+        for part in self.text.split(','):
+            column, *rules = [piece.strip() for piece in part.split(':')]
+            if not column:
+                raise MergeKeyError(f"Nama kolom kunci kosong di {self.text!r}.")
+            if column in self.rules:
+                raise MergeKeyError(f"Kolom kunci '{column}' disebut lebih dari sekali.")
+            self.rules[column] = [_parse_rule(rule, column) for rule in rules if rule]
+        self.columns = list(self.rules)
+
+    def __str__(self):
+        return self.text
+
+    @property
+    def plain(self):
+        """True untuk satu kolom tanpa normalisasi: konsolidasi dan join berjalan seperti biasa."""
+        return len(self.columns) == 1 and not self.rules[self.columns[0]]
+
+    @property
+    def hashed(self):
+        """True jika join memakai hash di KEY_COLUMN (kunci gabungan, atau kunci teks yang dinormalisasi)."""
+        if len(self.columns) > 1:
+            return True
+        rules = self.rules[self.columns[0]]
+        return bool(rules) and rules[-1] != 'int'
+
+    @property
+    def join_column(self):
+        """Kolom yang di-join oleh semua strategi join."""
+        return KEY_COLUMN if self.hashed else self.columns[0]
+
+    @property
+    def key_columns(self):
+        """Kolom kunci yang ada di kedua sisi join hash dan disatukan kembali setelah join (lihat `join_frames`)."""
+        return list(self.columns) if self.hashed else []
+
+    def _result_dtype(self, column, dtype):
+        kind = None
+        for rule in self.rules[column]:
+            kind = 'Int64' if rule == 'int' else 'str'
+        if kind is None and dtype == 'category':
+            return 'str'
+        return kind or dtype
+
+    def output_dtypes(self, schema):
+        """Peta dtype dataset hasil konsolidasi: dtype kolom kunci setelah normalisasi, ditambah KEY_COLUMN."""
+        schema = dict(schema or {})
+        for column in self.columns:
+            dtype = self._result_dtype(column, schema.get(column))
+            if dtype:
+                schema[column] = dtype
+        if self.hashed:
+            schema[KEY_COLUMN] = 'int64'
+        return schema
+
+    def output_columns(self, columns):
+        """Kolom dataset hasil konsolidasi (KEY_COLUMN ditambahkan untuk join hash)."""
+        columns = [col for col in columns if col != KEY_COLUMN]
+        return columns + [KEY_COLUMN] if self.hashed else columns
+
+    def normalize(self, df):
+        """
+        Menormalisasi kolom kunci sebuah chunk (dan menambahkan KEY_COLUMN untuk join hash).
+
+        Kolom kunci yang tidak ada di chunk dianggap kosong dan tidak ditambahkan.
+        """
+        df = df.copy(deep=False)
+        codes = np.full(len(df), _HASH_SEED, dtype=np.uint64)
+        for column in self.columns:
+            if column in df.columns:
+                values = df[column]
+                for rule in self.rules[column]:
+                    values = _apply_rule(values, rule)
+                df[column] = values = _plain_values(values)
+            else:
+                values = pd.Series(np.nan, index=df.index)
+            if self.hashed:
+                codes = (codes ^ key_hashes(values)) * _HASH_PRIME
+        if self.hashed:
+            df[KEY_COLUMN] = codes.view(np.int64)
+        return df
+
+    def filter_frame(self, df):
+        """Langkah rantai filter konsolidasi: chunk dengan kunci yang sudah dinormalisasi (tidak ada baris dibuang)."""
+        return self.normalize(df)
+
+
+def _same_values(left, right):
+    """True per baris jika kedua nilai sama atau sama-sama kosong (seperti pencocokan pd.merge)."""
+    same = (left.isna() & right.isna()).to_numpy()
+    present = (left.notna() & right.notna()).to_numpy()
+    same[present] = left.to_numpy(dtype=object)[present] == right.to_numpy(dtype=object)[present]
+    return same
+
+
+def join_frames(left, right, merge_key, how, key_columns=()):
+    """
+    pd.merge pada `merge_key`; untuk join hash, kolom kunci `<kolom>_x`/`<kolom>_y`
+    disatukan kembali menjadi `<kolom>` di posisi kolom Source A.
+
+    Pasangan yang hash-nya sama tetapi nilai kolom kuncinya berbeda (tabrakan
+    hash) tidak pernah dipakai: jika ada, join diulang dengan pd.merge pada
+    hash dan semua kolom kunci, sehingga hasilnya tetap sama persis. Untuk
+    'outer', baris diurutkan menurut kolom kunci seperti pd.merge pada kolom
+    kunci itu, bukan menurut hash.
+
+    Args:
+        merge_key (str): Kolom join (MergeKey.join_column).
+        key_columns (list): MergeKey.key_columns (kosong untuk kunci satu kolom biasa).
+    """
+    key_columns = [col for col in key_columns if col in left.columns and col in right.columns]
+    if not key_columns:
+        return pd.merge(left, right, on=merge_key, how=how)
+    merged = pd.merge(left, right, on=merge_key, how=how, indicator=_MATCH_COLUMN)
+    matched = (merged.pop(_MATCH_COLUMN) == 'both').to_numpy()
+    for column in key_columns:
+        if not _same_values(merged[f"{column}_x"][matched], merged[f"{column}_y"][matched]).all():
+            merged = pd.merge(left, right, on=[merge_key] + key_columns, how=how)
+            return _sorted_by_key(merged, how, key_columns)
+    for column in key_columns:
+        left_column, right_column = f"{column}_x", f"{column}_y"
+        # Nilai kunci kedua sisi sama untuk baris yang cocok; baris tanpa pasangan mengambil sisi yang ada
+        values = merged[left_column].where(merged[left_column].notna(), merged[right_column])
+        position = merged.columns.get_loc(left_column)
+        merged = merged.drop(columns=[left_column, right_column])
+        merged.insert(position, column, values)
+    return _sorted_by_key(merged, how, key_columns)
+
+
+def _sorted_by_key(merged, how, key_columns):
+    """Hasil 'outer' diurutkan menurut kolom kunci (kunci kosong di akhir); baris dengan kunci sama tetap berurutan."""
+    if how != 'outer':
+        return merged
+    return merged.sort_values(key_columns, na_position='last', kind='stable').reset_index(drop=True)
+
+
+def without_key_column(columns):
+    """Kolom hasil join yang ditulis ke laporan (tanpa KEY_COLUMN)."""
+    return [col for col in columns if col != KEY_COLUMN]
@@ -0,0 +1,207 @@
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ==============================================================================
+# Metrik performa per tahap
+# ==============================================================================
+# Setiap tahap (scan header, inferensi skema, parsing per file, partisi, join,
+# penulisan laporan, ...) dicatat sebagai satu record: waktu wall, waktu CPU,
+# byte dibaca/ditulis, jumlah baris, baris per detik, dan memori puncak (RSS).
+# Parsing per file diukur di proses yang mengerjakannya (termasuk worker
+# process pool) lalu dikirim balik sebagai record. Semua record satu run
+# disimpan ke satu file JSON.
+
+METRICS_SUFFIX = '.metrics.json'
+
+# Progres bertipe untuk UI: satu event setiap kali sebuah tahap selesai. Event
+# dengan stage None hanya membawa pesan (mis. awal sebuah fase).
+StageProgress = namedtuple('StageProgress', ['stage', 'label', 'done', 'total', 'rows', 'rows_per_s', 'mb_per_s'])
+
+_MB = 1024 * 1024
+
+# Record yang sedang diukur di proses ini (tahap bisa bersarang). Sebelum penanda
+# memori puncak direset, puncak saat itu dicatat dulu ke semua record ini.
+_active_records = []
+
+
+def _read_status_kb(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Mereset penanda memori puncak proses (hanya Linux), agar puncak bisa diukur per tahap."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def process_peak_rss_mb():
+    """Memori puncak proses (MB) sejak proses dimulai; None jika tidak bisa diukur."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss dalam KB di Linux, dalam byte di macOS
+    return peak / (_MB if sys.platform == 'darwin' else 1024)
+
+
+def peak_rss_mb():
+    """Memori puncak proses (MB) sejak `reset_peak_rss` terakhir, atau sejak proses dimulai."""
+    peak_kb = _read_status_kb('VmHWM:')
+    if peak_kb is not None:
+        return peak_kb / 1024
+    return process_peak_rss_mb()
+
+
+@contextmanager
+def add_time(timings, key):
+    """Menambahkan lama blok `with` (detik) ke `timings[key]`; tidak melakukan apa pun jika timings None."""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[key] = timings.get(key, 0.0) + time.perf_counter() - start
+
+
+def timed(iterable, timings, key):
+    """Seperti `iter(iterable)`, tetapi lama menunggu setiap item ditambahkan ke `timings[key]`."""
+    iterator = iter(iterable)
+    while True:
+        with add_time(timings, key):
+            item = next(iterator, StopIteration)
+        if item is StopIteration:
+            return
+        yield item
+
+
+def _note_peak():
+    peak = peak_rss_mb()
+    if peak is None:
+        return
+    for record in _active_records:
+        record['peak_rss_mb'] = round(max(record.get('peak_rss_mb') or 0, peak), 1)
+
+
+def _finish(record, wall, cpu):
+    record['wall_s'] = round(wall, 6)
+    record['cpu_s'] = round(cpu, 6)
+    if record.get('rows') is not None and wall > 0:
+        record['rows_per_s'] = round(record['rows'] / wall, 1)
+    for key in ('parse_s', 'filter_s', 'reindex_s', 'write_s'):
+        if key in record:
+            record[key] = round(record[key], 6)
+    return record
+
+
+@contextmanager
+def measure(stage, **fields):
+    """
+    Mengukur satu blok kode sebagai satu record tahap.
+
+    Record (dict) bisa diisi di dalam blok, mis. `rows`, `bytes_read`, `bytes_written`.
+    """
+    record = dict(stage=stage, **fields)
+    _note_peak()
+    reset_peak_rss()
+    _active_records.append(record)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        _note_peak()
+        _active_records.remove(record)
+        record.setdefault('peak_rss_mb', None)
+        _finish(record, wall, cpu)
+
+
+class RunMetrics:
+    """
+    Kumpulan record tahap untuk satu run.
+
+    Args:
+        name (str): Nama run (mis. 'main_merge').
+        on_stage (callable): Dipanggil dengan StageProgress setiap kali record ditambahkan (opsional).
+    """
+
+    def __init__(self, name, on_stage=None):
+        self.name = name
+        self.on_stage = on_stage
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.records = []
+        self.info = {}
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def stage(self, stage, **fields):
+        """Seperti `measure`, lalu record-nya ditambahkan ke run ini."""
+        with measure(stage, **fields) as record:
+            yield record
+        self.add(record)
+
+    def add(self, record, done=None, total=None):
+        """Menambahkan record yang sudah diukur (mis. dari proses worker)."""
+        self.records.append(record)
+        if self.on_stage:
+            wall = record.get('wall_s') or 0
+            size = record.get('bytes_read') or record.get('bytes_written')
+            self.on_stage(StageProgress(
+                record['stage'], record.get('file') or record.get('source') or '', done, total,
+                record.get('rows'), record.get('rows_per_s'), round(size / _MB / wall, 2) if size and wall else None))
+
+    def totals(self):
+        """Ringkasan per nama tahap: jumlah record, total waktu, baris, dan byte."""
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['stage'], {'count': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'rows': 0,
+                                                        'bytes_read': 0, 'bytes_written': 0})
+            total['count'] += 1
+            for key in ('wall_s', 'cpu_s', 'rows', 'bytes_read', 'bytes_written'):
+                total[key] += record.get(key) or 0
+        for total in totals.values():
+            total['wall_s'] = round(total['wall_s'], 6)
+            total['cpu_s'] = round(total['cpu_s'], 6)
+        return totals
+
+    def to_dict(self):
+        peak = process_peak_rss_mb()
+        return {
+            'run': self.name,
+            'started_at': self.started_at,
+            'wall_s': round(time.perf_counter() - self._wall_start, 6),
+            'cpu_s': round(time.process_time() - self._cpu_start, 6),
+            'peak_rss_mb': round(peak, 1) if peak is not None else None,
+            'info': self.info,
+            'totals': self.totals(),
+            'stages': self.records,
+        }
+
+    def save(self, path):
+        """Menyimpan metrik run ke file JSON (atomik)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        return path
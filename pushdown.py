@@ -0,0 +1,223 @@
+import ast
+import re
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# Column projection dan filter baris (--columns / --where)
+# ==============================================================================
+# Jika hanya sebagian kolom yang dibutuhkan, file input dibaca dengan usecols
+# sehingga kolom lain tidak pernah di-parsing, dan hasil konsolidasi (serta
+# join dan laporan) hanya berisi kolom itu. Filter baris dievaluasi per chunk
+# tepat setelah parsing, sehingga baris yang tidak lolos tidak pernah ditulis
+# ke folder temp dan tidak ikut join.
+#
+# Ekspresi filter memakai sintaks perbandingan Python, mis.
+#
+#     tanggal >= '2024-06-01' and kota in ('Jakarta', 'Bandung')
+#     `nama kolom` != 'x' or not (jumlah < 0)
+#     kode_promo is not None
+#
+# Nama kolom yang bukan identifier (mis. berisi spasi) ditulis di antara
+# backtick seperti DataFrame.query. Ekspresi tidak dieksekusi sebagai kode
+# Python: pohon sintaksnya dievaluasi sendiri sebagai operasi kolom pandas.
+# Perbandingan dengan sel kosong (termasuk kolom yang tidak ada di sebuah file)
+# selalu bernilai salah, kecuali `is None`; `not` membalik hasilnya.
+
+_BACKTICK = re.compile(r'`([^`]*)`')
+
+_COMPARISONS = {
+    ast.Eq: lambda a, b: a == b,
+    ast.NotEq: lambda a, b: a != b,
+    ast.Lt: lambda a, b: a < b,
+    ast.LtE: lambda a, b: a <= b,
+    ast.Gt: lambda a, b: a > b,
+    ast.GtE: lambda a, b: a >= b,
+}
+
+
+class FilterExpressionError(Exception):
+    """Ekspresi --where tidak valid atau tidak bisa dievaluasi pada data."""
+
+
+def parse_columns(text):
+    """
+    Daftar kolom dari teks --columns yang dipisah koma, mis. 'id, kota, jumlah'.
+
+    Returns:
+        list: Nama kolom (tanpa duplikat, sesuai urutan), atau None jika teks kosong.
+    """
+    columns = [name.strip() for name in (text or '').split(',') if name.strip()]
+    return list(dict.fromkeys(columns)) or None
+
+
+def _as_mask(values, index):
+    """Series boolean biasa (tanpa nilai kosong) dari hasil perbandingan."""
+    return pd.Series(values, index=index).fillna(False).astype(bool)
+
+
+def _literal(node):
+    """Nilai konstanta (angka, teks, True/False/None, atau daftar konstanta) dari sebuah node."""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _literal(node.operand)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return [_literal(item) for item in node.elts]
+    raise FilterExpressionError(f"Bagian ekspresi tidak didukung: '{ast.unparse(node)}'")
+
+
+class RowPredicate:
+    """
+    Filter baris dari ekspresi --where.
+
+    Args:
+        expression (str): Ekspresi filter (lihat penjelasan modul).
+
+    Raises:
+        FilterExpressionError: Jika ekspresi tidak bisa dibaca atau memakai sintaks yang tidak didukung.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression.strip()
+        names = {}
+
+        def quote(match):
+            placeholder = f"__kolom_{len(names)}__"
+            names[placeholder] = match.group(1)
+            return placeholder
+
+        try:
+            tree = ast.parse(_BACKTICK.sub(quote, self.expression), mode='eval')
+        except SyntaxError as e:
+            raise FilterExpressionError(f"Ekspresi filter tidak valid: {self.expression!r} ({e.msg})") from None
+        self._names = names
+        self._tree = tree.body
+        self.columns = []
+        self._check(self._tree)
+
+    def __reduce__(self):
+        # Dikirim ke worker process pool sebagai teks ekspresinya
+        return RowPredicate, (self.expression,)
+
+    def _column(self, node):
+        name = self._names.get(node.id, node.id)
+        if name not in self.columns:
+            self.columns.append(name)
+        return name
+
+    def _check(self, node):
+        """Memeriksa sintaks ekspresi dan mengumpulkan nama kolom yang dipakai."""
+        if isinstance(node, ast.BoolOp):
+            for value in node.values:
+                self._check(value)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            self._check(node.operand)
+        elif isinstance(node, ast.Compare):
+            for op, right in zip(node.ops, node.comparators):
+                if isinstance(op, (ast.Is, ast.IsNot)):
+                    if not (isinstance(right, ast.Constant) and right.value is None):
+                        raise FilterExpressionError("'is' dan 'is not' hanya bisa dipakai dengan None.")
+                elif isinstance(op, (ast.In, ast.NotIn)):
+                    if not isinstance(_literal(right), list):
+                        raise FilterExpressionError("'in' membutuhkan daftar nilai, mis. kota in ('a', 'b').")
+                elif type(op) not in _COMPARISONS:
+                    raise FilterExpressionError(f"Operator tidak didukung: '{ast.unparse(node)}'")
+            for operand in [node.left] + node.comparators:
+                if isinstance(operand, ast.Name):
+                    self._column(operand)
+                else:
+                    _literal(operand)
+        elif isinstance(node, ast.Name):
+            # Kolom boolean bisa dipakai langsung sebagai kondisi
+            self._column(node)
+        else:
+            raise FilterExpressionError(f"Bagian ekspresi tidak didukung: '{ast.unparse(node)}'")
+
+    def _operand(self, node, df):
+        if not isinstance(node, ast.Name):
+            return _literal(node)
+        name = self._names.get(node.id, node.id)
+        if name not in df.columns:
+            # File tanpa kolom ini: semua selnya kosong
+            return pd.Series(np.nan, index=df.index)
+        values = df[name]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Kategori tidak terurut tidak bisa dibandingkan dengan < / >
+            values = values.astype(object)
+        return values
+
+    def _compare(self, op, left, right, df):
+        if isinstance(op, (ast.Is, ast.IsNot)):
+            present = pd.Series(left, index=df.index).notna()
+            return present if isinstance(op, ast.IsNot) else ~present
+        if isinstance(op, (ast.In, ast.NotIn)):
+            left = pd.Series(left, index=df.index)
+            found = _as_mask(left.isin(right), df.index)
+            return found if isinstance(op, ast.In) else ~found & left.notna()
+        result = _as_mask(_COMPARISONS[type(op)](left, right), df.index)
+        for operand in (left, right):
+            if isinstance(operand, pd.Series):
+                result &= operand.notna()
+        return result
+
+    def _evaluate(self, node, df):
+        if isinstance(node, ast.BoolOp):
+            masks = [self._evaluate(value, df) for value in node.values]
+            combined = masks[0]
+            for mask in masks[1:]:
+                combined = combined & mask if isinstance(node.op, ast.And) else combined | mask
+            return combined
+        if isinstance(node, ast.UnaryOp):
+            return ~self._evaluate(node.operand, df)
+        if isinstance(node, ast.Name):
+            # Kolom boolean: sel kosong dianggap tidak lolos
+            return _as_mask(self._operand(node, df) == True, df.index)
+        mask = pd.Series(True, index=df.index)
+        left = self._operand(node.left, df)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = self._operand(comparator, df)
+            mask &= self._compare(op, left, right, df)
+            left = right
+        return mask
+
+    def mask(self, df):
+        """Array boolean: True untuk baris yang lolos filter."""
+        try:
+            mask = self._evaluate(self._tree, df)
+        except (TypeError, ValueError) as e:
+            raise FilterExpressionError(f"Filter {self.expression!r} tidak bisa diterapkan: {e}") from None
+        return mask.to_numpy(dtype=bool)
+
+    def filter_frame(self, df):
+        """Baris DataFrame yang lolos filter."""
+        return df[self.mask(df)]
+
+
+class _FilterChain:
+    """Beberapa filter baris yang diterapkan berurutan."""
+
+    def __init__(self, filters):
+        self.filters = filters
+        self.columns = list(dict.fromkeys(col for f in filters for col in f.columns))
+
+    def filter_frame(self, df):
+        for f in self.filters:
+            df = f.filter_frame(df)
+        return df
+
+
+def chain_filters(*filters):
+    """
+    Menggabungkan filter baris (RowPredicate, key_filter.KeyFilter) yang tidak kosong.
+
+    Returns:
+        Satu objek dengan `filter_frame` dan `columns`, atau None jika tidak ada filter.
+    """
+    filters = [f for f in filters if f is not None]
+    if len(filters) <= 1:
+        return filters[0] if filters else None
+    return _FilterChain(filters)
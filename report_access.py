@@ -0,0 +1,219 @@
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+
+from arrow_store import (
+    ARROW_SUFFIX, batch_offsets, create_dataset, iter_tables, read_rows, unified_schema, write_frames
+)
+from bounded_cache import estimate_size
+from consolidation import DEFAULT_CHUNK_ROWS
+from report_writer import open_report_dataset, report_columns, report_format, report_stem
+from schema_inference import apply_schema, load_schema, read_report_chunks
+
+# ==============================================================================
+# Akses laporan secara lazy (per kolom dan per halaman)
+# ==============================================================================
+# Laporan CSV tidak bisa dibaca sebagian tanpa mem-parsing seluruh isinya. Saat
+# sebuah laporan CSV pertama kali dibuka, isinya diubah sekali (per chunk)
+# menjadi dataset Arrow IPC di folder cache `cache/reports/` di samping folder
+# output (bukan di dalamnya, agar tidak ikut terbaca sebagai isi folder output).
+# Setelah itu dataset di-memory-map: membaca satu halaman hanya membuka record
+# batch yang berisi halaman tersebut, dan membaca satu kolom tidak menyentuh
+# kolom lainnya. Dataset dibuat ulang otomatis jika laporannya lebih baru, dan
+# dihapus oleh pencocokan katalog laporan (lihat report_catalog.py) jika
+# laporannya sudah tidak ada.
+#
+# Laporan Parquet/Hive (lihat report_writer.py) sudah kolumnar, jadi dibaca
+# langsung dengan pyarrow.dataset per row group, tanpa salinan.
+
+# Folder cache dataset Arrow laporan CSV, relatif terhadap induk folder output
+REPORT_CACHE_FOLDER = os.path.join('cache', 'reports')
+
+_TMP_SUFFIX = '.tmp'
+
+# Kolom bulat dengan nilai kosong tetap bulat (Int nullable), bukan float
+_NULLABLE_TYPES = {
+    pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(), pa.int64(): pd.Int64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+}
+
+
+def report_cache_dir(folder_path):
+    """Folder cache dataset Arrow untuk laporan di `folder_path`: `<induk folder output>/cache/reports/`."""
+    return os.path.join(os.path.dirname(os.path.abspath(folder_path)), REPORT_CACHE_FOLDER)
+
+
+def _dataset_name(report_name):
+    return f"{os.path.basename(report_stem(report_name))}{ARROW_SUFFIX}"
+
+
+def report_dataset_path(report_file, cache_dir=None):
+    """Path dataset Arrow sebuah laporan CSV di folder cache (default: `report_cache_dir`)."""
+    cache_dir = cache_dir or report_cache_dir(os.path.dirname(report_file) or '.')
+    return os.path.join(cache_dir, _dataset_name(report_file))
+
+
+def _is_fresh(dataset_path, report_file):
+    return os.path.isdir(dataset_path) and os.path.getmtime(dataset_path) >= os.path.getmtime(report_file)
+
+
+def build_report_dataset(report_file, chunk_rows=DEFAULT_CHUNK_ROWS, read_options=None, cache_dir=None):
+    """
+    Mengubah laporan CSV menjadi dataset Arrow di folder cache (dibaca per chunk dengan peta dtype-nya).
+
+    Dataset ditulis ke folder sementara lalu di-rename, sehingga pembaca lain
+    tidak pernah melihat dataset yang setengah jadi.
+
+    Args:
+        read_options (CsvReadOptions): Mesin baca CSV (opsional, lihat csv_reader.py).
+        cache_dir (str): Folder cache dataset (opsional, default `report_cache_dir`).
+
+    Returns:
+        str: Path dataset Arrow laporan.
+    """
+    dataset_path = report_dataset_path(report_file, cache_dir)
+    tmp_path = f"{dataset_path}{_TMP_SUFFIX}"
+    create_dataset(tmp_path, report_columns(report_file))
+    write_frames(read_report_chunks(report_file, load_schema(report_file), chunk_rows, read_options), tmp_path,
+                 'report')
+    shutil.rmtree(dataset_path, ignore_errors=True)
+    os.replace(tmp_path, dataset_path)
+    return dataset_path
+
+
+def prune_report_datasets(folder_path, reports, known=(), cache_dir=None):
+    """
+    Menghapus dataset Arrow laporan yang laporannya sudah tidak ada.
+
+    Di folder cache, semua dataset yang bukan milik laporan di `reports` dihapus.
+    Salinan `<laporan>.arrow` lama yang dulu ditulis di folder output sendiri
+    juga dihapus, hanya untuk laporan di `reports` atau `known`.
+
+    Args:
+        folder_path (str): Folder output berisi laporan.
+        reports (iterable): Nama file laporan yang masih ada di folder.
+        known (iterable): Nama file laporan yang pernah tercatat (mis. di katalog).
+        cache_dir (str): Folder cache dataset (opsional, default `report_cache_dir`).
+
+    Returns:
+        int: Jumlah dataset yang dihapus.
+    """
+    wanted = {_dataset_name(name) for name in reports}
+    stale = []
+    cache_dir = cache_dir or report_cache_dir(folder_path)
+    if os.path.isdir(cache_dir):
+        for entry in os.scandir(cache_dir):
+            # Dataset yang sedang dibuat untuk laporan yang masih ada tidak disentuh
+            name = entry.name[:-len(_TMP_SUFFIX)] if entry.name.endswith(_TMP_SUFFIX) else entry.name
+            if name not in wanted:
+                stale.append(entry.path)
+    legacy = wanted | {_dataset_name(name) for name in known}
+    if os.path.isdir(folder_path):
+        stale += [entry.path for entry in os.scandir(folder_path) if entry.name in legacy and entry.is_dir()]
+    for path in stale:
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+    return len(stale)
+
+
+def _row_groups(dataset):
+    """(fragment row group, baris awal, jumlah baris) laporan Parquet/Hive, sesuai urutan baris; hanya metadata."""
+    row_groups = []
+    start = 0
+    for fragment in dataset.get_fragments():
+        for row_group in fragment.split_by_row_group():
+            rows = row_group.row_groups[0].num_rows
+            if rows:
+                row_groups.append((row_group, start, rows))
+                start += rows
+    return row_groups
+
+
+class ReportReader:
+    """
+    Pembaca laporan yang hanya memuat kolom dan baris yang diminta.
+
+    Laporan CSV dibaca dari dataset Arrow di folder cache; laporan Parquet/Hive
+    dibaca langsung per row group.
+
+    Args:
+        report_file (str): File laporan (CSV, Parquet, atau Hive).
+        chunk_rows (int): Jumlah baris per chunk saat membuat dataset Arrow.
+        read_options (CsvReadOptions): Mesin baca CSV saat membuat dataset Arrow (opsional).
+        cache_dir (str): Folder cache dataset Arrow laporan CSV (opsional, default `report_cache_dir`).
+    """
+
+    def __init__(self, report_file, chunk_rows=DEFAULT_CHUNK_ROWS, read_options=None, cache_dir=None):
+        self.report_file = report_file
+        self.dtypes = load_schema(report_file)
+        self.dataset = None
+        if report_format(report_file) == 'csv':
+            self.path = report_dataset_path(report_file, cache_dir)
+            if not _is_fresh(self.path, report_file):
+                build_report_dataset(report_file, chunk_rows, read_options, cache_dir)
+            self.schema = unified_schema(self.path)
+            self.offsets = batch_offsets(self.path)
+            self.num_rows = sum(rows for _, _, _, rows in self.offsets)
+        else:
+            self.path = report_file
+            self.dataset = open_report_dataset(report_file)
+            self.schema = self.dataset.schema
+            self.offsets = _row_groups(self.dataset)
+            self.num_rows = sum(rows for _, _, rows in self.offsets)
+
+    @property
+    def columns(self):
+        return self.schema.names
+
+    @property
+    def nbytes(self):
+        """Perkiraan memori yang dipegang pembaca; isi dataset di-memory-map dan tidak dihitung."""
+        return estimate_size(self.offsets) + estimate_size(self.dtypes)
+
+    def _projection(self, columns):
+        columns = self.columns if columns is None else columns
+        return pa.schema([self.schema.field(col) for col in columns])
+
+    def to_frame(self, table):
+        """Tabel Arrow dari dataset laporan -> DataFrame dengan dtype laporan."""
+        return apply_schema(table.to_pandas(types_mapper=_NULLABLE_TYPES.get), self.dtypes)
+
+    def _row_group_table(self, row_group, schema):
+        return row_group.to_table(schema=self.dataset.schema, columns=schema.names).cast(schema)
+
+    def _read_rows(self, offset, limit, schema):
+        if self.dataset is None:
+            return read_rows(self.path, offset, limit, schema, self.offsets)
+        # Hanya row group yang beririsan dengan rentang baris yang dibaca
+        end = offset + limit
+        tables = []
+        for row_group, start, rows in self.offsets:
+            if start + rows <= offset or start >= end:
+                continue
+            begin = max(offset - start, 0)
+            tables.append(self._row_group_table(row_group, schema).slice(begin, min(end - start, rows) - begin))
+        return pa.concat_tables(tables) if tables else schema.empty_table()
+
+    def page(self, offset, limit, columns=None):
+        """Baris [offset, offset + limit) sebagai DataFrame, dengan index = nomor baris di laporan."""
+        df = self.to_frame(self._read_rows(offset, limit, self._projection(columns)))
+        df.index = range(offset, offset + len(df))
+        return df
+
+    def tables(self, columns=None):
+        """Seluruh baris sebagai rangkaian tabel Arrow per record batch (atau row group), hanya kolom `columns`."""
+        schema = self._projection(columns)
+        if self.dataset is None:
+            return iter_tables(self.path, schema=schema)
+        return (self._row_group_table(row_group, schema) for row_group, _, _ in self.offsets)
+
+    def read_columns(self, columns):
+        """Seluruh baris, tetapi hanya kolom `columns`."""
+        schema = self._projection(columns)
+        tables = list(self.tables(columns))
+        return self.to_frame(pa.concat_tables(tables) if tables else schema.empty_table())
@@ -0,0 +1,252 @@
+import fnmatch
+import json
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+from metrics import METRICS_SUFFIX
+from report_access import prune_report_datasets
+from report_writer import REPORT_PATTERNS, report_format, report_stem
+
+# ==============================================================================
+# Katalog laporan (SQLite)
+# ==============================================================================
+# Daftar laporan tidak lagi disusun dengan glob + stat setiap file pada setiap
+# rerun dashboard, yang lambat untuk ribuan laporan di folder jaringan. Setiap
+# merge mendaftarkan laporannya ke file SQLite kecil `report_catalog.sqlite` di
+# folder output (path relatif, waktu, kunci dan tipe merge, jumlah baris,
+# ukuran). Dashboard dan aplikasi desktop cukup meng-query katalog ini per
+# halaman, dengan filter nama, kunci, dan tipe merge.
+#
+# Laporan yang ditambah, diubah, atau dihapus di luar proses merge (mis. disalin
+# manual) dicocokkan oleh `reconcile`, yang dijalankan di thread latar
+# belakang. Laporan lama yang belum terdaftar ikut dimasukkan beserta data dari
+# file metriknya (`<laporan>.metrics.json`) jika ada. Pencocokan yang sama juga
+# menghapus dataset Arrow cache laporan yang sudah dihapus (lihat report_access.py).
+
+CATALOG_FILE = 'report_catalog.sqlite'
+
+# Jarak antar pencocokan katalog dengan isi folder di latar belakang (detik)
+RECONCILE_INTERVAL = 60.0
+
+# Satu baris katalog; `path` adalah path lengkap laporan
+ReportEntry = namedtuple('ReportEntry', ['path', 'name', 'created', 'format', 'merge_key', 'merge_type', 'rows',
+                                         'size', 'mtime'])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    name TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    format TEXT NOT NULL,
+    merge_key TEXT,
+    merge_type TEXT,
+    rows INTEGER,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_created ON reports (created DESC, name DESC);
+"""
+
+_COLUMNS = 'name, created, format, merge_key, merge_type, rows, size, mtime'
+
+
+def _is_report_name(name):
+    return not name.startswith('.') and any(fnmatch.fnmatch(name, pattern) for pattern in REPORT_PATTERNS)
+
+
+def _report_size(report_file):
+    if not os.path.isdir(report_file):
+        return os.path.getsize(report_file)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(report_file) for name in names)
+
+
+def _created(name, mtime):
+    """Waktu laporan dari awalan nama `<YYYYmmddHHMMSS>_...`, atau dari mtime-nya."""
+    try:
+        return datetime.strptime(name[:14], "%Y%m%d%H%M%S").isoformat()
+    except ValueError:
+        return datetime.fromtimestamp(mtime).replace(microsecond=0).isoformat()
+
+
+def _metrics_info(report_file):
+    """Kunci merge, tipe merge, dan jumlah baris dari file metrik laporan (jika ada)."""
+    try:
+        with open(f"{report_stem(report_file)}{METRICS_SUFFIX}", encoding='utf-8') as f:
+            info = json.load(f).get('info', {})
+    except (OSError, ValueError):
+        return {}
+    return {key: info.get(key) for key in ('merge_key', 'merge_type', 'rows')}
+
+
+class ReportCatalog:
+    """
+    Katalog laporan di sebuah folder output.
+
+    Setiap operasi membuka koneksi SQLite sendiri, jadi objek ini aman dipakai
+    dari beberapa thread (mis. sesi Streamlit dan thread reconcile).
+
+    Args:
+        folder_path (str): Folder output berisi laporan.
+    """
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self.path = os.path.join(folder_path, CATALOG_FILE)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def _row(self, report_file, merge_key=None, merge_type=None, rows=None):
+        stat = os.stat(report_file)
+        name = os.path.relpath(report_file, self.folder_path)
+        return (name, _created(os.path.basename(name), stat.st_mtime), report_format(report_file), merge_key,
+                merge_type, rows, _report_size(report_file), stat.st_mtime)
+
+    def register(self, report_file, merge_key=None, merge_type=None, rows=None):
+        """Mendaftarkan (atau memperbarui) satu laporan yang baru selesai ditulis."""
+        with self._connect() as connection:
+            connection.execute(f"INSERT OR REPLACE INTO reports ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                               self._row(report_file, merge_key, merge_type, rows))
+        connection.close()
+
+    def _where(self, search=None, merge_key=None, merge_type=None):
+        clauses, params = [], []
+        if search:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        for column, value in (('merge_key', merge_key), ('merge_type', merge_type)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def query(self, offset=0, limit=50, search=None, merge_key=None, merge_type=None):
+        """
+        Satu halaman laporan, dari yang terbaru.
+
+        Args:
+            offset (int): Jumlah laporan yang dilewati.
+            limit (int): Jumlah laporan per halaman.
+            search (str): Bagian nama file laporan (opsional).
+            merge_key (str): Hanya laporan dengan kunci merge ini (opsional).
+            merge_type (str): Hanya laporan dengan tipe merge ini (opsional).
+
+        Returns:
+            list: ReportEntry.
+        """
+        where, params = self._where(search, merge_key, merge_type)
+        with self._connect() as connection:
+            rows = connection.execute(f"SELECT {_COLUMNS} FROM reports {where} ORDER BY created DESC, name DESC "
+                                      f"LIMIT ? OFFSET ?", params + [limit, offset]).fetchall()
+        connection.close()
+        return [ReportEntry(os.path.join(self.folder_path, row[0]), *row) for row in rows]
+
+    def count(self, search=None, merge_key=None, merge_type=None):
+        """Jumlah laporan yang cocok dengan filter (lihat `query`)."""
+        where, params = self._where(search, merge_key, merge_type)
+        with self._connect() as connection:
+            total = connection.execute(f"SELECT COUNT(*) FROM reports {where}", params).fetchone()[0]
+        connection.close()
+        return total
+
+    def values(self, column):
+        """Nilai unik kolom 'merge_key' atau 'merge_type' (untuk pilihan filter)."""
+        if column not in ('merge_key', 'merge_type'):
+            raise ValueError(f"Kolom katalog tidak bisa difilter: {column}")
+        with self._connect() as connection:
+            rows = connection.execute(f"SELECT DISTINCT {column} FROM reports WHERE {column} IS NOT NULL "
+                                      f"ORDER BY {column}").fetchall()
+        connection.close()
+        return [row[0] for row in rows]
+
+    def reconcile(self):
+        """
+        Mencocokkan katalog dengan isi folder: laporan baru didaftarkan, laporan
+        yang berubah diperbarui, dan laporan yang sudah tidak ada dihapus
+        (beserta dataset Arrow cache-nya, lihat report_access.prune_report_datasets).
+
+        Returns:
+            int: Jumlah baris katalog yang berubah.
+        """
+        if not os.path.isdir(self.folder_path):
+            return 0
+        found = {}
+        with os.scandir(self.folder_path) as entries:
+            for entry in entries:
+                if _is_report_name(entry.name) and not entry.name.endswith('.tmp'):
+                    found[entry.name] = entry.stat().st_mtime
+        with self._connect() as connection:
+            known = dict(connection.execute("SELECT name, mtime FROM reports").fetchall())
+        connection.close()
+
+        removed = [name for name in known if name not in found]
+        rows = []
+        for name, mtime in found.items():
+            if known.get(name) == mtime:
+                continue
+            report_file = os.path.join(self.folder_path, name)
+            info = _metrics_info(report_file)
+            try:
+                rows.append(self._row(report_file, info.get('merge_key'), info.get('merge_type'), info.get('rows')))
+            except OSError:
+                # Laporan terhapus di tengah pencocokan; terlihat lagi di pencocokan berikutnya
+                continue
+        if removed or rows:
+            with self._connect() as connection:
+                connection.executemany("DELETE FROM reports WHERE name = ?", [(name,) for name in removed])
+                # Data kunci/tipe merge dari register dipertahankan jika file metriknya tidak ada
+                connection.executemany(
+                    f"INSERT INTO reports ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET created = excluded.created, format = excluded.format, "
+                    "merge_key = COALESCE(excluded.merge_key, merge_key), "
+                    "merge_type = COALESCE(excluded.merge_type, merge_type), rows = COALESCE(excluded.rows, rows), "
+                    "size = excluded.size, mtime = excluded.mtime", rows)
+            connection.close()
+        prune_report_datasets(self.folder_path, found, known)
+        return len(removed) + len(rows)
+
+
+def register_report(report_file, merge_key=None, merge_type=None, rows=None, log=print):
+    """Mendaftarkan laporan hasil merge ke katalog foldernya; kegagalan hanya dicatat sebagai peringatan."""
+    try:
+        ReportCatalog(os.path.dirname(report_file) or '.').register(report_file, merge_key, merge_type, rows)
+    except (sqlite3.Error, OSError) as e:
+        log(f"⚠️  Gagal mendaftarkan laporan ke katalog: {e}")
+
+
+def start_reconciler(catalog, interval=RECONCILE_INTERVAL, on_change=None, log=print):
+    """
+    Menjalankan `catalog.reconcile()` di thread latar belakang setiap `interval` detik.
+
+    Args:
+        catalog (ReportCatalog): Katalog yang dicocokkan.
+        interval (float): Jarak antar pencocokan (detik); None = sekali saja.
+        on_change (callable): Dipanggil dengan jumlah perubahan jika katalog berubah (opsional).
+        log (callable): Fungsi untuk menampilkan pesan kesalahan.
+
+    Returns:
+        threading.Event: Set event ini untuk menghentikan thread.
+    """
+    stop = threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            try:
+                changes = catalog.reconcile()
+                if changes and on_change:
+                    on_change(changes)
+            except (sqlite3.Error, OSError) as e:
+                log(f"⚠️  Gagal mencocokkan katalog laporan: {e}")
+            if interval is None or stop.wait(interval):
+                return
+
+    threading.Thread(target=loop, daemon=True, name='report-catalog-reconcile').start()
+    return stop
@@ -0,0 +1,210 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from chart_data import DEFAULT_BINS, bin_counts, bin_edges
+from consolidation import DEFAULT_CHUNK_ROWS
+from report_writer import report_stem
+from schema_inference import load_schema, read_report_chunks
+
+# ==============================================================================
+# Ringkasan laporan (sidecar `<laporan>.summary.json`)
+# ==============================================================================
+# Saat merge selesai, statistik laporan dihitung sekali dan disimpan di samping
+# file laporan: jumlah baris/kolom, jumlah sel kosong per kolom, dtype,
+# min/max, perkiraan jumlah nilai unik, histogram kolom angka, dan nilai
+# terbanyak kolom kategori. Dashboard cukup membaca file kecil ini untuk
+# menampilkan ringkasan, tanpa memuat laporannya.
+
+SUMMARY_SUFFIX = '.summary.json'
+
+# Naikkan jika isi ringkasan berubah agar ringkasan lama dihitung ulang
+SUMMARY_VERSION = 1
+
+HISTOGRAM_BINS = DEFAULT_BINS
+
+# Nilai terbanyak hanya disimpan untuk kolom dengan nilai unik <= batas ini
+TOP_VALUES_MAX_DISTINCT = 1000
+TOP_VALUES = 20
+
+# Jumlah hash terkecil yang disimpan untuk perkiraan nilai unik (KMV sketch);
+# galat relatifnya sekitar 1/sqrt(k), yaitu ~3%.
+_DISTINCT_SKETCH_SIZE = 1024
+_HASH_SPACE = float(2 ** 64)
+
+
+def summary_path_for(report_file):
+    return f"{report_stem(report_file)}{SUMMARY_SUFFIX}"
+
+
+def column_kind(series):
+    """Jenis kolom untuk dashboard: 'numeric', 'categorical', 'datetime', 'bool', atau 'other'."""
+    if pd.api.types.is_bool_dtype(series):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(series):
+        return 'numeric'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    if series.dtype == object or isinstance(series.dtype, (pd.CategoricalDtype, pd.StringDtype)):
+        return 'categorical'
+    return 'other'
+
+
+def _to_json_value(value):
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value.item() if hasattr(value, 'item') else value
+
+
+class _ColumnStats:
+    """Akumulator statistik satu kolom yang diisi per chunk."""
+
+    def __init__(self, name):
+        self.name = name
+        self.dtype = None
+        self.kind = None
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.hashes = np.array([], dtype=np.uint64)
+        self.value_counts = {}
+
+    def update(self, series):
+        if self.dtype is None or series.notna().any():
+            self.dtype = str(series.dtype)
+            self.kind = column_kind(series)
+        self.nulls += int(series.isna().sum())
+        values = series.dropna()
+        if values.empty:
+            return
+
+        if self.kind in ('numeric', 'datetime'):
+            low, high = values.min(), values.max()
+            self.min = low if self.min is None else min(self.min, low)
+            self.max = high if self.max is None else max(self.max, high)
+
+        hashed = values.astype('float64') if self.kind == 'numeric' else values.astype(str)
+        hashes = pd.util.hash_pandas_object(hashed, index=False).to_numpy()
+        self.hashes = np.unique(np.concatenate([self.hashes, hashes]))[:_DISTINCT_SKETCH_SIZE]
+
+        if self.kind == 'categorical' and self.value_counts is not None:
+            for value, count in values.astype(str).value_counts().items():
+                self.value_counts[value] = self.value_counts.get(value, 0) + int(count)
+            if len(self.value_counts) > TOP_VALUES_MAX_DISTINCT:
+                self.value_counts = None
+
+    def distinct(self):
+        """Perkiraan jumlah nilai unik (tepat jika kurang dari ukuran sketch)."""
+        if len(self.hashes) < _DISTINCT_SKETCH_SIZE:
+            return len(self.hashes)
+        return int(round((_DISTINCT_SKETCH_SIZE - 1) * _HASH_SPACE / (float(self.hashes[-1]) + 1)))
+
+    def histogram_edges(self):
+        if self.kind != 'numeric' or self.min is None:
+            return None
+        return bin_edges(self.min, self.max, HISTOGRAM_BINS)
+
+    def to_dict(self, histogram=None):
+        info = {
+            'dtype': self.dtype,
+            'kind': self.kind,
+            'nulls': self.nulls,
+            'min': _to_json_value(self.min),
+            'max': _to_json_value(self.max),
+            'distinct': self.distinct(),
+        }
+        if histogram is not None:
+            info['histogram'] = {'edges': histogram[0].tolist(), 'counts': histogram[1].tolist()}
+        if self.value_counts:
+            top = sorted(self.value_counts.items(), key=lambda item: (-item[1], item[0]))[:TOP_VALUES]
+            info['top_values'] = dict(top)
+        return info
+
+
+def build_summary(frames, schema=None):
+    """
+    Menghitung ringkasan laporan dari DataFrame per chunk.
+
+    Args:
+        frames (callable): Fungsi tanpa argumen yang mengembalikan iterable
+            DataFrame (chunk laporan). Dipanggil dua kali: sekali untuk statistik,
+            sekali lagi untuk histogram (rentang nilainya baru diketahui setelah
+            pembacaan pertama).
+        schema (dict): Peta dtype laporan (opsional); jika ada, dtype yang
+            dicatat diambil dari sini agar sama untuk semua strategi join.
+
+    Returns:
+        dict: Ringkasan laporan yang siap disimpan sebagai JSON.
+    """
+    stats = None
+    rows = 0
+    for chunk in frames():
+        if stats is None:
+            stats = [_ColumnStats(col) for col in chunk.columns]
+        for col_stats, col in zip(stats, chunk.columns):
+            col_stats.update(chunk[col])
+        rows += len(chunk)
+    stats = stats or []
+    for s in stats:
+        s.dtype = (schema or {}).get(s.name, s.dtype)
+
+    edges = {s.name: s.histogram_edges() for s in stats}
+    counts = {name: np.zeros(HISTOGRAM_BINS, dtype=np.int64) for name, e in edges.items() if e is not None}
+    if counts:
+        for chunk in frames():
+            for name in counts:
+                values = chunk[name].dropna().to_numpy(dtype='float64')
+                counts[name] += bin_counts(values, edges[name])
+
+    return {
+        'version': SUMMARY_VERSION,
+        'rows': rows,
+        'columns': len(stats),
+        'null_cells': sum(s.nulls for s in stats),
+        'column_stats': {s.name: s.to_dict((edges[s.name], counts[s.name]) if s.name in counts else None)
+                         for s in stats},
+    }
+
+
+def write_report_summary(report_file, df=None, chunk_rows=DEFAULT_CHUNK_ROWS, read_options=None):
+    """
+    Menulis sidecar ringkasan untuk file laporan.
+
+    Args:
+        report_file (str): File laporan (CSV, Parquet, atau Hive).
+        df (pd.DataFrame): Isi laporan jika masih ada di memori (opsional); jika
+            kosong, laporan dibaca per chunk dengan peta dtype-nya.
+        chunk_rows (int): Jumlah baris per chunk saat membaca laporan.
+        read_options (CsvReadOptions): Mesin baca CSV saat membaca laporan (opsional).
+
+    Returns:
+        dict: Ringkasan yang ditulis.
+    """
+    schema = load_schema(report_file)
+    if df is not None:
+        summary = build_summary(lambda: [df], schema)
+    else:
+        summary = build_summary(lambda: read_report_chunks(report_file, schema, chunk_rows, read_options), schema)
+    tmp_path = f"{summary_path_for(report_file)}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    os.replace(tmp_path, summary_path_for(report_file))
+    return summary
+
+
+def load_report_summary(report_file):
+    """Membaca sidecar ringkasan sebuah laporan; None jika tidak ada atau sudah usang."""
+    try:
+        with open(summary_path_for(report_file), encoding='utf-8') as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if summary.get('version') != SUMMARY_VERSION:
+        return None
+    if os.path.getmtime(summary_path_for(report_file)) < os.path.getmtime(report_file):
+        return None
+    return summary
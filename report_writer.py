@@ -0,0 +1,379 @@
+import csv
+import glob
+import io
+import os
+import shutil
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from arrow_store import ARROW_SUFFIX, create_dataset, iter_tables, unified_schema, write_frames
+from csv_reader import read_header
+from input_sources import COMPRESSION_SUFFIXES
+
+# ==============================================================================
+# Penulisan laporan hasil merge (CSV cepat, kompresi, Parquet, Hive)
+# ==============================================================================
+# Laporan ditulis lewat `ReportWriter`, bukan DataFrame.to_csv. Format yang
+# didukung:
+#
+# - 'csv'    : teks CSV yang isinya byte-per-byte sama dengan DataFrame.to_csv
+#              (index=False). Baris dibagi ke potongan seperti to_csv, lalu
+#              setiap potongan diubah menjadi teks dengan Arrow compute oleh
+#              beberapa thread sekaligus. Bisa dikompresi gzip atau zstd: setiap
+#              potongan dikompresi terpisah (juga paralel) dan ditulis sebagai
+#              member gzip / frame zstd berurutan, yang tetap satu file valid.
+# - 'parquet': satu file Parquet.
+# - 'hive'   : folder dataset Parquet yang dipartisi per nilai satu kolom
+#              (`<kolom>=<nilai>/...parquet`), sehingga pembaca bisa memuat
+#              hanya partisi yang dibutuhkan (mis. pyarrow.dataset dengan filter).
+#              Skema lengkap (urutan kolom dan tipe kolom partisi) disimpan di
+#              `_common_metadata`. Baris dikelompokkan per partisi, jadi urutan
+#              barisnya tidak sama dengan urutan hasil merge.
+#
+# Semua format ditulis ke path sementara `<laporan>.tmp` lalu di-rename, jadi
+# daftar laporan (dashboard/desktop) tidak pernah memuat file setengah jadi.
+
+OUTPUT_FORMATS = ('csv', 'parquet', 'hive')
+OUTPUT_COMPRESSIONS = ('gzip', 'zstd')
+
+_FORMAT_SUFFIXES = {'csv': '.csv', 'parquet': '.parquet', 'hive': '.hive'}
+
+# Level gzip seperti program gzip (level 9 bawaan Arrow jauh lebih lambat, hasilnya hampir sama)
+_GZIP_LEVEL = 6
+
+# File skema dataset Hive (diabaikan oleh pembaca dataset karena diawali '_')
+_HIVE_SCHEMA_FILE = '_common_metadata'
+_PARTITION_KEY = b'partition_by'
+
+# Pola nama file laporan yang ditampilkan di daftar laporan
+REPORT_PATTERNS = ('*.csv', '*.csv.gz', '*.csv.zst', '*.parquet', '*.hive')
+
+# Seperti DataFrame.to_csv: teks dibuat per potongan 100.000 sel. Format kolom
+# tanggal (tanggal saja / dengan jam) ditentukan per potongan, jadi potongan
+# yang sama dipakai agar hasilnya identik.
+_CHUNK_CELLS = 100_000
+
+# Angka pecahan yang ditulis Python/numpy dengan notasi eksponen ('1e-05', '1e+16')
+_FIXED_MIN = 1e-4
+_FIXED_MAX = 1e16
+
+_TMP_SUFFIX = '.tmp'
+
+# Pengaturan output: format, kompresi CSV, kolom partisi Hive, dan jumlah thread
+OutputOptions = namedtuple('OutputOptions', ['format', 'compression', 'partition_by', 'threads'],
+                           defaults=('csv', None, None, None))
+
+
+def report_file_name(base_name, options=None):
+    """Nama file laporan untuk `base_name` (tanpa ekstensi) sesuai format dan kompresinya."""
+    options = options or OutputOptions()
+    suffix = _FORMAT_SUFFIXES[options.format]
+    if options.format == 'csv' and options.compression:
+        suffix += COMPRESSION_SUFFIXES[options.compression]
+    return f"{base_name}{suffix}"
+
+
+def report_stem(report_file):
+    """Path laporan tanpa ekstensi format dan kompresinya (dasar nama file sidecar)."""
+    stem = str(report_file)
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if stem.endswith(suffix):
+            stem = stem[:-len(suffix)]
+            break
+    return os.path.splitext(stem)[0]
+
+
+def report_format(report_file):
+    """Format laporan dari nama file-nya: 'csv', 'parquet', atau 'hive'."""
+    if str(report_file).endswith(_FORMAT_SUFFIXES['hive']) or os.path.isdir(report_file):
+        return 'hive'
+    if str(report_file).endswith(_FORMAT_SUFFIXES['parquet']):
+        return 'parquet'
+    return 'csv'
+
+
+def list_reports(folder_path):
+    """Daftar laporan di folder (semua format), diurutkan dari yang terbaru."""
+    files = [f for pattern in REPORT_PATTERNS for f in glob.glob(os.path.join(folder_path, pattern))]
+    return sorted(files, key=os.path.getctime, reverse=True)
+
+
+def read_report_schema(report_file):
+    """Skema Arrow laporan Parquet/Hive (hanya metadata), dengan urutan kolom seperti hasil merge."""
+    if report_format(report_file) == 'hive':
+        return pq.read_schema(os.path.join(report_file, _HIVE_SCHEMA_FILE))
+    return pq.read_schema(report_file)
+
+
+def report_columns(report_file):
+    """Daftar kolom laporan (semua format) tanpa memuat datanya."""
+    if report_format(report_file) == 'csv':
+        return read_header(report_file)
+    return read_report_schema(report_file).names
+
+
+def open_report_dataset(report_file):
+    """Laporan Parquet/Hive sebagai pyarrow.dataset (belum ada data yang dibaca), dengan kolom partisi Hive."""
+    schema = read_report_schema(report_file)
+    partitioning = None
+    if report_format(report_file) == 'hive':
+        # Nilai folder partisi dikembalikan ke tipe aslinya (bukan teks)
+        partition = schema.field(schema.metadata[_PARTITION_KEY].decode())
+        partitioning = ds.partitioning(pa.schema([partition]), flavor='hive')
+    return ds.dataset(report_file, schema=schema, format='parquet', partitioning=partitioning)
+
+
+def read_report_table(report_file, columns=None):
+    """Memuat laporan Parquet/Hive (atau sebagian kolomnya) sebagai satu tabel Arrow."""
+    return open_report_dataset(report_file).to_table(columns=columns)
+
+
+def iter_report_tables(report_file, chunk_rows=None, columns=None):
+    """Membaca laporan Parquet/Hive per record batch (paling banyak `chunk_rows` baris) sebagai tabel Arrow."""
+    kwargs = {'batch_size': chunk_rows} if chunk_rows else {}
+    for batch in open_report_dataset(report_file).to_batches(columns=columns, **kwargs):
+        yield pa.Table.from_batches([batch])
+
+
+# ------------------------------------------------------------------------------
+# Teks CSV dengan Arrow compute
+# ------------------------------------------------------------------------------
+def _quote(text):
+    """Tanda kutip seperti csv.QUOTE_MINIMAL: hanya sel yang berisi koma, kutip, atau baris baru."""
+    needs_quote = pc.match_substring_regex(text, '[,"\r\n]')
+    if not pc.any(needs_quote).as_py():
+        return text
+    quoted = pc.binary_join_element_wise('"', pc.replace_substring(text, '"', '""'), '"', '')
+    return pc.if_else(needs_quote, quoted, text)
+
+
+def _format_floats(values):
+    """Teks angka pecahan seperti numpy astype(str) (yang dipakai to_csv): '1.0', '1e-05', '1e+16'."""
+    array = pa.array(values, from_pandas=True)
+    text = pc.cast(array, pa.string())
+    finite = np.isfinite(values)
+    magnitude = np.abs(values)
+    # Notasi eksponen Arrow dan Python berbeda; angka seperti ini ditulis ulang oleh numpy
+    exponent = finite & ((magnitude >= _FIXED_MAX) | ((magnitude < _FIXED_MIN) & (magnitude > 0)))
+    exponent |= pc.match_substring(text, 'e').fill_null(False).to_numpy(zero_copy_only=False)
+    whole = finite & ~exponent & ~pc.match_substring(text, '.').fill_null(False).to_numpy(zero_copy_only=False)
+    text = pc.if_else(pa.array(whole), pc.binary_join_element_wise(text, '.0', ''), text)
+    if exponent.any():
+        positions = np.flatnonzero(exponent)
+        strings = np.asarray(text.to_numpy(zero_copy_only=False), dtype=object)
+        strings[positions] = values[positions].astype(str)
+        text = pa.array(strings, type=pa.string())
+    return text
+
+
+def _format_datetimes(series):
+    """Teks kolom tanggal seperti to_csv; None jika perlu format pecahan detik (ditulis oleh pandas)."""
+    values = series.to_numpy()
+    present = values[~np.isnat(values)].astype('datetime64[ns]').astype(np.int64)
+    array = pa.array(series, type=pa.timestamp('ns'), from_pandas=True)
+    if (present % (86_400 * 10 ** 9) == 0).all():
+        return pc.cast(pc.cast(array, pa.date32()), pa.string())
+    if (present % 10 ** 9 == 0).all():
+        return pc.strftime(pc.cast(array, pa.timestamp('s')), format='%Y-%m-%d %H:%M:%S')
+    return None
+
+
+def _format_column(series):
+    """
+    Teks satu kolom (sudah diberi tanda kutip) sebagai array Arrow, atau None
+    jika dtype-nya tidak ditangani di sini dan harus ditulis oleh pandas.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        if dtype.categories.dtype != object:
+            return None
+        series = series.astype(object)
+        dtype = series.dtype
+    if dtype == object:
+        try:
+            array = pa.array(series, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return None
+        # Sel object selain teks (mis. Timestamp) ditulis pandas dengan str(), bukan format kolomnya
+        if not (pa.types.is_string(array.type) or pa.types.is_null(array.type)):
+            return None
+        return _quote(array.cast(pa.string()))
+    if dtype == np.float64:
+        return _format_floats(series.to_numpy())
+    if dtype == np.dtype('datetime64[ns]'):
+        return _format_datetimes(series)
+    if pd.api.types.is_bool_dtype(dtype):
+        return pc.if_else(pa.array(series, from_pandas=True), 'True', 'False')
+    if pd.api.types.is_integer_dtype(dtype):
+        return pc.cast(pa.array(series, from_pandas=True), pa.string())
+    return None
+
+
+def _pandas_column(series):
+    """Teks satu kolom yang diformat oleh to_csv (dibaca ulang dengan modul csv agar tanda kutipnya seragam)."""
+    lines = series.to_frame().to_csv(index=False, header=False, lineterminator='\n', encoding='utf-8')
+    return _quote(pa.array([row[0] for row in csv.reader(io.StringIO(lines))], type=pa.string()))
+
+
+def _format_lines(df, linesep):
+    """Baris CSV (tanpa header) untuk satu potongan DataFrame, sebagai bytes."""
+    columns = []
+    for i in range(df.shape[1]):
+        text = _format_column(df.iloc[:, i])
+        if text is None:
+            # Dtype lain (pecahan detik, zona waktu, timedelta, ...) diformat oleh pandas
+            text = _pandas_column(df.iloc[:, i])
+        columns.append(text.fill_null(''))
+    if len(columns) == 1:
+        # csv.writer menulis baris yang hanya berisi satu sel kosong sebagai ""
+        columns[0] = pc.if_else(pc.equal(columns[0], ''), '""', columns[0])
+    lines = pc.binary_join_element_wise(pc.binary_join_element_wise(*columns, ','), '', linesep)
+    offsets = np.frombuffer(lines.buffers()[1], dtype=np.int32)
+    return lines.buffers()[2].to_pybytes()[offsets[lines.offset]:offsets[lines.offset + len(lines)]]
+
+
+def _header_line(columns, linesep):
+    text = _quote(pa.array([str(col) for col in columns], type=pa.string())).to_pylist()
+    if len(text) == 1 and text[0] == '':
+        text = ['""']
+    return (','.join(text) + linesep).encode('utf-8')
+
+
+class ReportWriter:
+    """
+    Penulis laporan per chunk; file baru muncul di `output_file` saat `close()` berhasil.
+
+    Dipakai sebagai context manager: jika terjadi error, file sementara dihapus
+    dan laporan lama (jika ada) tidak tersentuh.
+
+    Args:
+        output_file (str): Path laporan (lihat `report_file_name`).
+        columns (list): Urutan kolom laporan (header ditulis walaupun tidak ada baris).
+        options (OutputOptions): Format, kompresi, kolom partisi, dan jumlah thread.
+    """
+
+    def __init__(self, output_file, columns, options=None):
+        self.output_file = output_file
+        self.columns = list(columns)
+        self.options = options or OutputOptions()
+        if self.options.format == 'hive' and self.options.partition_by not in self.columns:
+            raise ValueError(f"Kolom partisi '{self.options.partition_by}' tidak ada di laporan.")
+        self.tmp_path = f"{output_file}{_TMP_SUFFIX}"
+        self.rows = 0
+        self.bytes_written = 0
+        self._threads = self.options.threads or os.cpu_count() or 1
+        self._linesep = os.linesep
+        if self.options.format == 'csv':
+            self._codec = None
+            if self.options.compression:
+                level = _GZIP_LEVEL if self.options.compression == 'gzip' else None
+                self._codec = pa.Codec(self.options.compression, compression_level=level)
+            self._file = open(self.tmp_path, 'wb')
+            self._pool = ThreadPoolExecutor(self._threads)
+            self._write_bytes(self._encode(_header_line(self.columns, self._linesep)))
+        else:
+            # Parquet/Hive: chunk ditampung dulu di dataset Arrow sementara, karena
+            # dtype chunk bisa berbeda (mis. kolom yang kosong di satu chunk); saat
+            # close() dtype-nya disatukan lalu ditulis sekaligus ke Parquet.
+            self._staging = f"{self.tmp_path}{ARROW_SUFFIX}"
+            create_dataset(self._staging, self.columns)
+            self._parts = 0
+
+    def _encode(self, data):
+        return self._codec.compress(data, asbytes=True) if self._codec else data
+
+    def _write_bytes(self, data):
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def write(self, df):
+        """Menambahkan baris DataFrame (kolom diurutkan sesuai `columns`) ke laporan."""
+        df = df[self.columns]
+        self.rows += len(df)
+        if not len(df):
+            return
+        if self.options.format != 'csv':
+            write_frames([df], self._staging, f"chunk{self._parts:06d}")
+            self._parts += 1
+            return
+        step = max(1, _CHUNK_CELLS // max(1, len(self.columns)))
+        pending = deque()
+        for start in range(0, len(df), step):
+            # Potongan diformat (dan dikompresi) paralel; jumlah potongan di memori dibatasi
+            pending.append(self._pool.submit(lambda part: self._encode(_format_lines(part, self._linesep)),
+                                             df.iloc[start:start + step]))
+            if len(pending) > 2 * self._threads:
+                self._write_bytes(pending.popleft().result())
+        while pending:
+            self._write_bytes(pending.popleft().result())
+
+    def _write_parquet(self):
+        schema = unified_schema(self._staging)
+        if self.options.format == 'parquet':
+            with pq.ParquetWriter(self.tmp_path, schema) as writer:
+                for table in iter_tables(self._staging, schema=schema):
+                    writer.write_table(table)
+            self.bytes_written = os.path.getsize(self.tmp_path)
+        else:
+            shutil.rmtree(self.tmp_path, ignore_errors=True)
+            os.makedirs(self.tmp_path)
+            for i, table in enumerate(iter_tables(self._staging, schema=schema)):
+                pq.write_to_dataset(table, self.tmp_path, partition_cols=[self.options.partition_by],
+                                    basename_template=f"part-{i:06d}-{{i}}.parquet")
+            pq.write_metadata(schema.with_metadata({_PARTITION_KEY: self.options.partition_by.encode()}),
+                              os.path.join(self.tmp_path, _HIVE_SCHEMA_FILE))
+            self.bytes_written = sum(os.path.getsize(os.path.join(root, f))
+                                     for root, _, files in os.walk(self.tmp_path) for f in files)
+        shutil.rmtree(self._staging, ignore_errors=True)
+
+    def close(self):
+        """Menyelesaikan file sementara lalu me-rename-nya ke `output_file`."""
+        if self.options.format == 'csv':
+            self._pool.shutdown()
+            self._file.close()
+        else:
+            self._write_parquet()
+        if os.path.isdir(self.output_file):
+            shutil.rmtree(self.output_file)
+        os.replace(self.tmp_path, self.output_file)
+
+    def abort(self):
+        """Membuang file sementara tanpa menyentuh `output_file`."""
+        if self.options.format == 'csv':
+            self._pool.shutdown(cancel_futures=True)
+            self._file.close()
+        else:
+            shutil.rmtree(self._staging, ignore_errors=True)
+        if os.path.isdir(self.tmp_path):
+            shutil.rmtree(self.tmp_path, ignore_errors=True)
+        elif os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_report(df, output_file, options=None):
+    """
+    Menulis seluruh DataFrame sebagai laporan.
+
+    Returns:
+        int: Jumlah byte yang ditulis.
+    """
+    with ReportWriter(output_file, df.columns, options) as writer:
+        writer.write(df)
+    return writer.bytes_written
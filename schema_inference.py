@@ -0,0 +1,340 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from arrow_store import is_arrow_path, read_columns, read_frame
+from csv_reader import read_csv, read_csv_chunks as read_csv_frames, read_header
+from input_sources import open_input
+from report_writer import iter_report_tables, read_report_table, report_columns, report_format, report_stem
+
+# ==============================================================================
+# Inferensi skema (dtype) berbasis sampel
+# ==============================================================================
+# Sebelum konsolidasi, beberapa ribu baris pertama setiap file input dibaca
+# sebagai sampel. Statistik sampel semua file digabung menjadi satu peta dtype:
+# - bilangan bulat -> tipe Int nullable tersempit (Int8/Int16/Int32/Int64)
+# - bilangan pecahan -> float64 (tidak diperkecil agar nilai di laporan tidak berubah)
+# - tanggal format ISO (YYYY-MM-DD[ HH:MM[:SS]]) -> datetime64
+# - teks dengan nilai unik sedikit -> category, selain itu teks biasa
+# Peta dtype ini dipakai di setiap pembacaan CSV sehingga pandas tidak perlu
+# menebak dtype per file/chunk lagi, dan disimpan di samping file output.
+
+SAMPLE_ROWS = 10_000
+
+# Teks dianggap kategori jika jumlah nilai uniknya <= batas ini dan
+# <= separuh jumlah nilai yang tidak kosong di sampel.
+CATEGORY_MAX_DISTINCT = 1000
+CATEGORY_MAX_RATIO = 0.5
+
+# Sampel hanya melihat sebagian baris, jadi rentang nilai bulat diberi ruang
+# 16x sebelum memilih tipe yang lebih sempit.
+_INT_HEADROOM = 16
+_INT_TYPES = [('Int8', np.iinfo(np.int8)), ('Int16', np.iinfo(np.int16)),
+              ('Int32', np.iinfo(np.int32)), ('Int64', np.iinfo(np.int64))]
+
+_DATETIME = 'datetime64[ns]'
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$')
+
+SCHEMA_SUFFIX = '.schema.json'
+_DATASET_SCHEMA_FILE = '_schema.json'
+
+
+# ------------------------------------------------------------------------------
+# Statistik sampel
+# ------------------------------------------------------------------------------
+def _looks_like_dates(values):
+    sample = values.iloc[:200]
+    return bool(sample.str.match(_ISO_DATE).all()) and \
+        pd.to_datetime(sample, format='ISO8601', errors='coerce').notna().all()
+
+
+def column_stats(series):
+    """Ringkasan satu kolom sampel yang cukup untuk menentukan dtype-nya."""
+    values = series.dropna()
+    if values.empty:
+        return {'kind': 'empty'}
+    if pd.api.types.is_bool_dtype(values):
+        return {'kind': 'bool'}
+    if pd.api.types.is_integer_dtype(values):
+        return {'kind': 'int', 'min': int(values.min()), 'max': int(values.max())}
+    if pd.api.types.is_float_dtype(values):
+        return {'kind': 'float'}
+    values = values.astype(str)
+    if _looks_like_dates(values):
+        return {'kind': 'date'}
+    distinct = values.unique()[:CATEGORY_MAX_DISTINCT + 1].tolist()
+    return {'kind': 'string', 'count': int(len(values)), 'distinct': distinct}
+
+
+def sample_file_stats(file_path, sample_rows=SAMPLE_ROWS, columns=None):
+    """
+    Membaca sampel baris pertama satu file CSV dan menghitung statistik setiap kolom.
+
+    Dengan `columns`, hanya kolom itu yang dibaca (kolom yang tidak ada di file dilewati).
+    """
+    wanted = None if columns is None else set(columns)
+    with open_input(file_path, readahead=False) as source:
+        sample = pd.read_csv(source, nrows=sample_rows, low_memory=False,
+                             usecols=None if wanted is None else lambda col: col in wanted)
+    return {col: column_stats(sample[col]) for col in sample.columns}
+
+
+def _merge_column_stats(a, b):
+    if a['kind'] == 'empty':
+        return b
+    if b['kind'] == 'empty':
+        return a
+    kinds = {a['kind'], b['kind']}
+    if kinds == {'int'}:
+        return {'kind': 'int', 'min': min(a['min'], b['min']), 'max': max(a['max'], b['max'])}
+    if kinds <= {'int', 'float'}:
+        return {'kind': 'float'}
+    if len(kinds) == 1 and kinds != {'string'}:
+        return a
+    if kinds == {'string'} and a['distinct'] is not None and b['distinct'] is not None:
+        distinct = list(dict.fromkeys(a['distinct'] + b['distinct']))[:CATEGORY_MAX_DISTINCT + 1]
+        return {'kind': 'string', 'count': a['count'] + b['count'], 'distinct': distinct}
+    # Campuran tipe lain (mis. angka dan teks) dibaca sebagai teks biasa
+    return {'kind': 'string', 'count': 0, 'distinct': None}
+
+
+def merge_stats(stats_list):
+    """Menggabungkan statistik sampel dari beberapa file menjadi satu statistik per kolom."""
+    merged = {}
+    for stats in stats_list:
+        for col, col_stats in stats.items():
+            merged[col] = _merge_column_stats(merged[col], col_stats) if col in merged else col_stats
+    return merged
+
+
+def _int_type(low, high):
+    for name, info in _INT_TYPES:
+        if info.min <= low * _INT_HEADROOM and high * _INT_HEADROOM <= info.max:
+            return name
+    return 'Int64'
+
+
+def resolve_schema(stats):
+    """
+    Menentukan dtype setiap kolom dari statistik sampel gabungan.
+
+    Returns:
+        dict: Peta kolom -> dtype pandas (string). Kolom yang seluruh sampelnya
+        kosong tidak dimasukkan sehingga dtype-nya tetap ditebak pandas.
+    """
+    schema = {}
+    for col, col_stats in stats.items():
+        kind = col_stats['kind']
+        if kind == 'int':
+            schema[col] = _int_type(col_stats['min'], col_stats['max'])
+        elif kind == 'float':
+            schema[col] = 'float64'
+        elif kind == 'bool':
+            schema[col] = 'boolean'
+        elif kind == 'date':
+            schema[col] = _DATETIME
+        elif kind == 'string':
+            distinct = col_stats['distinct']
+            is_category = (distinct is not None and len(distinct) <= CATEGORY_MAX_DISTINCT
+                           and len(distinct) <= CATEGORY_MAX_RATIO * col_stats['count'])
+            schema[col] = 'category' if is_category else 'str'
+    return schema
+
+
+def infer_schema(files, sample_rows=SAMPLE_ROWS, columns=None, log=print):
+    """Inferensi satu peta dtype dari sampel semua file CSV (hanya kolom `columns` jika diisi)."""
+    stats_list = []
+    for f in files:
+        try:
+            stats_list.append(sample_file_stats(f, sample_rows, columns))
+        except Exception as e:
+            log(f"⚠️  Gagal membaca sampel dari {os.path.basename(f)}: {e}")
+    return resolve_schema(merge_stats(stats_list))
+
+
+# ------------------------------------------------------------------------------
+# Pemakaian peta dtype saat membaca CSV
+# ------------------------------------------------------------------------------
+def read_csv_kwargs(schema, columns=None):
+    """
+    Argumen `dtype` dan `parse_dates` untuk pd.read_csv dari peta dtype.
+
+    Kolom bulat dibaca sebagai Int64 lalu diperkecil oleh `apply_schema`, karena
+    read_csv tidak memeriksa overflow untuk tipe bulat yang sempit.
+    """
+    schema = {col: dtype for col, dtype in (schema or {}).items() if columns is None or col in columns}
+    dtype = {col: ('Int64' if dtype.startswith('Int') else dtype)
+             for col, dtype in schema.items() if dtype != _DATETIME}
+    kwargs = {'dtype': dtype}
+    parse_dates = [col for col, dtype in schema.items() if dtype == _DATETIME]
+    if parse_dates:
+        kwargs['parse_dates'] = parse_dates
+    return kwargs
+
+
+def apply_schema(df, schema):
+    """
+    Menerapkan peta dtype ke DataFrame yang sudah dibaca.
+
+    Kolom bulat diperkecil hanya jika semua nilainya muat; jika tidak, tetap Int64.
+    Kolom kategori yang terbaca sebagai teks diubah menjadi category.
+    """
+    for col, dtype in (schema or {}).items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        if dtype.startswith('Int') and pd.api.types.is_integer_dtype(df[col]):
+            info = dict(_INT_TYPES)[dtype]
+            low, high = df[col].min(), df[col].max()
+            if pd.isna(low) or (info.min <= low and high <= info.max):
+                df[col] = df[col].astype(dtype)
+        elif dtype == 'category' and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def widen_schema(schema):
+    """
+    Peta dtype cadangan jika pembacaan dengan peta asli gagal (mis. ada teks di
+    kolom angka di luar sampel): tipe angka dan boolean dilepas agar ditebak pandas.
+    """
+    return {col: dtype for col, dtype in (schema or {}).items() if dtype in ('category', 'str', _DATETIME)}
+
+
+def read_csv_chunks(file_path, schema, chunk_rows, read_options=None, columns=None):
+    """
+    Membaca CSV per chunk dengan peta dtype, menghasilkan DataFrame yang sudah diterapkan skemanya.
+
+    Args:
+        read_options (CsvReadOptions): Mesin baca CSV (opsional, lihat csv_reader.py).
+        columns (list): Jika diisi, hanya kolom ini yang di-parsing (kolom yang
+            tidak ada di file dilewati); jumlah baris tetap sama.
+    """
+    header = read_header(file_path)
+    usecols = None
+    if columns is not None:
+        wanted = set(columns)
+        # Jika tidak ada kolom yang dibutuhkan, kolom pertama tetap dibaca agar jumlah baris terhitung
+        usecols = [col for col in header if col in wanted] or header[:1]
+    kwargs = read_csv_kwargs(schema, usecols or header)
+    for chunk in read_csv_frames(file_path, chunk_rows, read_options, usecols=usecols, **kwargs):
+        chunk = apply_schema(chunk, schema)
+        if columns is not None and not wanted.issuperset(chunk.columns):
+            chunk = chunk[[col for col in chunk.columns if col in wanted]]
+        yield chunk
+
+
+def merge_input_dtypes(dataset_path, merge_key):
+    """
+    Peta dtype dataset hasil konsolidasi untuk merge.
+
+    Kolom kunci tidak diubah menjadi category, karena pd.merge mengurutkan kunci
+    category menurut urutan kategorinya, bukan urutan nilainya.
+    """
+    return {col: dtype for col, dtype in load_schema(dataset_path).items() if col != merge_key}
+
+
+def read_merge_input(dataset_path, merge_key):
+    """Memuat dataset hasil konsolidasi beserta peta dtype-nya untuk merge di memori."""
+    return apply_schema(read_frame(dataset_path), merge_input_dtypes(dataset_path, merge_key))
+
+
+def merge_input_frame(table, dtypes, null_columns):
+    """
+    Mengubah sebagian dataset (tabel Arrow) menjadi DataFrame dengan dtype yang
+    sama seperti `read_merge_input` untuk seluruh dataset, sehingga join yang
+    membaca per chunk menulis nilai yang sama persis dengan merge di memori.
+
+    Args:
+        table (pa.Table): Potongan dataset.
+        dtypes (dict): Hasil `merge_input_dtypes`.
+        null_columns (set): Kolom yang berisi null di bagian mana pun dataset
+            (arrow_store.null_columns); kolom bulat seperti ini menjadi float
+            walaupun potongan ini tidak punya null.
+    """
+    df = table.to_pandas()
+    for col in null_columns:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype('float64')
+    return apply_schema(df, dtypes)
+
+
+def merged_schema(schema_a, schema_b, merge_key, output_columns, suffixes=('_x', '_y')):
+    """Peta dtype untuk hasil pd.merge, termasuk kolom bersufiks _x/_y."""
+    schema = {}
+    for col in output_columns:
+        if col == merge_key:
+            dtype = schema_a.get(col) or schema_b.get(col)
+        elif col in schema_a or col in schema_b:
+            dtype = schema_a.get(col) or schema_b.get(col)
+        elif col.endswith(suffixes[0]):
+            dtype = schema_a.get(col[:-len(suffixes[0])])
+        elif col.endswith(suffixes[1]):
+            dtype = schema_b.get(col[:-len(suffixes[1])])
+        else:
+            dtype = None
+        if dtype:
+            schema[col] = dtype
+    return schema
+
+
+def save_merge_schema(left_file, right_file, merge_key, output_file):
+    """Menyimpan peta dtype hasil merge di samping file laporan (`<laporan>.schema.json`)."""
+    schema = merged_schema(load_schema(left_file), load_schema(right_file), merge_key, report_columns(output_file))
+    save_schema(schema, output_file)
+
+
+def read_report_chunks(report_file, schema, chunk_rows, read_options=None):
+    """Seperti `read_csv_chunks`, tetapi juga untuk laporan Parquet/Hive (lihat report_writer.py)."""
+    if report_format(report_file) == 'csv':
+        yield from read_csv_chunks(report_file, schema, chunk_rows, read_options)
+        return
+    for table in iter_report_tables(report_file, chunk_rows):
+        yield apply_schema(table.to_pandas(), schema)
+
+
+def read_report(file_path, read_options=None):
+    """
+    Memuat file laporan dengan peta dtype-nya jika ada. Jika peta dtype tidak
+    ada atau tidak cocok dengan isi file, dtype ditebak pandas seperti biasa.
+    Laporan Parquet/Hive dimuat dengan dtype yang tersimpan di file-nya.
+
+    Args:
+        read_options (CsvReadOptions): Mesin baca CSV (opsional, lihat csv_reader.py).
+    """
+    schema = load_schema(file_path)
+    if report_format(file_path) != 'csv':
+        return apply_schema(read_report_table(file_path).to_pandas(), schema)
+    if schema:
+        try:
+            columns = read_columns(file_path)
+            return apply_schema(read_csv(file_path, read_options, **read_csv_kwargs(schema, columns)), schema)
+        except (ValueError, TypeError, OverflowError):
+            pass
+    return read_csv(file_path, read_options)
+
+
+# ------------------------------------------------------------------------------
+# Penyimpanan peta dtype
+# ------------------------------------------------------------------------------
+def schema_path_for(path):
+    """File peta dtype di samping output: `<nama>.schema.json`, atau `_schema.json` di dalam dataset Arrow."""
+    if is_arrow_path(path):
+        return os.path.join(path, _DATASET_SCHEMA_FILE)
+    return f"{report_stem(path)}{SCHEMA_SUFFIX}"
+
+
+def save_schema(schema, path):
+    with open(schema_path_for(path), 'w', encoding='utf-8') as f:
+        json.dump(schema, f, indent=2)
+
+
+def load_schema(path):
+    """Membaca peta dtype milik sebuah output; dict kosong jika belum ada."""
+    try:
+        with open(schema_path_for(path), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
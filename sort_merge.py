@@ -0,0 +1,298 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import ipc
+
+from arrow_store import ARROW_SUFFIX, dataset_size, iter_tables, null_columns, unified_schema, write_table_file
+from consolidation import DEFAULT_CHUNK_ROWS
+from join_engine import (
+    JOIN_TYPES, _SEQ_A, _SEQ_B, _before, _merge_sorted_files, _min_nan_last, _same, _sort_columns, concat_frames,
+    merge_sorted_frames
+)
+from merge_keys import join_frames, without_key_column
+from metrics import RunMetrics
+from report_writer import ReportWriter
+from schema_inference import merge_input_dtypes, merge_input_frame
+
+# ==============================================================================
+# Sort-merge join untuk sumber yang sudah terurut menurut kunci
+# ==============================================================================
+# Jika kedua sumber sudah terurut menurut kolom kunci (mis. ekspor harian yang
+# diurutkan menurut ID transaksi), join cukup dilakukan dengan membaca kedua
+# dataset Arrow sekali secara berurutan: baris dengan kunci di bawah "frontier"
+# (kunci terakhir yang sudah dibaca di kedua sisi) sudah lengkap dan langsung
+# di-join dengan pd.merge lalu ditulis. Memori yang dipakai hanya sebesar satu
+# chunk per sisi ditambah satu kelompok kunci yang sama, dan hasil join
+# many-to-many per kelompok kunci tetap diputuskan oleh pandas.
+#
+# Urutan kunci diperiksa sambil membaca (naik, kunci kosong di akhir). Jika
+# sebuah sisi ternyata tidak terurut, sisi itu diurutkan dulu dengan external
+# merge sort (run terurut per chunk di disk, lalu k-way merge) dan join diulang.
+# Jika urutan output pd.merge mengikuti sisi yang tidak terurut, hasil join
+# diurutkan ulang dengan cara yang sama sebelum ditulis.
+
+_SIDES = (('a', _SEQ_A), ('b', _SEQ_B))
+
+class _NotSorted(Exception):
+    """Kunci sebuah sisi ternyata tidak terurut naik."""
+
+    def __init__(self, side):
+        super().__init__(side)
+        self.side = side
+
+
+# Penanda "belum ada potongan sebelumnya" untuk keys_in_order. Bukan None, karena
+# kunci teks yang kosong juga terbaca sebagai None.
+NO_PREVIOUS_KEY = object()
+
+
+def keys_in_order(keys, last=NO_PREVIOUS_KEY):
+    """
+    True jika `keys` terurut naik dengan kunci kosong (NaN/None) di akhir, dan
+    tidak lebih kecil dari `last` (kunci terakhir potongan sebelumnya, atau
+    NO_PREVIOUS_KEY). Jika potongan sebelumnya berakhir dengan kunci kosong,
+    potongan ini hanya boleh berisi kunci kosong.
+    """
+    present = int(keys.notna().sum())
+    try:
+        if not (keys.iloc[:present].notna().all() and keys.iloc[:present].is_monotonic_increasing):
+            return False
+        if last is NO_PREVIOUS_KEY or not present:
+            return True
+        return bool(not pd.isna(last) and last <= keys.iloc[0])
+    except TypeError:
+        return False
+
+
+def _check_sorted(chunks, merge_key, side):
+    """Meneruskan chunk sambil memeriksa urutan kuncinya; _NotSorted jika tidak terurut."""
+    last = NO_PREVIOUS_KEY
+    for chunk in chunks:
+        keys = chunk[merge_key]
+        if not keys_in_order(keys, last):
+            raise _NotSorted(side)
+        if len(chunk):
+            last = keys.iloc[-1]
+        yield chunk
+
+
+def _dataset_chunks(dataset_path, schema, dtypes, nulls, seq_col, chunk_rows):
+    """DataFrame per chunk dengan dtype seperti read_merge_input dan kolom nomor baris asli."""
+    offset = 0
+    for table in iter_tables(dataset_path, chunk_rows, schema=schema):
+        df = merge_input_frame(table, dtypes, nulls)
+        df[seq_col] = np.arange(offset, offset + len(df), dtype=np.int64)
+        offset += len(df)
+        yield df
+
+
+def _write_run(table, path):
+    with ipc.new_file(path, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _sort_runs(dataset_path, schema, merge_key, seq_col, work_dir, side, chunk_rows):
+    """
+    Tahap pertama external merge sort: setiap chunk diurutkan menurut (kunci,
+    nomor baris asli) lalu ditulis sebagai satu run Arrow.
+
+    Returns:
+        tuple: (daftar path file run, jumlah baris).
+    """
+    runs = []
+    offset = 0
+    for table in iter_tables(dataset_path, chunk_rows, schema=schema):
+        seq = pa.array(np.arange(offset, offset + table.num_rows, dtype=np.int64))
+        offset += table.num_rows
+        table = table.append_column(seq_col, seq)
+        table = table.sort_by([(merge_key, 'ascending'), (seq_col, 'ascending')], null_placement='at_end')
+        path = os.path.join(work_dir, f"sorted_{side}_{len(runs):05d}{ARROW_SUFFIX}")
+        _write_run(table, path)
+        runs.append(path)
+    return runs, offset
+
+
+def _run_chunks(run, dtypes, nulls, chunk_rows):
+    for table in iter_tables(run, chunk_rows):
+        yield merge_input_frame(table, dtypes, nulls)
+
+
+def _merge_join(streams, empties, merge_key, how, key_columns=()):
+    """
+    Sort-merge join dua aliran DataFrame yang terurut menurut kunci.
+
+    Yields:
+        pd.DataFrame: Hasil pd.merge per kelompok kunci yang sudah lengkap, urut menurut kunci.
+    """
+    buffers = list(empties)
+    exhausted = [False, False]
+
+    def refill(i):
+        while not exhausted[i]:
+            chunk = next(streams[i], None)
+            if chunk is None:
+                exhausted[i] = True
+            elif len(chunk):
+                buffers[i] = chunk if buffers[i].empty else concat_frames([buffers[i], chunk], ignore_index=True)
+                return
+
+    refill(0)
+    refill(1)
+    while True:
+        # Sisi yang tidak dipertahankan merge sudah habis: sisa sisi lainnya tidak akan cocok lagi
+        done = [exhausted[i] and buffers[i].empty for i in (0, 1)]
+        if (how == 'inner' and any(done)) or (how == 'left' and done[0]) or (how == 'right' and done[1]):
+            return
+
+        open_sides = [i for i in (0, 1) if not exhausted[i]]
+        if not open_sides:
+            if not (buffers[0].empty and buffers[1].empty):
+                yield join_frames(buffers[0], buffers[1], merge_key, how, key_columns)
+            return
+
+        # Kunci di bawah frontier sudah dibaca seluruhnya di kedua sisi
+        frontier = _min_nan_last([buffers[i][merge_key].iloc[-1] for i in open_sides])
+        ready = []
+        for i in (0, 1):
+            mask = _before(buffers[i][merge_key], frontier)
+            ready.append(buffers[i][mask])
+            buffers[i] = buffers[i][~mask]
+        if not (ready[0].empty and ready[1].empty):
+            yield join_frames(ready[0], ready[1], merge_key, how, key_columns)
+
+        for i in open_sides:
+            if buffers[i].empty or _same(buffers[i][merge_key].iloc[-1], frontier):
+                refill(i)
+
+
+def _write_frames(frames, writer, sort_columns):
+    """Menulis potongan hasil join (masing-masing diurutkan) ke laporan; mengembalikan jumlah baris."""
+    total_rows = 0
+    for merged in frames:
+        writer.write(merged.sort_values(sort_columns, na_position='last', kind='stable'))
+        total_rows += len(merged)
+    return total_rows
+
+
+def _reorder_output(frames, work_dir, writer, sort_columns, chunk_rows):
+    """
+    Mengurutkan ulang hasil join yang keluar urut menurut kunci menjadi urutan
+    pd.merge (external merge sort menurut `sort_columns`), lalu menulisnya ke laporan.
+
+    Returns:
+        int: Jumlah baris yang ditulis.
+    """
+    runs = []
+    pending = []
+
+    def write_run():
+        merged = concat_frames(pending).sort_values(sort_columns, na_position='last', kind='stable')
+        path = os.path.join(work_dir, f"result_{len(runs):05d}{ARROW_SUFFIX}")
+        write_table_file(merged, path)
+        runs.append(path)
+        pending.clear()
+
+    # Potongan hasil join dikumpulkan sampai sekitar `chunk_rows` baris per run
+    for merged in frames:
+        pending.append(merged)
+        if sum(len(p) for p in pending) >= chunk_rows:
+            write_run()
+    if pending:
+        write_run()
+
+    # Setiap run dibaca per chunk, jadi ukuran chunk dibagi jumlah run
+    return _merge_sorted_files(runs, sort_columns, writer, max(1000, chunk_rows // max(1, len(runs))))
+
+
+def sort_merge_join(left_file, right_file, merge_key, how, output_file, chunk_rows=DEFAULT_CHUNK_ROWS,
+                    work_dir=None, output_options=None, key_columns=(), metrics=None, log=print):
+    """
+    Menjalankan sort-merge join streaming atas dua dataset Arrow yang (diharapkan)
+    sudah terurut menurut kolom kunci.
+
+    Hasilnya (kolom, isi, dan urutan baris) sama dengan merge di memori untuk
+    semua tipe merge. Sisi yang ternyata tidak terurut diurutkan dulu dengan
+    external merge sort di `work_dir`.
+
+    Args:
+        left_file (str): Dataset Arrow Source A (sisi kiri).
+        right_file (str): Dataset Arrow Source B (sisi kanan).
+        merge_key (str): Kolom kunci merge.
+        how (str): Tipe merge: 'inner', 'left', 'right', atau 'outer'.
+        output_file (str): File laporan hasil join.
+        chunk_rows (int): Jumlah baris per chunk saat membaca setiap sisi.
+        work_dir (str): Folder untuk run external merge sort.
+        output_options (OutputOptions): Format laporan (opsional; default CSV, lihat report_writer.py).
+        key_columns (list): Kolom kunci yang disatukan setelah join hash (MergeKey.key_columns, lihat
+            merge_keys.py); KEY_COLUMN tidak ditulis ke laporan.
+        metrics (RunMetrics): Tempat mencatat metrik setiap tahap (opsional).
+        log (callable): Fungsi untuk menampilkan pesan progres.
+
+    Returns:
+        int: Jumlah baris hasil join.
+    """
+    if how not in JOIN_TYPES:
+        raise ValueError(f"Tipe merge tidak dikenal: '{how}'. Pilihan: {', '.join(JOIN_TYPES)}")
+    chunk_rows = chunk_rows or DEFAULT_CHUNK_ROWS
+    work_dir = work_dir or f"{output_file}.join"
+    metrics = metrics or RunMetrics('join')
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir, exist_ok=True)
+
+    # Dtype kedua sisi disamakan dengan read_merge_input
+    files = {'a': left_file, 'b': right_file}
+    schemas = {side: unified_schema(path) for side, path in files.items()}
+    dtypes = {side: merge_input_dtypes(path, merge_key) for side, path in files.items()}
+    nulls = {side: null_columns(path) for side, path in files.items()}
+    empties = {}
+    for side, seq_col in _SIDES:
+        empties[side] = merge_input_frame(schemas[side].empty_table(), dtypes[side], nulls[side])
+        empties[side][seq_col] = np.array([], dtype=np.int64)
+    merged_columns = list(join_frames(empties['a'], empties['b'], merge_key, how, key_columns).columns)
+    output_columns = [c for c in without_key_column(merged_columns) if c not in (_SEQ_A, _SEQ_B)]
+    sort_columns = _sort_columns(merge_key, how, key_columns)
+
+    runs = {}
+
+    def side_stream(side, seq_col):
+        if side not in runs:
+            return _check_sorted(_dataset_chunks(files[side], schemas[side], dtypes[side], nulls[side], seq_col,
+                                                 chunk_rows), merge_key, side)
+        run_rows = max(1000, chunk_rows // max(1, len(runs[side])))
+        readers = [_run_chunks(run, dtypes[side], nulls[side], run_rows) for run in runs[side]]
+        return merge_sorted_frames(readers, [merge_key, seq_col])
+
+    try:
+        while True:
+            # Urutan output pd.merge mengikuti Source A ('inner'/'left') atau Source B ('right');
+            # jika sisi itu harus diurutkan dulu, hasil join juga harus diurutkan ulang. Hasil
+            # 'outer' join hash keluar urut menurut hash, jadi diurutkan ulang menurut kolom kunci.
+            leading = {'inner': 'a', 'left': 'a', 'right': 'b'}.get(how)
+            reorder = leading in runs or (how == 'outer' and bool(key_columns))
+            log(f"Menjalankan sort-merge join per {chunk_rows} baris...")
+            try:
+                with metrics.stage('sort_merge_join', how=how) as record:
+                    frames = _merge_join([side_stream(side, seq) for side, seq in _SIDES],
+                                         [empties['a'], empties['b']], merge_key, how, key_columns)
+                    # Jika sebuah sisi ternyata tidak terurut, laporan sementara dibuang oleh writer
+                    with ReportWriter(output_file, output_columns, output_options) as writer:
+                        if reorder:
+                            total_rows = _reorder_output(frames, work_dir, writer, sort_columns, chunk_rows)
+                        else:
+                            total_rows = _write_frames(frames, writer, sort_columns)
+                    record.update(rows=total_rows, reordered=reorder, bytes_written=writer.bytes_written)
+                return total_rows
+            except _NotSorted as e:
+                side = e.side
+            log(f"ℹ️  Source {side.upper()} tidak terurut menurut '{merge_key}'; "
+                f"mengurutkannya dengan external merge sort...")
+            with metrics.stage('external_sort', source=files[side],
+                               bytes_read=dataset_size(files[side])) as record:
+                runs[side], record['rows'] = _sort_runs(files[side], schemas[side], merge_key, dict(_SIDES)[side],
+                                                        work_dir, side, chunk_rows)
+                record.update(runs=len(runs[side]), bytes_written=sum(os.path.getsize(r) for r in runs[side]))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# Filter dan sort laporan untuk tabel desktop
+# ==============================================================================
+# Tabel di aplikasi desktop tidak menyalin atau mengurutkan ulang DataFrame;
+# yang diubah hanya daftar posisi baris yang ditampilkan. Semua operasi di sini
+# vektor (tanpa loop per baris) dan aman dijalankan di thread worker.
+
+
+def text_mask(series, text):
+    """
+    Baris yang teksnya mengandung `text` (tanpa membedakan huruf besar/kecil).
+
+    Kolom category dicocokkan per kategori saja, bukan per baris.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        matches = series.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        return np.isin(series.cat.codes.to_numpy(), np.flatnonzero(matches))
+    mask = series.astype(str).str.contains(text, case=False, regex=False)
+    return (mask & series.notna()).to_numpy(dtype=bool)
+
+
+def filter_rows(df, text, column=None):
+    """
+    Posisi baris yang cocok dengan teks filter.
+
+    Args:
+        df (pd.DataFrame): Data laporan.
+        text (str): Teks yang dicari; kosong berarti semua baris.
+        column (str): Kolom yang dicari; None berarti semua kolom.
+
+    Returns:
+        np.ndarray: Posisi baris (int64) sesuai urutan asli.
+    """
+    if not text:
+        return np.arange(len(df), dtype=np.int64)
+    columns = [column] if column is not None else list(df.columns)
+    mask = np.zeros(len(df), dtype=bool)
+    for col in columns:
+        mask |= text_mask(df[col], text)
+    return np.flatnonzero(mask).astype(np.int64)
+
+
+def sort_rows(df, rows, column, ascending=True):
+    """
+    Mengurutkan posisi baris berdasarkan nilai satu kolom (stabil, nilai kosong di akhir).
+
+    Returns:
+        np.ndarray: Posisi baris setelah diurutkan.
+    """
+    values = df[column].iloc[rows].reset_index(drop=True)
+    try:
+        order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index
+    except TypeError:
+        # Kolom berisi campuran tipe (mis. angka dan teks) diurutkan sebagai teks
+        values = values.where(values.isna(), values.astype(str))
+        order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index
+    return rows[order.to_numpy()]
+
+
+def query_rows(df, text=None, filter_column=None, sort_column=None, ascending=True):
+    """Filter lalu sort: posisi baris yang ditampilkan tabel untuk satu kombinasi pengaturan."""
+    rows = filter_rows(df, text, filter_column)
+    if sort_column is not None:
+        rows = sort_rows(df, rows, sort_column, ascending)
+    return rows
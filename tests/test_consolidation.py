@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from arrow_store import create_dataset, read_frame
+from consolidation import append_file_in_chunks, append_file_to_dataset, write_header
+
+COLUMNS = ['id', 'nilai']
+
+
+def _broken_file(path, rows=200_000):
+    # Banyak baris yang valid (sebagian sudah ditulis saat error), lalu byte yang bukan UTF-8
+    lines = ['id,nilai'] + [f"{i},{i * 10}" for i in range(rows)]
+    path.write_bytes(('\n'.join(lines) + '\n').encode('utf-8') + b'\xff\xfe,1\n')
+    return str(path)
+
+
+def test_failed_csv_append_leaves_no_rows(tmp_path):
+    good, output = tmp_path / 'good.csv', str(tmp_path / 'output.csv')
+    pd.DataFrame({'id': [1, 2], 'nilai': [10, 20]}).to_csv(good, index=False)
+    write_header(COLUMNS, output)
+    assert append_file_in_chunks(str(good), COLUMNS, output, 1000) == 2
+
+    with pytest.raises(Exception):
+        append_file_in_chunks(_broken_file(tmp_path / 'broken.csv'), COLUMNS, output, 1000,
+                              schema={'id': 'Int64', 'nilai': 'Int64'})
+    assert len(pd.read_csv(output)) == 2
+
+
+def test_failed_dataset_append_leaves_no_parts(tmp_path):
+    dataset = str(tmp_path / 'output.arrow')
+    create_dataset(dataset, COLUMNS)
+    with pytest.raises(Exception):
+        append_file_to_dataset(_broken_file(tmp_path / 'broken.csv'), dataset, 'part-0', 1000)
+    assert not list(tmp_path.glob('output.arrow/part-0-*'))
+    assert len(read_frame(dataset)) == 0
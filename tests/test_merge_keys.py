@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from merge_keys import KEY_COLUMN, MergeKey, join_frames, key_hashes
+
+
+def test_large_integer_keys_hash_apart():
+    keys = pd.Series([2 ** 53, 2 ** 53 + 1], dtype='int64')
+    hashes = key_hashes(keys)
+    assert hashes[0] != hashes[1]
+
+
+def test_integral_floats_hash_like_integers():
+    hashes = key_hashes(pd.Series([1, 2 ** 40], dtype='int64'))
+    assert (key_hashes(pd.Series([1.0, float(2 ** 40)])) == hashes).all()
+    assert (key_hashes(pd.Series([1, 2 ** 40], dtype='Int64')) == hashes).all()
+    assert key_hashes(pd.Series([1.5]))[0] != key_hashes(pd.Series([1]))[0]
+
+
+def test_composite_keys_above_float_precision():
+    key = MergeKey('id,kode')
+    left = key.normalize(pd.DataFrame({'id': [2 ** 53, 2 ** 53 + 1], 'kode': ['a', 'a'], 'va': [1, 2]}))
+    right = key.normalize(pd.DataFrame({'id': [2 ** 53 + 1], 'kode': ['a'], 'vb': [3]}))
+    merged = join_frames(left, right, key.join_column, 'left', key.key_columns)
+    assert merged['id'].tolist() == [2 ** 53, 2 ** 53 + 1]
+    assert merged['vb'].isna().tolist() == [True, False]
+
+
+
+def test_outer_join_orders_by_key_values():
+    key = MergeKey('id:int,store:trim:upper')
+    left = key.normalize(pd.DataFrame({'id': [42, 3, 5, 1], 'store': ['b ', 'a', 'c', 'a'], 'va': [1, 2, 3, 4]}))
+    right = key.normalize(pd.DataFrame({'id': [9, 2, 3], 'store': ['a', 'a', ' A'], 'vb': [5, 6, 7]}))
+    merged = join_frames(left, right, key.join_column, 'outer', key.key_columns)
+    assert merged['id'].tolist() == [1, 2, 3, 5, 9, 42]
+    assert merged['vb'].tolist()[2] == 7
+
+    key = MergeKey('kode:str:zfill5')
+    left = key.normalize(pd.DataFrame({'kode': ['42', '2'], 'va': [1, 2]}))
+    right = key.normalize(pd.DataFrame({'kode': ['1', '00002'], 'vb': [3, 4]}))
+    merged = join_frames(left, right, key.join_column, 'outer', key.key_columns)
+    assert merged['kode'].tolist() == ['00001', '00002', '00042']
+
+
+def test_hash_collision_never_matches():
+    # Hash yang sama dipaksa untuk kunci yang berbeda
+    left = pd.DataFrame({'id': [1, 2, 3], 'va': [1, 2, 3], KEY_COLUMN: np.int64(7)})
+    right = pd.DataFrame({'id': [2, 4], 'vb': [20, 40], KEY_COLUMN: np.int64(7)})
+    for how in ('inner', 'left', 'right', 'outer'):
+        merged = join_frames(left, right, KEY_COLUMN, how, ['id'])
+        expected = pd.merge(left, right, on=[KEY_COLUMN, 'id'], how=how)
+        pd.testing.assert_frame_equal(merged.reset_index(drop=True), expected.reset_index(drop=True))
+        assert not (merged['va'].notna() & merged['vb'].notna() & (merged['id'] != 2)).any()
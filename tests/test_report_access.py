@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+import pytest
+
+from report_access import ReportReader, report_cache_dir, report_dataset_path
+from report_catalog import ReportCatalog
+from report_writer import OutputOptions, write_report
+
+FRAME = pd.DataFrame({'id': range(12), 'kota': ['a', 'b', 'c'] * 4, 'nilai': [x * 1.5 for x in range(12)]})
+
+
+def _outputs(tmp_path):
+    outputs = tmp_path / 'outputs'
+    outputs.mkdir()
+    return outputs
+
+
+@pytest.mark.parametrize('options, name', [
+    (OutputOptions('parquet', None, None, None), 'laporan.parquet'),
+    (OutputOptions('hive', None, 'kota', None), 'laporan.hive'),
+])
+def test_columnar_reports_are_read_in_place(tmp_path, options, name):
+    outputs = _outputs(tmp_path)
+    report = str(outputs / name)
+    write_report(FRAME, report, options)
+
+    reader = ReportReader(report)
+    assert reader.num_rows == len(FRAME)
+    # Tidak ada salinan di folder output maupun di folder cache
+    assert sorted(os.listdir(outputs)) == [name]
+    assert not os.path.exists(report_cache_dir(str(outputs)))
+
+    rows = pd.concat([reader.page(offset, 5) for offset in range(0, reader.num_rows, 5)])
+    assert rows.index.tolist() == list(range(len(FRAME)))
+    expected = FRAME.sort_values('id').reset_index(drop=True)
+    actual = rows.sort_values('id').reset_index(drop=True)[list(FRAME.columns)]
+    assert actual['id'].tolist() == expected['id'].tolist()
+    assert actual['kota'].astype(str).tolist() == expected['kota'].tolist()
+    assert sorted(reader.read_columns(['nilai'])['nilai'].tolist()) == sorted(FRAME['nilai'].tolist())
+
+
+def test_csv_dataset_lives_in_cache_and_is_pruned(tmp_path):
+    outputs = _outputs(tmp_path)
+    report = str(outputs / 'laporan.csv')
+    write_report(FRAME, report)
+    # Salinan lama yang dulu ditulis di samping laporan
+    legacy = outputs / 'laporan.arrow'
+    legacy.mkdir()
+
+    reader = ReportReader(report)
+    pd.testing.assert_frame_equal(reader.page(3, 4).reset_index(drop=True),
+                                  FRAME.iloc[3:7].reset_index(drop=True), check_dtype=False)
+    dataset = report_dataset_path(report)
+    assert os.path.dirname(dataset) == str(tmp_path / 'cache' / 'reports')
+    assert os.path.isdir(dataset)
+
+    catalog = ReportCatalog(str(outputs))
+    catalog.reconcile()
+    assert os.path.isdir(dataset) and not legacy.exists()
+
+    os.remove(report)
+    catalog.reconcile()
+    assert not os.path.exists(dataset)
+    assert catalog.count() == 0
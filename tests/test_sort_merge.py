@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from consolidation import consolidate_folder
+from report_writer import write_report
+from schema_inference import read_merge_input, read_report
+from sort_merge import keys_in_order, sort_merge_join
+
+
+def _write_source(folder, files):
+    folder.mkdir()
+    for i, rows in enumerate(files):
+        pd.DataFrame(rows).to_csv(folder / f"part_{i}.csv", index=False)
+
+
+def _sorted_frame(df):
+    df = df.astype(object).where(df.notna(), None).astype(str)
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+def test_keys_in_order_after_trailing_null():
+    keys = pd.Series(['a', 'c', None], dtype=object)
+    assert keys_in_order(keys)
+    # Setelah kunci kosong, potongan berikutnya hanya boleh berisi kunci kosong
+    assert not keys_in_order(pd.Series(['b', 'd'], dtype=object), keys.iloc[-1])
+    assert keys_in_order(pd.Series([None, None], dtype=object), keys.iloc[-1])
+    assert not keys_in_order(pd.Series(['b'], dtype=object), 'c')
+
+
+@pytest.mark.parametrize('how', ['inner', 'left', 'right', 'outer'])
+def test_presorted_files_not_sorted_together(tmp_path, how):
+    # Setiap file terurut (kunci kosong di akhir), tetapi gabungannya tidak
+    _write_source(tmp_path / 'a', [
+        {'id': ['k01', 'k05', 'k09', None], 'va': [1, 2, 3, 4]},
+        {'id': ['k02', 'k05', 'k07', None], 'va': [5, 6, 7, 8]},
+        {'id': ['k03', 'k04', 'k08', None], 'va': [9, 10, 11, 12]},
+    ])
+    _write_source(tmp_path / 'b', [
+        {'id': ['k02', 'k04', 'k05', None], 'vb': [1, 2, 3, 4]},
+        {'id': ['k01', 'k07', 'k09', None], 'vb': [5, 6, 7, 8]},
+    ])
+    left, right = str(tmp_path / 'a.arrow'), str(tmp_path / 'b.arrow')
+    assert consolidate_folder(str(tmp_path / 'a'), left, chunk_rows=4, log=lambda *_: None)
+    assert consolidate_folder(str(tmp_path / 'b'), right, chunk_rows=4, log=lambda *_: None)
+
+    output = str(tmp_path / 'report.csv')
+    total = sort_merge_join(left, right, 'id', how, output, chunk_rows=4, work_dir=str(tmp_path / 'join'),
+                            log=lambda *_: None)
+
+    # Hasilnya harus sama dengan merge di memori yang ditulis dengan cara yang sama
+    expected = pd.merge(read_merge_input(left, 'id'), read_merge_input(right, 'id'), on='id', how=how)
+    expected_output = str(tmp_path / 'expected.csv')
+    write_report(expected, expected_output)
+    assert total == len(expected)
+    pd.testing.assert_frame_equal(_sorted_frame(read_report(output)), _sorted_frame(read_report(expected_output)))
@@ -0,0 +1,191 @@
+import os
+import time
+from collections import namedtuple
+
+from arrow_store import read_columns
+from consolidation import consolidate_sources
+from input_sources import input_stat, list_input_files
+from key_filter import build_key_filter, semi_join_sides
+from metrics import RunMetrics
+
+# ==============================================================================
+# Mode pantau (--watch): merge ulang otomatis saat file sumber baru masuk
+# ==============================================================================
+# Setelah run penuh pertama, folder Source A dan Source B diperiksa setiap
+# beberapa detik (polling, tanpa dependensi tambahan). Perubahan baru diproses
+# setelah daftar file stabil selama waktu debounce, sehingga file yang masih
+# disalin (ukurannya masih bertambah) tidak ikut dibaca setengah jadi.
+#
+# Jika yang berubah hanya file BARU di Source A dan tipe merge 'inner' atau
+# 'left', baris hasil merge file baru tidak bergantung pada baris Source A
+# lainnya. Jadi hanya file baru itu yang dikonsolidasi (tanpa cache) lalu
+# di-join dengan hasil konsolidasi Source B yang sudah ada di folder temp, dan
+# hasilnya ditulis sebagai laporan delta terpisah (`<waktu>_delta_merge`).
+# Laporan run penuh terakhir ditambah semua laporan delta sesudahnya sama
+# dengan hasil merge ulang semua file.
+#
+# Perubahan lain (file Source B, file Source A yang berubah atau dihapus, tipe
+# merge 'right'/'outer', atau run sebelumnya gagal) menjalankan run penuh, yang
+# tetap cepat karena file yang tidak berubah diambil dari cache (manifest.py).
+# Di mode pantau Source B tidak pernah difilter semi-join, agar dataset Source B
+# di folder temp berisi semua baris dan bisa dipakai oleh run delta berikutnya.
+
+# Jeda antar pemeriksaan folder (detik)
+DEFAULT_WATCH_INTERVAL = 5.0
+
+# Lama daftar file harus tidak berubah sebelum perubahan diproses (detik)
+DEFAULT_WATCH_DEBOUNCE = 10.0
+
+# Tipe merge yang bisa diperbarui hanya dengan baris Source A yang baru
+DELTA_MERGE_TYPES = ('inner', 'left')
+
+# Perubahan file di satu folder sumber
+SourceChanges = namedtuple('SourceChanges', ['added', 'changed', 'removed'])
+
+
+def snapshot(input_path, recursive=False):
+    """
+    Keadaan file input di sebuah folder.
+
+    Returns:
+        dict: Path file -> (ukuran, mtime), seperti `input_stat`. Folder yang
+        tidak ada menghasilkan dict kosong.
+    """
+    if not os.path.isdir(input_path):
+        return {}
+    state = {}
+    for path in list_input_files(input_path, recursive, log=lambda message: None):
+        try:
+            state[path] = input_stat(path)
+        except (OSError, KeyError):
+            # File terhapus atau arsip diganti di antara listing dan stat; terlihat lagi di pemeriksaan berikutnya
+            continue
+    return state
+
+
+def compare_snapshots(old, new):
+    """Membandingkan dua hasil `snapshot`; mengembalikan SourceChanges berisi daftar path yang diurutkan."""
+    return SourceChanges(sorted(path for path in new if path not in old),
+                         sorted(path for path in new if path in old and new[path] != old[path]),
+                         sorted(path for path in old if path not in new))
+
+
+class SourceWatcher:
+    """
+    Memantau folder Source A dan Source B dengan polling.
+
+    Keadaan awal diambil saat objek dibuat, jadi buat watcher SEBELUM run
+    penuh pertama agar file yang masuk selama run itu terdeteksi.
+
+    Args:
+        source_a (str): Folder Source A.
+        source_b (str): Folder Source B.
+        recursive (bool): Ikut memantau subfolder.
+        interval (float): Jeda antar pemeriksaan (detik).
+        debounce (float): Lama daftar file harus stabil sebelum perubahan dilaporkan (detik).
+        log (callable): Fungsi untuk menampilkan pesan progres.
+    """
+
+    def __init__(self, source_a, source_b, recursive=False, interval=DEFAULT_WATCH_INTERVAL,
+                 debounce=DEFAULT_WATCH_DEBOUNCE, log=print):
+        self.sources = (source_a, source_b)
+        self.recursive = recursive
+        self.interval = interval
+        self.debounce = debounce
+        self.log = log
+        self.state = self._snapshot()
+
+    def _snapshot(self):
+        return tuple(snapshot(path, self.recursive) for path in self.sources)
+
+    def wait(self, should_stop=None):
+        """
+        Menunggu sampai ada perubahan yang sudah stabil selama waktu debounce.
+
+        Args:
+            should_stop (callable): Dipanggil setiap pemeriksaan; jika mengembalikan
+                True, penantian dihentikan (opsional).
+
+        Returns:
+            tuple: (SourceChanges Source A, SourceChanges Source B), atau None jika dihentikan.
+        """
+        pending, stable_since = None, None
+        while not (should_stop and should_stop()):
+            current = self._snapshot()
+            if current == self.state:
+                pending = None
+            elif current != pending:
+                if pending is None:
+                    self.log("ℹ️  Perubahan file sumber terdeteksi, menunggu sampai file selesai ditulis...")
+                pending, stable_since = current, time.monotonic()
+            elif time.monotonic() - stable_since >= self.debounce:
+                changes = tuple(compare_snapshots(old, new) for old, new in zip(self.state, current))
+                self.state = current
+                return changes
+            time.sleep(self.interval)
+        return None
+
+
+def describe_changes(changes):
+    """Ringkasan perubahan untuk log, mis. 'Source A: 2 baru, 1 berubah; Source B: 1 dihapus'."""
+    parts = []
+    for name, change in zip(('Source A', 'Source B'), changes):
+        counts = [f"{len(paths)} {label}" for paths, label in zip(change, ('baru', 'berubah', 'dihapus')) if paths]
+        if counts:
+            parts.append(f"{name}: {', '.join(counts)}")
+    return '; '.join(parts)
+
+
+def delta_files(changes, how):
+    """
+    File Source A yang cukup di-merge sebagai delta.
+
+    Args:
+        changes (tuple): Hasil `SourceWatcher.wait`.
+        how (str): Tipe merge.
+
+    Returns:
+        list: File baru Source A, atau None jika perubahan ini membutuhkan run penuh.
+    """
+    changes_a, changes_b = changes
+    if how not in DELTA_MERGE_TYPES or any(changes_b) or changes_a.changed or changes_a.removed:
+        return None
+    return changes_a.added
+
+
+def consolidate_delta(input_path, output_file, files, merge_key, how, source_b_file=None, semi_join=True,
+                      metrics=None, log=print, **options):
+    """
+    Mengkonsolidasi hanya file baru Source A ke dataset delta.
+
+    Untuk merge 'inner', baris yang kuncinya tidak ada di dataset Source B
+    (`source_b_file`) dibuang saat dibaca, seperti semi-join pushdown pada run
+    penuh (lihat key_filter.py).
+
+    Args:
+        input_path (str): Folder Source A.
+        output_file (str): Dataset `.arrow` delta (ditimpa).
+        files (list): File baru Source A.
+        merge_key (str): Kolom kunci merge (kolom join MergeKey.join_column, lihat merge_keys.py).
+        how (str): Tipe merge.
+        source_b_file (str): Dataset Source B hasil run penuh terakhir (opsional).
+        semi_join (bool): Pakai filter kunci Source B.
+        metrics (RunMetrics): Tempat mencatat metrik setiap tahap (opsional).
+        log (callable): Fungsi untuk menampilkan pesan progres.
+        **options: Diteruskan ke consolidate_sources (chunk_rows, max_memory, workers, read_options,
+            columns, where, key).
+
+    Returns:
+        bool: True jika konsolidasi berhasil.
+    """
+    metrics = metrics or RunMetrics('consolidation')
+    key_filter = None
+    if semi_join and source_b_file and semi_join_sides(how, keep_right=True) == (1, 0) \
+            and merge_key in read_columns(source_b_file):
+        with metrics.stage('semi_join_filter', source=source_b_file) as record:
+            key_filter = build_key_filter(source_b_file, merge_key, options.get('chunk_rows'))
+            record.update(keys=key_filter.keys, kind=key_filter.kind, filter_bytes=key_filter.size_bytes)
+        log(f"Filter semi-join dari Source B: {key_filter.keys} kunci unik ({key_filter.kind}).")
+    # File baru tidak dimasukkan ke cache; run penuh berikutnya yang menambahkannya
+    return consolidate_sources([(input_path, output_file)], row_filter=key_filter, files=files, metrics=metrics,
+                               log=log, **options)[0]